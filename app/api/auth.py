@@ -0,0 +1,43 @@
+import hashlib
+import hmac
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import get_settings
+
+
+def company_api_key(admin_key: str, company_id: str) -> str:
+    """
+    The key that opens the /api routes of one company only. Derived from
+    the admin API_KEY, so there is nothing to store; rotating API_KEY
+    rotates every company's key too.
+    """
+    return hmac.new(admin_key.encode(), f"company:{company_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def admin_key() -> str:
+    """API_KEY; while it's unset, every route that needs a key is closed."""
+    key = get_settings().API_KEY
+    if not key:
+        raise HTTPException(status_code=403, detail="invalid or missing X-API-Key")
+    return key
+
+
+def require_admin_key(x_api_key: Optional[str] = Header(default=None)) -> None:
+    """X-API-Key must be API_KEY itself (admin routes, /metrics, /health details)."""
+    expected = admin_key()
+    if not x_api_key or not secrets.compare_digest(x_api_key, expected):
+        raise HTTPException(status_code=403, detail="invalid or missing X-API-Key")
+
+
+def require_api_key(company_id: str, x_api_key: Optional[str] = Header(default=None)) -> None:
+    """X-API-Key must be the key of the company in the path, or the admin API_KEY."""
+    expected = admin_key()
+    if not x_api_key:
+        raise HTTPException(status_code=403, detail="invalid or missing X-API-Key")
+    if secrets.compare_digest(x_api_key, expected):
+        return
+    if not secrets.compare_digest(x_api_key, company_api_key(expected, company_id)):
+        raise HTTPException(status_code=403, detail="invalid or missing X-API-Key")
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.auth import require_admin_key
+from app.domain.nlp.vocabulary import company_matchers
+from app.domain.repositories import employee_cache
+from app.infrastructure.extraction_pool import extraction_pool
 
 router = APIRouter()
 
@@ -6,3 +11,16 @@ router = APIRouter()
 @router.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/cache", dependencies=[Depends(require_admin_key)])
+async def cache_stats():
+    return {
+        "employee_cache": employee_cache.stats(),
+        "company_matchers": company_matchers.stats(),
+    }
+
+
+@router.get("/health/extraction", dependencies=[Depends(require_admin_key)])
+async def extraction_stats():
+    return extraction_pool.stats()
@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.auth import admin_key, company_api_key, require_admin_key, require_api_key
+from app.core.config import get_settings
+from app.domain.export import CONTENT_TYPES, JOB_EXPORT_FIELDS, ExportFormat, stream_job_export
+from app.domain.models import JobSummary
+from app.domain.repositories import (
+    InvalidCursor,
+    get_company_brief,
+    iter_company_jobs,
+    list_company_jobs,
+)
+
+router = APIRouter(prefix="/api")
+
+
+def _object_id(value: str, what: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail=f"{what} not found")
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # Jobs store naive UTC; "2026-01-01T09:00:00-05:00" must compare as 14:00
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    True if Accept-Encoding allows gzip: listed (or matched by "*") with a
+    q-value above 0. "gzip;q=0" and "*;q=0" without gzip mean no.
+    """
+    qualities = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.lower()] = q
+    if "gzip" in qualities:
+        return qualities["gzip"] > 0
+    if "x-gzip" in qualities:
+        return qualities["x-gzip"] > 0
+    return qualities.get("*", 0.0) > 0
+
+
+def _job_json(job: JobSummary) -> dict:
+    return {
+        "id": str(job.id),
+        "created_at": job.created_at.isoformat(),
+        "created_by_employee_id": str(job.created_by_employee_id),
+        "status": job.status,
+        "job_type": job.job_type,
+        "client_name": job.client_name,
+        "location": job.location,
+        "scheduled_for": job.scheduled_for.isoformat() if job.scheduled_for else None,
+        "budget": job.budget,
+    }
+
+
+@router.get("/companies/{company_id}/api_key", dependencies=[Depends(require_admin_key)])
+async def issue_company_api_key(company_id: str):
+    """A key for one company's integration: it opens only that company's routes."""
+    company = await get_company_brief(_object_id(company_id, "company"))
+    if company is None:
+        raise HTTPException(status_code=404, detail="company not found")
+    return {"company_id": str(company.id), "api_key": company_api_key(admin_key(), str(company.id))}
+
+
+@router.get("/companies/{company_id}/jobs", dependencies=[Depends(require_api_key)])
+async def company_jobs(
+    company_id: str,
+    status: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    created_from: Optional[datetime] = Query(default=None, alias="from"),
+    created_before: Optional[datetime] = Query(default=None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+):
+    """
+    A company's jobs, newest first, one page per call.
+
+    `from` / `to` are UTC times (`to` exclusive). Each response carries
+    `next_cursor`; send it back as `cursor` with the same filters for the
+    next page, until it's null.
+    """
+    company = await get_company_brief(_object_id(company_id, "company"))
+    if company is None:
+        raise HTTPException(status_code=404, detail="company not found")
+
+    try:
+        page = await list_company_jobs(
+            company_id=company.id,
+            status=status,
+            employee_id=_object_id(employee_id, "employee") if employee_id else None,
+            created_from=_naive_utc(created_from),
+            created_before=_naive_utc(created_before),
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+    return {
+        "jobs": [_job_json(job) for job in page.jobs],
+        "next_cursor": page.next_cursor,
+    }
+
+
+@router.get("/companies/{company_id}/jobs/export", dependencies=[Depends(require_api_key)])
+async def export_company_jobs(
+    company_id: str,
+    format: ExportFormat = "ndjson",
+    created_from: Optional[datetime] = Query(default=None, alias="from"),
+    created_before: Optional[datetime] = Query(default=None, alias="to"),
+    cursor: Optional[str] = None,
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    """
+    Every job of a company, oldest first, streamed as NDJSON or CSV.
+
+    Rows are read from the database a batch at a time and sent as they
+    are encoded, so memory stays flat however big the export. Gzipped
+    when the client accepts it. Each row's `cursor` resumes the export
+    right after that row: pass the last one received as `cursor`.
+    """
+    company = await get_company_brief(_object_id(company_id, "company"))
+    if company is None:
+        raise HTTPException(status_code=404, detail="company not found")
+
+    try:
+        docs = iter_company_jobs(
+            company_id=company.id,
+            fields=JOB_EXPORT_FIELDS,
+            created_from=_naive_utc(created_from),
+            created_before=_naive_utc(created_before),
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+    gzip = _accepts_gzip(accept_encoding)
+    headers = {
+        "Content-Disposition": f'attachment; filename="jobs-{company.id}.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_job_export(
+            docs,
+            format,
+            chunk_bytes=get_settings().JOB_EXPORT_CHUNK_BYTES,
+            gzip=gzip,
+        ),
+        media_type=CONTENT_TYPES[format],
+        headers=headers,
+    )
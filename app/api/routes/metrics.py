@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.auth import require_admin_key
+from app.infrastructure.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_admin_key)])
+async def metrics_endpoint():
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,518 +1,173 @@
-from fastapi import APIRouter, HTTPException
-from aiogram.types import Update
-import httpx
+import time
+from typing import Optional
 
-from app.telegram.bot import bot
-from app.domain.repositories import (
-    create_company,
-    get_company_by_owner,
-    get_companies_by_owner,
-    create_employee,
-    get_company_by_code,
-    get_or_create_employee_by_telegram,
-    get_employee_by_telegram,
-    delete_employee_by_telegram,
-    delete_company_and_related,
-    create_job,
-    set_company_webhook,
-    get_company_webhooks,
-)
-from app.domain.models import UserRole
-from app.telegram.decision_engine import classify_message_and_build_job
+from fastapi import APIRouter, HTTPException, Request
+
+from app.telegram.bot import PARSE_MODE, bot
+from app.core.config import get_settings
+from app.infrastructure.dedup import update_deduplicator
+from app.infrastructure.metrics import metrics, update_seconds
+from app.telegram.commands import CommandContext
+from app.telegram.fast_update import LeanUpdate, decode_update
+from app.telegram.handlers import registry
+from app.telegram.sender import outbound_sender
+from app.telegram.update_queue import UpdateQueue
 
 router = APIRouter()
 
+settings = get_settings()
+
 
 @router.post("/telegram/webhook")
-async def telegram_webhook(update: dict):
+async def telegram_webhook(request: Request):
     """
     Telegram sends all updates here as JSON.
 
-    Directly handle bot logic:
-
-      • /start
-      • /owner_setup My Company Name
-      • /new_company My Other Company
-      • /my_companies
-      • /delete_company OFFICE_CODE
-      • /connect_webhook OFFICE_CODE URL
-      • /join_company OFFICE_CODE Your Name
-      • /leave_company
-      • any other text → try to capture as a job and send to webhooks
+    With WEBHOOK_ASYNC_MODE on, the update is only decoded and queued,
+    and Telegram gets its answer right away; workers run the bot logic.
+    Otherwise the update is handled before we return.
     """
-    print("[telegram_webhook] incoming update:", update)
-
-    # --- 1) Validate the update into an aiogram Update object ---
+    # --- 1) Decode just the fields we use from the raw body ---
     try:
-        tg_update = Update.model_validate(update)
-    except Exception as e:
+        update = decode_update(await request.body())
+    except ValueError as e:
         print("[telegram_webhook] bad update:", repr(e))
         raise HTTPException(status_code=400, detail="Invalid Telegram update")
 
-    msg = tg_update.message or tg_update.edited_message
-    if not msg or msg.from_user is None or msg.from_user.is_bot:
+    if settings.LOG_UPDATES:
+        print(
+            "[telegram_webhook] update",
+            update.update_id,
+            update.kind,
+            "chat",
+            update.chat_id,
+        )
+
+    if update.kind is None or update.user is None or update.user.is_bot:
         # Nothing we can respond to
         return {"ok": True}
 
-    chat_id = msg.chat.id
-    text = (msg.text or "").strip()
-    from_user = msg.from_user
+    # Telegram redelivers when we're slow; only the first copy is handled
+    if await update_deduplicator.is_duplicate(update.update_id):
+        print("[telegram_webhook] duplicate update skipped:", update.update_id)
+        return {"ok": True}
 
     try:
-        # --- 2) /start ---
-        if text.startswith("/start"):
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "👋 Hey! I'm Artlix.\n\n"
-                    "I help construction teams capture jobs, schedule work,\n"
-                    "and keep owners in the loop.\n\n"
-                    "Getting started:\n"
-                    "• Owners: /owner_setup My Company Name\n"
-                    "• Employees: /join_company OFFICE_CODE Your Name\n\n"
-                    "Owner extras:\n"
-                    "• /my_companies\n"
-                    "• /new_company Another Company Name\n"
-                    "• /delete_company OFFICE_CODE\n"
-                    "• /connect_webhook OFFICE_CODE https://your-automation-url\n"
-                    "Employees:\n"
-                    "• /leave_company"
-                ),
-            )
-            return {"ok": True}
-
-        # --- 3) /owner_setup My Company Name ---
-        if text.startswith("/owner_setup"):
-            parts = text.split(maxsplit=1)
-            owner_tg_id = from_user.id
-
-            existing = await get_company_by_owner(owner_tg_id)
-            if existing:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "✅ You already have at least one company set up.\n\n"
-                        f"Example:\n"
-                        f"🏢 <b>{existing.title}</b>\n"
-                        f"🔑 Office code: <code>{existing.office_code}</code>\n\n"
-                        "You can see all your companies with:\n"
-                        "<code>/my_companies</code>\n\n"
-                        "You can create a new one with:\n"
-                        "<code>/new_company Another Company Name</code>"
-                    ),
-                )
-                return {"ok": True}
-
-            if len(parts) < 2:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "To set up your first company, use:\n"
-                        "<code>/owner_setup My Company Name</code>"
-                    ),
-                )
-                return {"ok": True}
-
-            company_title = parts[1].strip()
-
-            company = await create_company(
-                owner_telegram_id=owner_tg_id,
-                title=company_title,
-            )
-
-            owner_name = (
-                from_user.full_name
-                or from_user.username
-                or "Owner"
-            )
-
-            owner_employee = await create_employee(
-                company_id=company.id,
-                name=owner_name,
-                telegram_id=owner_tg_id,
-                role=UserRole.OWNER,
-            )
-
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "✅ Company created!\n\n"
-                    f"🏢 <b>{company.title}</b>\n"
-                    f"👑 Owner: {owner_employee.name}\n"
-                    f"🔑 Office code (share with your team): "
-                    f"<code>{company.office_code}</code>\n\n"
-                    "Employees join with:\n"
-                    f"<code>/join_company {company.office_code} Their Name</code>\n\n"
-                    "You can create more companies later with:\n"
-                    "<code>/new_company Another Company Name</code>"
-                ),
-            )
-            return {"ok": True}
-
-        # --- 4) /new_company Another Company Name ---
-        if text.startswith("/new_company"):
-            parts = text.split(maxsplit=1)
-            owner_tg_id = from_user.id
-
-            if len(parts) < 2:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "To create a new company, use:\n"
-                        "<code>/new_company Another Company Name</code>"
-                    ),
-                )
-                return {"ok": True}
-
-            company_title = parts[1].strip()
-
-            company = await create_company(
-                owner_telegram_id=owner_tg_id,
-                title=company_title,
-            )
-
-            owner_name = (
-                from_user.full_name
-                or from_user.username
-                or "Owner"
-            )
-
-            owner_employee = await create_employee(
-                company_id=company.id,
-                name=owner_name,
-                telegram_id=owner_tg_id,
-                role=UserRole.OWNER,
-            )
-
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "✅ New company created!\n\n"
-                    f"🏢 <b>{company.title}</b>\n"
-                    f"👑 Owner: {owner_employee.name}\n"
-                    f"🔑 Office code (share with your team): "
-                    f"<code>{company.office_code}</code>\n\n"
-                    "Employees join with:\n"
-                    f"<code>/join_company {company.office_code} Their Name</code>\n\n"
-                    "See all your companies with:\n"
-                    "<code>/my_companies</code>"
-                ),
-            )
-            return {"ok": True}
-
-        # --- 5) /my_companies ---
-        if text.startswith("/my_companies"):
-            owner_tg_id = from_user.id
-            companies = await get_companies_by_owner(owner_tg_id)
-
-            if not companies:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "You don't own any companies yet.\n\n"
-                        "Create one with:\n"
-                        "<code>/owner_setup My Company Name</code>"
-                    ),
-                )
-                return {"ok": True}
-
-            lines = ["📋 <b>Your companies:</b>"]
-            for c in companies:
-                lines.append(
-                    f"• {c.title} — code: <code>{c.office_code}</code>"
-                )
-
-            lines.append(
-                "\nDelete one with:\n"
-                "<code>/delete_company OFFICE_CODE</code>\n"
-                "Connect automations with:\n"
-                "<code>/connect_webhook OFFICE_CODE https://your-automation-url</code>"
-            )
-
-            await bot.send_message(
-                chat_id=chat_id,
-                text="\n".join(lines),
-            )
+        if settings.WEBHOOK_ASYNC_MODE:
+            await update_queue.submit(update.chat_id, update)
             return {"ok": True}
 
-        # --- 6) /delete_company OFFICE_CODE ---
-        if text.startswith("/delete_company"):
-            parts = text.split(maxsplit=1)
-            if len(parts) < 2:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "To delete a company, use:\n"
-                        "<code>/delete_company OFFICE_CODE</code>"
-                    ),
-                )
-                return {"ok": True}
-
-            code = parts[1].strip().upper()
-            company = await get_company_by_code(code)
-            if not company:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text="❌ I couldn't find a company with that office code.",
-                )
-                return {"ok": True}
-
-            if company.owner_telegram_id != from_user.id:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "❌ You are not the owner of this company, "
-                        "so you can't delete it."
-                    ),
-                )
-                return {"ok": True}
-
-            deleted_count = await delete_company_and_related(company.id)
-            if deleted_count == 0:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text="Something went wrong while deleting that company.",
-                )
-                return {"ok": True}
-
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "🗑️ Company deleted.\n\n"
-                    f"🏢 <b>{company.title}</b>\n"
-                    f"🔑 Code: <code>{company.office_code}</code>\n\n"
-                    "All employees, jobs, and integrations linked to this company were removed."
-                ),
-            )
-            return {"ok": True}
-
-        # --- 7) /connect_webhook OFFICE_CODE URL ---
-        if text.startswith("/connect_webhook"):
-            parts = text.split(maxsplit=2)
-            if len(parts) < 3:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "Connect an automation webhook to a company:\n\n"
-                        "<code>/connect_webhook OFFICE_CODE https://your-automation-url</code>\n\n"
-                        "Example (n8n, Zapier, Make, etc.). "
-                        "On each new job, Artlix will POST JSON to that URL."
-                    ),
-                )
-                return {"ok": True}
-
-            office_code = parts[1].strip().upper()
-            webhook_url = parts[2].strip()
-
-            company = await get_company_by_code(office_code)
-            if not company:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text="❌ I couldn't find a company with that office code.",
-                )
-                return {"ok": True}
-
-            if company.owner_telegram_id != from_user.id:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "❌ Only the owner of this company can connect webhooks."
-                    ),
-                )
-                return {"ok": True}
-
-            await set_company_webhook(
-                company_id=company.id,
-                url=webhook_url,
-                name="default_webhook",
-            )
-
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "✅ Webhook connected!\n\n"
-                    f"🏢 <b>{company.title}</b>\n"
-                    f"🔗 URL: <code>{webhook_url}</code>\n\n"
-                    "From now on, each new job for this company will be sent "
-                    "as JSON to that URL."
-                ),
-            )
-            return {"ok": True}
+        inline_reply = await process_update(
+            update,
+            inline_reply=settings.WEBHOOK_INLINE_REPLY,
+        )
+    except BaseException:
+        # No 200 (an error, or the request was cancelled): Telegram sends
+        # this update again, and that copy has to be handled, not skipped
+        await update_deduplicator.release(update.update_id)
+        raise
+    return inline_reply or {"ok": True}
 
-        # --- 8) /join_company OFFICE_CODE Your Name ---
-        if text.startswith("/join_company"):
-            parts = text.split(maxsplit=2)
-            if len(parts) < 3:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "To join a company, use:\n"
-                        "<code>/join_company OFFICE_CODE Your Name</code>"
-                    ),
-                )
-                return {"ok": True}
 
-            office_code = parts[1].strip().upper()
-            employee_name = parts[2].strip()
+class _InlineReply:
+    """
+    Holds back the first reply of an update so it can go out in the webhook
+    response body (a Bot API method call) instead of its own HTTPS request.
 
-            company = await get_company_by_code(office_code)
-            if not company:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "❌ I couldn't find a company with that office code.\n"
-                        "Double-check the code with your owner."
-                    ),
-                )
-                return {"ok": True}
+    Later replies use the Bot API. If a later reply goes to the same chat,
+    the held one is sent first so the chat still sees them in order.
+    """
 
-            employee = await get_or_create_employee_by_telegram(
-                company_id=company.id,
-                telegram_id=from_user.id,
-                name=employee_name,
-            )
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.pending: Optional[str] = None
+        self.used = False
+
+    async def reply(self, text: str) -> None:
+        if not self.used:
+            self.used = True
+            self.pending = text
+            return
+
+        if self.pending is not None:
+            first, self.pending = self.pending, None
+            await outbound_sender.send(bot, self.chat_id, first)
+        await outbound_sender.send(bot, self.chat_id, text)
+
+    def response(self) -> Optional[dict]:
+        if self.pending is None:
+            return None
+        return {
+            "method": "sendMessage",
+            "chat_id": self.chat_id,
+            "text": self.pending,
+            "parse_mode": PARSE_MODE,
+        }
+
+
+async def process_update(update: LeanUpdate, inline_reply: bool = False) -> Optional[dict]:
+    """
+    Run the bot logic for one update through the command registry
+    (see app/telegram/handlers):
 
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "✅ You’re now linked to this company.\n\n"
-                    f"🏢 <b>{company.title}</b>\n"
-                    f"👷 Employee: {employee.name}\n\n"
-                    "Now just send me job requests as text (who / what / where / when), "
-                    "and I’ll capture them as jobs.\n\n"
-                    "If you ever need to leave, use:\n"
-                    "<code>/leave_company</code>"
-                ),
-            )
-            return {"ok": True}
+      • /start
+      • /owner_setup My Company Name
+      • /new_company My Other Company
+      • /my_companies
+      • /delete_company OFFICE_CODE
+      • /connect_webhook OFFICE_CODE URL
+      • /keywords OFFICE_CODE [add|remove INTENT word, word]
+      • /timezone OFFICE_CODE [Area/City]
+      • /digest OFFICE_CODE
+      • /jobs OFFICE_CODE [status:S employee:ID from:DAY to:DAY next:CURSOR]
+      • /join_company OFFICE_CODE Your Name
+      • /leave_company
+      • any other text → try to capture as a job (webhooks go via the outbox)
 
-        # --- 9) /leave_company ---
-        if text.startswith("/leave_company"):
-            deleted = await delete_employee_by_telegram(from_user.id)
-            if deleted == 0:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=(
-                        "You are not currently linked to any company.\n\n"
-                        "To join one, use:\n"
-                        "<code>/join_company OFFICE_CODE Your Name</code>"
-                    ),
-                )
-                return {"ok": True}
+    With `inline_reply`, the first reply is returned as a Bot API method
+    call for the webhook response instead of being sent; otherwise
+    returns None.
+    """
+    if update.kind is None or update.user is None or update.user.is_bot:
+        return None
 
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "✅ You have left your company.\n\n"
-                    "If you want to join another company later, use:\n"
-                    "<code>/join_company OFFICE_CODE Your Name</code>"
-                ),
-            )
-            return {"ok": True}
+    chat_id = update.chat_id
+    held = _InlineReply(chat_id) if inline_reply else None
 
-        # --- 10) Any other text → treat as job from an employee ---
-        employee = await get_employee_by_telegram(telegram_id=from_user.id)
-        if not employee:
-            await bot.send_message(
-                chat_id=chat_id,
-                text=(
-                    "I don't know which company you're in yet.\n\n"
-                    "Ask your owner for the office code, then run:\n"
-                    "<code>/join_company OFFICE_CODE Your Name</code>"
-                ),
-            )
-            return {"ok": True}
+    async def reply(text: str) -> None:
+        # Queued behind Telegram's rate limits; the handler doesn't wait for it
+        await outbound_sender.send(bot, chat_id, text)
 
-        classification = classify_message_and_build_job(text)
-        if not classification.is_job:
-            await bot.send_message(
+    started = time.perf_counter()
+    command = "error"
+    try:
+        command = await registry.dispatch(
+            CommandContext(
                 chat_id=chat_id,
-                text=(
-                    "I couldn't understand this as a job yet.\n"
-                    "Try sending something like:\n"
-                    "<i>\"Pouring concrete for John at 123 Main on Friday morning\"</i>"
-                ),
-            )
-            return {"ok": True}
-
-        job = await create_job(
-            company_id=employee.company_id,
-            employee_id=employee.id,
-            title=classification.title,
-            description=classification.description,
-            scheduled_for=classification.scheduled_for,
-            client_name=classification.client_name,
-            location=classification.location,
-            raw_text=text,
-        )
-
-        when_str = job.scheduled_for.isoformat() if job.scheduled_for else "unscheduled"
-
-        await bot.send_message(
-            chat_id=chat_id,
-            text=(
-                "✅ Job captured!\n\n"
-                f"📋 <b>{job.job_type}</b>\n"
-                f"👤 Client: {job.client_name or 'N/A'}\n"
-                f"📍 Location: {job.location or 'N/A'}\n"
-                f"🗓 When: {when_str}\n\n"
-                "If you connected a webhook, this job was also sent to your automation."
-            ),
-        )
-
-        # --- 11) Send job to all webhooks for this company ---
-        try:
-            webhooks = await get_company_webhooks(company_id=employee.company_id)
-            if webhooks:
-                payload = {
-                    "event": "job_created",
-                    "company_id": str(employee.company_id),
-                    "job": {
-                        "id": str(job.id),
-                        "job_type": job.job_type,
-                        "client_name": job.client_name,
-                        "location": job.location,
-                        "scheduled_for": job.scheduled_for.isoformat()
-                        if job.scheduled_for
-                        else None,
-                        "notes": job.notes,
-                        "raw_text": job.raw_text,
-                        "created_at": job.created_at.isoformat(),
-                        "status": job.status,
-                    },
-                    "telegram": {
-                        "user_id": from_user.id,
-                        "username": from_user.username,
-                        "first_name": from_user.first_name,
-                        "last_name": from_user.last_name,
-                    },
-                }
-
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    for wh in webhooks:
-                        url = wh.get("url")
-                        if not url:
-                            continue
-                        try:
-                            resp = await client.post(url, json=payload)
-                            print(
-                                "[webhook] sent to",
-                                url,
-                                "status",
-                                resp.status_code,
-                            )
-                        except Exception as e:
-                            print(
-                                "[webhook] error sending to",
-                                url,
-                                "error:",
-                                repr(e),
-                            )
-        except Exception as e:
-            print("[webhook] general error:", repr(e))
-
+                user=update.user,
+                text=update.text.strip(),
+                reply=held.reply if held else reply,
+                message_id=update.message_id,
+                is_edit=update.is_edit,
+                bot=bot,
+            )
+        ) or "ignored"
     except Exception as e:
         # Don't let the whole webhook crash
         print("[telegram_webhook] error while handling update:", repr(e))
+    update_seconds.observe(time.perf_counter() - started, command=command)
+
+    return held.response() if held else None
+
 
-    return {"ok": True}
+update_queue = UpdateQueue(
+    process_update,
+    workers=settings.UPDATE_WORKERS,
+    maxsize=settings.UPDATE_QUEUE_MAXSIZE,
+)
+
+metrics.gauge_func(
+    "artlix_update_queue_depth",
+    "Updates waiting for a worker in async webhook mode.",
+    update_queue.depth,
+)
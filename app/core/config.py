@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -20,6 +21,155 @@ class Settings(BaseSettings):
     # 🔹 Optional: secret token for Telegram webhook security
     WEBHOOK_SECRET_TOKEN: str | None = None
 
+    # 🔹 Optional: Bot API server to call instead of api.telegram.org
+    #    (a self-hosted telegram-bot-api, or the load harness's fake one)
+    TELEGRAM_API_BASE_URL: str | None = None
+
+    # 🔹 Where companies, employees, jobs and the outbox live:
+    #    "mongo" (default) or "memory" (process-local, for tests and benchmarks)
+    STORAGE_BACKEND: Literal["mongo", "memory"] = "mongo"
+
+    # 🔹 Create missing MongoDB indexes (and check query plans) at startup
+    ENSURE_INDEXES_ON_STARTUP: bool = True
+
+    # 🔹 Log one line per incoming Telegram update
+    LOG_UPDATES: bool = False
+
+    # 🔹 Ack Telegram right away and handle updates in background workers
+    WEBHOOK_ASYNC_MODE: bool = False
+
+    # 🔹 Send the first reply of an update in the webhook HTTP response
+    #    instead of a separate Bot API call (ignored in async mode)
+    WEBHOOK_INLINE_REPLY: bool = False
+
+    # 🔹 Max updates waiting in the in-process queue (split across workers)
+    UPDATE_QUEUE_MAXSIZE: int = 1000
+
+    # 🔹 Number of update workers; each chat is always handled by the same one
+    UPDATE_WORKERS: int = 8
+
+    # 🔹 Seconds to wait for queued updates to finish on shutdown
+    UPDATE_DRAIN_TIMEOUT: float = 30.0
+
+    # 🔹 Outbound Telegram messages (msgs/sec and bursts): Telegram allows
+    #    about 30/s per bot, 1/s per private chat and 20/min per group
+    TELEGRAM_SEND_RATE: float = 25.0
+    TELEGRAM_SEND_BURST: int = 25
+    TELEGRAM_CHAT_SEND_RATE: float = 1.0
+    TELEGRAM_CHAT_SEND_BURST: int = 3
+    TELEGRAM_GROUP_SEND_RATE: float = 20 / 60
+
+    # 🔹 Outbound Telegram: Bot API calls in flight, queued messages before
+    #    the oldest are dropped (notifications first), and retries of a
+    #    message answered with 429
+    TELEGRAM_SEND_CONCURRENCY: int = 8
+    TELEGRAM_SEND_QUEUE_MAXSIZE: int = 5000
+    TELEGRAM_SEND_MAX_RETRIES: int = 3
+
+    # 🔹 "New job" alerts to owners: the first goes out right away, the rest
+    #    are summed up once per window, or sooner after this many (0 = no batching)
+    OWNER_NOTIFY_WINDOW_SECONDS: float = 30.0
+    OWNER_NOTIFY_MAX_EVENTS: int = 20
+
+    # 🔹 Outbound webhooks: per-request timeout, global and per-host concurrency
+    WEBHOOK_TIMEOUT_SECONDS: float = 5.0
+    WEBHOOK_MAX_IN_FLIGHT: int = 100
+    WEBHOOK_MAX_PER_HOST: int = 10
+
+    # 🔹 Optional n8n instance that also receives job-created events
+    N8N_BASE_URL: str | None = None
+    N8N_WEBHOOK_SECRET: str | None = None
+
+    # 🔹 Outbox dispatcher: batch size, idle poll interval and claim lease
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_LEASE_SECONDS: float = 60.0
+    # 🔹 Records being delivered at once; a freed slot is refilled right away
+    OUTBOX_MAX_IN_FLIGHT: int = 200
+
+    # 🔹 Outbox retries: attempts before dead-letter, exponential backoff bounds
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_BACKOFF_BASE_SECONDS: float = 5.0
+    OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+
+    # 🔹 How long delivered outbox records are kept before Mongo expires them
+    OUTBOX_RETENTION_SECONDS: int = 7 * 24 * 3600
+
+    # 🔹 Drop redelivered Telegram updates: size of the in-memory update_id window
+    DEDUP_WINDOW_SIZE: int = 10_000
+
+    # 🔹 Also record update_ids in MongoDB (needed with several app instances)
+    DEDUP_MONGO_ENABLED: bool = False
+    DEDUP_TTL_SECONDS: int = 24 * 3600
+
+    # 🔹 In-process cache of employees by Telegram ID (0 TTL disables it)
+    EMPLOYEE_CACHE_MAX_SIZE: int = 10_000
+    EMPLOYEE_CACHE_TTL_SECONDS: float = 300.0
+    EMPLOYEE_CACHE_NEGATIVE_TTL_SECONDS: float = 30.0
+
+    # 🔹 In-process cache of company owner + timezone, by company ID
+    COMPANY_CACHE_MAX_SIZE: int = 10_000
+    COMPANY_CACHE_TTL_SECONDS: float = 300.0
+    COMPANY_CACHE_NEGATIVE_TTL_SECONDS: float = 30.0
+
+    # 🔹 Per-company intent vocabularies: compiled matchers kept in memory,
+    #    and how often a cached one re-checks the stored vocabulary version
+    VOCABULARY_CACHE_MAX_SIZE: int = 1000
+    VOCABULARY_RECHECK_SECONDS: float = 30.0
+
+    # 🔹 Job / not-a-job classifier weights (.npy from app.domain.nlp.training);
+    #    unset keeps the message-length heuristic. Threshold defaults to the model's
+    JOB_CLASSIFIER_PATH: str | None = None
+    JOB_CLASSIFIER_THRESHOLD: float | None = None
+
+    # 🔹 Classifier micro-batching: max messages per batch and max wait for one
+    JOB_CLASSIFIER_BATCH_SIZE: int = 32
+    JOB_CLASSIFIER_BATCH_WAIT_MS: float = 2.0
+
+    # 🔹 Intake field extractor ("module:attribute"); with the pool enabled it
+    #    runs in worker processes (default one per CPU core)
+    EXTRACTOR: str = "app.domain.nlp.extractors:RegexExtractor"
+    EXTRACTOR_POOL_ENABLED: bool = False
+    EXTRACTOR_WORKERS: int | None = None
+
+    # 🔹 Extractor pool limits: past the timeout, or with this many calls
+    #    already queued (default 2 per worker), the regex extractor answers
+    EXTRACTOR_TIMEOUT_SECONDS: float = 2.0
+    EXTRACTOR_MAX_PENDING: int | None = None
+
+    # 🔹 Resolved scheduling phrases, per (phrase, day, timezone)
+    SCHEDULE_CACHE_MAX_SIZE: int = 10_000
+
+    # 🔹 Timezone for companies that haven't set one (IANA name)
+    DEFAULT_TIMEZONE: str = "UTC"
+
+    # 🔹 Evening digest to each owner (opt-in: it messages every owner daily):
+    #    local hour it goes out (0-23), how often to check for due ones, and
+    #    how many are prepared at once
+    DAILY_DIGEST_ENABLED: bool = False
+    DAILY_DIGEST_HOUR: int = 18
+    DAILY_DIGEST_POLL_SECONDS: float = 60.0
+    DAILY_DIGEST_CONCURRENCY: int = 16
+
+    # 🔹 How long daily rollups are kept before Mongo expires them
+    ROLLUP_RETENTION_SECONDS: int = 90 * 24 * 3600
+
+    # 🔹 Optional: admin key for the REST /api routes, /metrics and the
+    #    /health/* details, sent as X-API-Key. It reads every company, so
+    #    hand integrations their company's key instead
+    #    (GET /api/companies/{id}/api_key). Unset closes those routes; set
+    #    but blank, the app refuses to start
+    API_KEY: str | None = None
+
+    # 🔹 Job listings (REST and /jobs): default and largest page size
+    JOB_LIST_PAGE_SIZE: int = 20
+    JOB_LIST_MAX_PAGE_SIZE: int = 200
+
+    # 🔹 Job exports: jobs read per database batch, and bytes per chunk
+    #    sent to the client (before gzip)
+    JOB_EXPORT_BATCH_SIZE: int = 1000
+    JOB_EXPORT_CHUNK_BYTES: int = 64 * 1024
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
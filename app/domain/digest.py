@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+from app.domain.models import DailyRollup
+from app.domain.nlp.schedule import get_zone
+
+settings = get_settings()
+
+# Lines listed per breakdown; the rest are summed into "other"
+DIGEST_TOP_N = 5
+
+
+def local_day(tz: Optional[str], moment: Optional[datetime] = None) -> str:
+    """The date (YYYY-MM-DD) it is or was in `tz` at `moment` (naive UTC, default now)."""
+    moment = moment or datetime.utcnow()
+    zone = get_zone(tz or settings.DEFAULT_TIMEZONE)
+    return moment.replace(tzinfo=timezone.utc).astimezone(zone).date().isoformat()
+
+
+def local_day_start(tz: Optional[str], day: date) -> datetime:
+    """Naive UTC moment `day` begins in `tz`, to compare with stored created_at."""
+    zone = get_zone(tz or settings.DEFAULT_TIMEZONE)
+    start = datetime.combine(day, datetime.min.time()).replace(tzinfo=zone)
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def candidate_days(now: Optional[datetime] = None) -> List[str]:
+    """Every date it can be somewhere right now: UTC yesterday, today and tomorrow."""
+    today = (now or datetime.utcnow()).date()
+    return [(today + timedelta(days=d)).isoformat() for d in (-1, 0, 1)]
+
+
+def digest_due(rollup: DailyRollup, hour: int, now: Optional[datetime] = None) -> bool:
+    """
+    True once it's `hour` o'clock or later on the rollup's day, in its
+    timezone, for a rollup that existed by then. A day whose first job came
+    in after the hour gets no digest: the evening one is the only send, and
+    that day's late jobs show up in /digest.
+    """
+    zone = get_zone(rollup.timezone or settings.DEFAULT_TIMEZONE)
+    due_at = datetime.combine(date.fromisoformat(rollup.day), datetime.min.time()) + timedelta(hours=hour)
+    due_at_utc = due_at.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+    if rollup.created_at is not None and rollup.created_at >= due_at_utc:
+        return False
+    return (now or datetime.utcnow()) >= due_at_utc
+
+
+def _breakdown(counts: Dict[str, int], label=lambda key: key) -> List[str]:
+    # edits can bring a count down to 0
+    ranked = sorted(((k, n) for k, n in counts.items() if n), key=lambda kv: (-kv[1], kv[0]))
+    lines = [f"• {label(key)}: {n}" for key, n in ranked[:DIGEST_TOP_N]]
+    rest = sum(n for _, n in ranked[DIGEST_TOP_N:])
+    if rest:
+        lines.append(f"• other: {rest}")
+    return lines
+
+
+def render_digest(title: str, rollup: Optional[DailyRollup], day: str) -> str:
+    """Telegram text of a company's digest for `day`, from its rollup (None = no jobs)."""
+    header = f"📊 <b>Daily digest — {title}</b>\n{day}\n\n"
+    if rollup is None or not rollup.jobs:
+        return header + "No jobs captured."
+
+    parts = [f"<b>Jobs:</b> {rollup.jobs}"]
+    if rollup.budget:
+        parts.append(f"<b>Budget:</b> {rollup.budget:,.0f}")
+    parts.append("\n<b>By type</b>\n" + "\n".join(_breakdown(rollup.by_job_type)))
+    parts.append(
+        "\n<b>By employee</b>\n"
+        + "\n".join(
+            _breakdown(
+                rollup.by_employee,
+                lambda key: rollup.employee_names.get(key) or f"employee …{key[-4:]}",
+            )
+        )
+    )
+    if len(rollup.by_status) > 1:
+        parts.append("\n<b>By status</b>\n" + "\n".join(_breakdown(rollup.by_status)))
+    return header + "\n".join(parts)
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from app.domain.models import Job
+
+
+def build_job_created_payload(job: Job, telegram_user: Optional[dict] = None) -> dict:
+    """
+    JSON body POSTed to company webhooks when a job is created.
+
+    `telegram_user` is the sender as
+    {"user_id", "username", "first_name", "last_name"}.
+    """
+    return {
+        "event": "job_created",
+        "company_id": str(job.company_id),
+        "job": {
+            "id": str(job.id),
+            "job_type": job.job_type,
+            "client_name": job.client_name,
+            "location": job.location,
+            "scheduled_for": job.scheduled_for.isoformat()
+            if job.scheduled_for
+            else None,
+            "notes": job.notes,
+            "raw_text": job.raw_text,
+            "created_at": job.created_at.isoformat(),
+            "status": job.status,
+            "intent": job.intent,
+        },
+        "telegram": telegram_user or {},
+    }
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal
+
+from app.domain.models import Job
+from app.domain.repositories import encode_job_cursor
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# Stored job fields an export reads (the projection; _id always comes back)
+JOB_EXPORT_FIELDS = tuple(
+    name
+    for name in Job.model_fields
+    if name not in ("id", "company_id", "telegram_chat_id", "telegram_message_id")
+)
+
+# One column per stored field, plus the resume cursor of each row
+JOB_EXPORT_COLUMNS = ("id",) + JOB_EXPORT_FIELDS + ("cursor",)
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    # ObjectId and anything else a document may hold
+    return str(value)
+
+
+def export_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A job document as one export row, JSON-ready; its `cursor` resumes after it."""
+    row = {"id": str(doc["_id"])}
+    for name in JOB_EXPORT_FIELDS:
+        row[name] = _value(doc.get(name))
+    row["cursor"] = encode_job_cursor(doc["created_at"], doc["_id"])
+    return row
+
+
+class _Chunker:
+    """Collects encoded rows into chunks of about `chunk_bytes`, gzipped if asked."""
+
+    def __init__(self, chunk_bytes: int, gzip: bool):
+        self.chunk_bytes = chunk_bytes
+        # wbits=31: gzip header and trailer, so the output is a .gz stream
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        self._parts: List[bytes] = []
+        self._size = 0
+
+    def add(self, data: bytes) -> bytes:
+        """Buffer `data`; returns a chunk to send once enough is buffered, else b""."""
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size < self.chunk_bytes:
+            return b""
+        return self._take(final=False)
+
+    def _take(self, *, final: bool) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        if self._compressor is None:
+            return data
+        # Z_SYNC_FLUSH so each chunk decompresses as soon as it arrives
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+    def finish(self) -> bytes:
+        return self._take(final=True)
+
+
+async def stream_job_export(
+    docs: AsyncIterator[Dict[str, Any]],
+    fmt: ExportFormat,
+    *,
+    chunk_bytes: int = 64 * 1024,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Encode job documents as NDJSON or CSV (with a header row) export rows
+    and yield them in chunks of about `chunk_bytes`. Rows are encoded as
+    they come, so only one chunk is held however long the export is.
+    """
+    chunker = _Chunker(chunk_bytes, gzip)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=JOB_EXPORT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        async for doc in docs:
+            writer.writerow(export_row(doc))
+            if buffer.tell() >= chunk_bytes:
+                chunk = chunker.add(buffer.getvalue().encode())
+                buffer.seek(0)
+                buffer.truncate()
+                if chunk:
+                    yield chunk
+        chunker.add(buffer.getvalue().encode())
+    else:
+        async for doc in docs:
+            line = json.dumps(export_row(doc), ensure_ascii=False, separators=(",", ":")) + "\n"
+            chunk = chunker.add(line.encode())
+            if chunk:
+                yield chunk
+
+    tail = chunker.finish()
+    if tail:
+        yield tail
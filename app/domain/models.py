@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Any
+from typing import Any, Dict, List, NamedTuple, Optional
 from enum import Enum
 
 from pydantic import BaseModel, Field
@@ -17,6 +17,8 @@ class Company(BaseModel):
     title: str
     office_code: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # IANA name scheduling phrases are resolved in; None = DEFAULT_TIMEZONE
+    timezone: Optional[str] = None
 
     @property
     def name(self) -> str:
@@ -24,6 +26,28 @@ class Company(BaseModel):
         return self.title
 
 
+class CompanyBrief(NamedTuple):
+    """
+    The company fields message handling needs, read with a projection.
+
+    Our own code wrote the document, so it's taken as is: validating it
+    into a Company costs more than the rest of the lookup.
+    """
+
+    id: Any
+    owner_telegram_id: int
+    # IANA name; None = DEFAULT_TIMEZONE
+    timezone: Optional[str] = None
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "CompanyBrief":
+        return cls(doc["_id"], doc["owner_telegram_id"], doc.get("timezone"))
+
+
+# Projection for CompanyBrief (_id always comes back)
+COMPANY_BRIEF_FIELDS = ("owner_telegram_id", "timezone")
+
+
 class Employee(BaseModel):
     id: Optional[Any] = Field(default=None, alias="_id")
     company_id: Any
@@ -47,4 +71,95 @@ class Job(BaseModel):
 
     raw_text: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+    status: str = "new"
+    # Intent the message was classified as (see app.domain.nlp.analysis.Intent)
+    intent: Optional[str] = None
+
+    # Telegram message the job came from; edits of it update this job
+    telegram_chat_id: Optional[int] = None
+    telegram_message_id: Optional[int] = None
+
+
+class JobSummary(NamedTuple):
+    """A job as listings show it, read with a projection (no raw text or notes)."""
+
+    id: Any
+    created_at: datetime
+    created_by_employee_id: Any
     status: str = "new"
+    job_type: Optional[str] = None
+    client_name: Optional[str] = None
+    location: Optional[str] = None
+    scheduled_for: Optional[datetime] = None
+    budget: Optional[float] = None
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "JobSummary":
+        return cls(
+            doc["_id"],
+            doc["created_at"],
+            doc.get("created_by_employee_id"),
+            doc.get("status") or "new",
+            doc.get("job_type"),
+            doc.get("client_name"),
+            doc.get("location"),
+            doc.get("scheduled_for"),
+            doc.get("budget"),
+        )
+
+
+# Projection for JobSummary (_id always comes back)
+JOB_SUMMARY_FIELDS = (
+    "created_at",
+    "created_by_employee_id",
+    "status",
+    "job_type",
+    "client_name",
+    "location",
+    "scheduled_for",
+    "budget",
+)
+
+
+class JobPage(NamedTuple):
+    """One page of a job listing, newest first."""
+
+    jobs: List[JobSummary]
+    # Pass back as `cursor` for the next page; None on the last one
+    next_cursor: Optional[str] = None
+
+
+class Vocabulary(BaseModel):
+    """A company's own intent keywords, on top of the built-in ones."""
+
+    id: Optional[Any] = Field(default=None, alias="_id")
+    company_id: Any
+    # Bumped on every change; cached matchers compare it to know when to rebuild
+    version: int = 0
+    # intent value -> keywords, e.g. {"job_intake": ["drywall", "rough-in"]}
+    keywords: Dict[str, List[str]] = Field(default_factory=dict)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class DailyRollup(BaseModel):
+    """A company's job counts for one of its local days, kept up to date as jobs come in."""
+
+    id: Optional[Any] = Field(default=None, alias="_id")
+    company_id: Any
+    # Company-local date, "YYYY-MM-DD"
+    day: str
+    # The company's timezone when the day's first job came in
+    timezone: Optional[str] = None
+    jobs: int = 0
+    budget: float = 0.0
+    by_status: Dict[str, int] = Field(default_factory=dict)
+    by_job_type: Dict[str, int] = Field(default_factory=dict)
+    # employee id (str) -> jobs, and -> name as of their latest job
+    by_employee: Dict[str, int] = Field(default_factory=dict)
+    employee_names: Dict[str, str] = Field(default_factory=dict)
+    # When the day's first job came in (naive UTC)
+    created_at: Optional[datetime] = None
+    # Set when the evening digest is claimed for sending
+    digest_sent_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,185 @@
+"""
+One pass over a message that everything downstream reads from.
+
+analyze_message() lowercases the text once, runs each precompiled
+pattern once and returns a MessageAnalysis with the intake fields,
+intent and date hint. parse_job_intake() and classify_message() are
+thin views over it.
+"""
+import re
+from datetime import datetime
+from enum import Enum
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+from app.domain.nlp.keywords import KeywordMatcher
+from app.domain.nlp.schedule import parse_schedule
+
+
+class Intent(str, Enum):
+    JOB_INTAKE = "job_intake"
+    SCHEDULING = "scheduling"
+    FOLLOW_UP = "follow_up"
+    DAILY_DIGEST = "daily_digest"
+    UNKNOWN = "unknown"
+
+
+# Checked in this order; the first intent with a keyword in the text wins
+INTENT_KEYWORDS: Tuple[Tuple[Intent, Tuple[str, ...]], ...] = (
+    (Intent.JOB_INTAKE, ("new job", "job:", "lead", "estimate", "quote", "renovation", "reno")),
+    (Intent.SCHEDULING, ("schedule", "book", "appointment", "site visit")),
+    (Intent.FOLLOW_UP, ("follow up", "follow-up", "check in", "status update")),
+    (Intent.DAILY_DIGEST, ("daily report", "digest", "summary of today")),
+)
+
+
+def build_intent_matcher(
+    extra: Optional[Mapping[str, Iterable[str]]] = None,
+) -> KeywordMatcher[Intent]:
+    """
+    Matcher for INTENT_KEYWORDS plus `extra` keywords per intent value
+    (e.g. a company's {"job_intake": ["drywall", "pour"]}).
+    Unknown intent names in `extra` are ignored.
+    """
+    extra = extra or {}
+    return KeywordMatcher(
+        [(intent, (*keywords, *extra.get(intent.value, ()))) for intent, keywords in INTENT_KEYWORDS]
+    )
+
+
+DEFAULT_INTENT_MATCHER = build_intent_matcher()
+
+# Quick date hint kept on the analysis ("tomorrow" wins if both appear);
+# scheduled_for() understands far more (see schedule.py)
+DATE_HINT_DAYS = {"tomorrow": 1, "next week": 7}
+
+# "label: value" fields. The value runs to the next comma, newline or the
+# end of the text. Each pattern has a lowercase-only form, used on the
+# lowered text (much cheaper than IGNORECASE), and an IGNORECASE form for
+# non-ASCII text, where lowering can shift character positions.
+_FIELD_PATTERNS = {
+    "client_name": r"(?:client|name)\s*[:\-]\s*(.[^,\n]*)",
+    "job_type": r"(?:job|for)\s*[:\-]?\s*(.[^,\n]*)",
+    "location": r"(?:address|at)\s*[:\-]?\s*(.[^,\n]*)",
+}
+_FIELDS_LOWER = [(name, re.compile(p)) for name, p in _FIELD_PATTERNS.items()]
+_FIELDS_ANY_CASE = [(name, re.compile(p, re.IGNORECASE)) for name, p in _FIELD_PATTERNS.items()]
+
+# Case-sensitive on purpose: "5k" and "5K" count, "5 THOUSAND" doesn't
+_BUDGET_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(k|K|thousand|\$)")
+
+_TOKEN_RE = re.compile(r"[\w$]+(?:[.'\-][\w$]+)*")
+
+
+class MessageAnalysis:
+    """Everything extracted from one message; `text` is the stripped input."""
+
+    __slots__ = (
+        "text",
+        "lowered",
+        "intent",
+        "client_name",
+        "job_type",
+        "location",
+        "budget",
+        "date_hint",
+        "_tokens",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        lowered: str,
+        intent: Intent,
+        client_name: Optional[str] = None,
+        job_type: Optional[str] = None,
+        location: Optional[str] = None,
+        budget: Optional[float] = None,
+        date_hint: Optional[str] = None,
+    ):
+        self.text = text
+        self.lowered = lowered
+        self.intent = intent
+        self.client_name = client_name
+        self.job_type = job_type
+        self.location = location
+        self.budget = budget
+        # "tomorrow", "next week" or None
+        self.date_hint = date_hint
+        self._tokens: Optional[Tuple[str, ...]] = None
+
+    @property
+    def tokens(self) -> Tuple[str, ...]:
+        """Lowercased word tokens, for classifiers and keyword matchers (computed once)."""
+        if self._tokens is None:
+            self._tokens = tuple(_TOKEN_RE.findall(self.lowered))
+        return self._tokens
+
+    def scheduled_for(
+        self,
+        now: Optional[datetime] = None,
+        tz: Optional[str] = None,
+    ) -> Optional[datetime]:
+        """When the message's scheduling phrase happens in `tz`; see app.domain.nlp.schedule."""
+        return parse_schedule(self.lowered, tz, now)
+
+
+def detect_intent(
+    lowered: str,
+    matcher: KeywordMatcher[Intent] = DEFAULT_INTENT_MATCHER,
+) -> Intent:
+    """Intent of already-lowercased text."""
+    return matcher.first(lowered) or Intent.UNKNOWN
+
+
+def _date_hint(lowered: str) -> Optional[str]:
+    for phrase in DATE_HINT_DAYS:
+        if phrase in lowered:
+            return phrase
+    return None
+
+
+def _budget(text: str) -> Optional[float]:
+    m = _BUDGET_RE.search(text)
+    if not m:
+        return None
+    amount = float(m.group(1))
+    if m.group(2).lower() in ("k", "thousand"):
+        amount *= 1000
+    return amount
+
+
+def analyze_message(
+    text: Optional[str],
+    matcher: KeywordMatcher[Intent] = DEFAULT_INTENT_MATCHER,
+) -> MessageAnalysis:
+    """`matcher` decides the intent; pass a company's matcher to use its vocabulary."""
+    t = (text or "").strip()
+    lowered = t.lower()
+
+    if t.isascii():
+        # Positions line up, so spans found in `lowered` slice `t`
+        haystack, patterns = lowered, _FIELDS_LOWER
+    else:
+        haystack, patterns = t, _FIELDS_ANY_CASE
+    fields = {}
+    for name, pattern in patterns:
+        m = pattern.search(haystack)
+        fields[name] = t[m.start(1):m.end(1)].strip() if m else None
+
+    return MessageAnalysis(
+        text=t,
+        lowered=lowered,
+        intent=detect_intent(lowered, matcher),
+        budget=_budget(t),
+        date_hint=_date_hint(lowered),
+        **fields,
+    )
+
+
+def analyze_messages(
+    texts: Iterable[Optional[str]],
+    matcher: KeywordMatcher[Intent] = DEFAULT_INTENT_MATCHER,
+) -> List[MessageAnalysis]:
+    """Analyze many messages at once, e.g. to backfill stored jobs."""
+    analyze = analyze_message
+    return [analyze(text, matcher) for text in texts]
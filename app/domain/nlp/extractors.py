@@ -0,0 +1,48 @@
+"""
+Pluggable intake-field extractors.
+
+An extractor turns message text into a ParsedJob. The configured one
+(EXTRACTOR, as "module:attribute") may run in worker processes (see
+app.infrastructure.extraction_pool), so it has to be importable by
+path, return picklable results and load anything expensive in
+warm_up() rather than at import time.
+"""
+import importlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.domain.nlp.parser import ParsedJob, parse_job_intake
+
+REGEX_EXTRACTOR = "app.domain.nlp.extractors:RegexExtractor"
+
+
+class Extractor(ABC):
+    name = "extractor"
+
+    def warm_up(self) -> None:
+        """Load models, build tables etc.; called once per process before extract()."""
+
+    @abstractmethod
+    def extract(self, text: str, tz: Optional[str] = None) -> ParsedJob:
+        """`tz` is the company's IANA timezone, for resolving dates and times."""
+
+
+class RegexExtractor(Extractor):
+    """The precompiled-regex pass of analyze_message(); cheap enough to run inline."""
+
+    name = "regex"
+
+    def extract(self, text: str, tz: Optional[str] = None) -> ParsedJob:
+        return parse_job_intake(text, tz)
+
+
+def load_extractor(path: str) -> Extractor:
+    """Import "module:attribute": an Extractor subclass (instantiated) or instance."""
+    module_name, _, attribute = path.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"extractor must be 'module:attribute', got {path!r}")
+    target = getattr(importlib.import_module(module_name), attribute)
+    extractor = target() if isinstance(target, type) else target
+    if not isinstance(extractor, Extractor):
+        raise TypeError(f"{path} is not an Extractor")
+    return extractor
@@ -0,0 +1,210 @@
+"""
+Job / not-a-job classifier: a hashed n-gram logistic regression.
+
+Features are word unigrams, word bigrams and character trigrams of each
+word, hashed (crc32) into a fixed number of buckets, so the model is one
+float32 weight per bucket plus a bias. The weights live in a .npy file
+that is memory-mapped at startup (pages load on first use and are
+shared between worker processes); a JSON sidecar next to it holds the
+feature version and the recommended threshold.
+
+Train one with `python -m app.domain.nlp.training`.
+"""
+import asyncio
+import json
+import zlib
+from pathlib import Path
+from typing import Callable, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+# Bump when hashed_features() changes; models trained on another version are refused
+FEATURE_VERSION = 1
+DEFAULT_BUCKETS = 1 << 18
+
+# The heuristic used without a model: anything at least this long is a job
+MIN_JOB_LENGTH = 15
+
+Tokens = Sequence[str]
+
+
+def iter_hashed_features(tokens: Tokens, n_buckets: int) -> Iterator[int]:
+    """Bucket indices of a message's n-grams; `n_buckets` must be a power of two."""
+    mask = n_buckets - 1
+    crc32 = zlib.crc32
+    previous = "<s>"
+    for token in tokens:
+        yield crc32(f"w:{token}".encode()) & mask
+        yield crc32(f"b:{previous} {token}".encode()) & mask
+        padded = f"<{token}>"
+        for i in range(len(padded) - 2):
+            yield crc32(f"c:{padded[i:i + 3]}".encode()) & mask
+        previous = token
+
+
+def hashed_features(tokens: Tokens, n_buckets: int) -> np.ndarray:
+    return np.fromiter(iter_hashed_features(tokens, n_buckets), dtype=np.intp)
+
+
+def weights_path(path: Path) -> Path:
+    """Where np.save() really writes `path`: it appends .npy unless already there."""
+    return path if path.suffix == ".npy" else path.with_name(path.name + ".npy")
+
+
+def metadata_path(weights_path: Path) -> Path:
+    return weights_path.with_suffix(".json")
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30.0, 30.0)))
+
+
+class HashedNgramClassifier:
+    """
+    `weights` has n_buckets + 1 entries; the last one is the bias.
+    Probabilities are P(message is a job).
+    """
+
+    def __init__(self, weights: np.ndarray, threshold: float = 0.5):
+        n_buckets = len(weights) - 1
+        if n_buckets <= 0 or n_buckets & (n_buckets - 1):
+            raise ValueError(f"expected 2**k + 1 weights, got {len(weights)}")
+        self.weights = weights
+        self.n_buckets = n_buckets
+        self.bias = float(weights[-1])
+        self.threshold = threshold
+
+    @classmethod
+    def load(cls, path: Path, threshold: Optional[float] = None) -> "HashedNgramClassifier":
+        meta = json.loads(metadata_path(path).read_text())
+        if meta.get("feature_version") != FEATURE_VERSION:
+            raise ValueError(
+                f"{path} uses feature version {meta.get('feature_version')}, "
+                f"this code expects {FEATURE_VERSION}; retrain it"
+            )
+        weights = np.load(path, mmap_mode="r")
+        return cls(weights, threshold if threshold is not None else meta.get("threshold", 0.5))
+
+    @staticmethod
+    def save(path: Path, weights: np.ndarray, meta: dict) -> None:
+        path = weights_path(path)
+        np.save(path, weights.astype(np.float32))
+        metadata_path(path).write_text(
+            json.dumps({**meta, "feature_version": FEATURE_VERSION}, indent=2) + "\n"
+        )
+
+    def score_batch(self, token_lists: Sequence[Tokens]) -> np.ndarray:
+        """P(job) for each message, in one vectorized pass over all their features."""
+        rows = [hashed_features(tokens, self.n_buckets) for tokens in token_lists]
+        lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+        indices = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+        logits = np.bincount(
+            np.repeat(np.arange(len(rows)), lengths),
+            weights=self.weights[indices],
+            minlength=len(rows),
+        )
+        return _sigmoid(logits + self.bias)
+
+    def score(self, tokens: Tokens) -> float:
+        return float(self.score_batch([tokens])[0])
+
+
+Item = TypeVar("Item")
+
+
+class MicroBatcher(Generic[Item]):
+    """
+    Collects concurrent score requests and runs them through `fn` together:
+    a batch goes out when it reaches `max_batch` items or `max_wait_seconds`
+    after its first item arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Item]], Sequence[float]],
+        *,
+        max_batch: int,
+        max_wait_seconds: float,
+    ):
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[Item, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Item) -> float:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch or self.max_wait_seconds <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(float(result))
+
+
+# Loaded by the app lifespan when JOB_CLASSIFIER_PATH is set
+_classifier: Optional[HashedNgramClassifier] = None
+_batcher: Optional[MicroBatcher[Tokens]] = None
+
+
+def load_job_classifier(
+    path: Optional[str],
+    *,
+    threshold: Optional[float] = None,
+    max_batch: int = 32,
+    max_wait_seconds: float = 0.002,
+) -> Optional[HashedNgramClassifier]:
+    """Load (or with no path, unload) the process-wide classifier."""
+    global _classifier, _batcher
+    if not path:
+        _classifier, _batcher = None, None
+        return None
+    _classifier = HashedNgramClassifier.load(Path(path), threshold)
+    _batcher = MicroBatcher(
+        _classifier.score_batch,
+        max_batch=max_batch,
+        max_wait_seconds=max_wait_seconds,
+    )
+    print(
+        "[job_classifier] loaded",
+        path,
+        "buckets",
+        _classifier.n_buckets,
+        "threshold",
+        _classifier.threshold,
+    )
+    return _classifier
+
+
+def get_job_classifier() -> Optional[HashedNgramClassifier]:
+    return _classifier
+
+
+async def job_probability(tokens: Tokens) -> Optional[float]:
+    """P(job) from the loaded model (micro-batched), or None without one."""
+    if _batcher is None:
+        return None
+    return await _batcher.submit(tokens)
@@ -1,7 +1,8 @@
-import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 
+from app.domain.nlp.analysis import analyze_message
+
 
 class ParsedJob:
     def __init__(
@@ -21,41 +22,21 @@ class ParsedJob:
         self.notes = notes
 
 
-def parse_job_intake(text: str) -> ParsedJob:
-    t = text.strip()
-
-    client_match = re.search(r"(client|name)\s*[:\-]\s*(.+?)(?:,|\n|$)", t, re.IGNORECASE)
-    client_name = client_match.group(2).strip() if client_match else None
-
-    job_match = re.search(r"(job|for)\s*[:\-]?\s*(.+?)(?:,|\n|$)", t, re.IGNORECASE)
-    job_type = job_match.group(2).strip() if job_match else None
-
-    loc_match = re.search(r"(address|at)\s*[:\-]?\s*(.+?)(?:,|\n|$)", t, re.IGNORECASE)
-    location = loc_match.group(2).strip() if loc_match else None
-
-    budget_match = re.search(r"(\d+(?:\.\d+)?)\s*(k|K|thousand|\$)", t)
-    budget = None
-    if budget_match:
-        num = float(budget_match.group(1))
-        if budget_match.group(2).lower() in ("k", "thousand"):
-            num *= 1000
-        budget = num
-
-    scheduled_for = None
-    now = datetime.utcnow()
-    tl = t.lower()
-    if "tomorrow" in tl:
-        scheduled_for = now + timedelta(days=1)
-    elif "next week" in tl:
-        scheduled_for = now + timedelta(days=7)
-
-    notes = t
-
+def parse_job_intake(
+    text: str,
+    tz: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> ParsedJob:
+    """
+    Intake fields of a message; see analyze_message() for how they're found.
+    Scheduling phrases are resolved in `tz`, the company's timezone.
+    """
+    analysis = analyze_message(text)
     return ParsedJob(
-        client_name=client_name,
-        job_type=job_type,
-        location=location,
-        scheduled_for=scheduled_for,
-        budget=budget,
-        notes=notes,
+        client_name=analysis.client_name,
+        job_type=analysis.job_type,
+        location=analysis.location,
+        scheduled_for=analysis.scheduled_for(now, tz),
+        budget=analysis.budget,
+        notes=analysis.text,
     )
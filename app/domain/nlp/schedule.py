@@ -0,0 +1,346 @@
+"""
+Scheduling expressions: "Friday morning", "the 14th at 3pm", "in two weeks".
+
+find_schedule() scans lowered text for at most one day expression and
+one time expression and returns them as a canonical ScheduleSpec, so
+"on fri 3pm", "on Friday at 3 PM" and "friday 15:00" are the same spec.
+resolve_schedule() turns a spec into a naive UTC datetime against a
+company timezone. Its result only depends on (spec, local day, tz), so
+it is memoized on exactly that: crews repeat the same few phrases all
+day, and each one is resolved once per day per timezone.
+
+A day without a time starts at DEFAULT_HOUR local time; a time without
+a day is today, or tomorrow once that time has passed. Likewise a
+weekday or a date that falls today but has already passed moves on to
+the next one ("friday morning" said Friday afternoon is next Friday).
+
+Settings (DEFAULT_TIMEZONE, SCHEDULE_CACHE_MAX_SIZE) are read on first
+use, not at import, so the NLP modules import without any configuration.
+"""
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import get_settings
+from app.infrastructure.cache import MISSING, TTLCache
+from app.infrastructure.metrics import register_cache
+
+DEFAULT_HOUR = 9
+
+# Day kinds that mean "the next one": once today's has passed, it's the
+# following one. An offset ("today", "in 2 days") is taken as said.
+_ROLLING_DAYS = frozenset(("weekday", "day_of_month", "month_day"))
+
+# (kind, value): ("offset", days) | ("weekday", 0-6) | ("next_weekday", 0-6)
+#              | ("day_of_month", 1-31) | ("month_day", (month, day))
+DaySpec = Tuple[str, object]
+
+
+class ScheduleSpec(NamedTuple):
+    day: Optional[DaySpec]
+    # Minutes after local midnight
+    minutes: Optional[int]
+
+
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+    "mon": 0, "tue": 1, "tues": 1, "wed": 2, "thu": 3, "thur": 3, "thurs": 3,
+    "fri": 4, "sat": 5, "sun": 6,
+}
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "a couple of": 2, "couple of": 2, "a few": 3, "few": 3,
+}
+_RELATIVE_DAYS = {
+    "today": 0, "tonight": 0, "tomorrow": 1, "tmrw": 1, "tmr": 1,
+    "day after tomorrow": 2, "next week": 7,
+}
+_WINDOWS = {
+    "first thing": 7 * 60, "morning": 8 * 60, "noon": 12 * 60, "midday": 12 * 60,
+    "lunch": 12 * 60, "afternoon": 13 * 60, "end of day": 16 * 60, "eod": 16 * 60,
+    "evening": 17 * 60, "tonight": 19 * 60,
+}
+
+_MONTH_NAMES = (
+    r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+_NUMBER = r"\d{1,2}|a couple of|couple of|a few|few|an?|one|two|three|four|five|six|seven|eight|nine|ten"
+
+# Tried in this order; the first pattern that matches anywhere wins
+_DAY_PATTERNS = (
+    ("relative", re.compile(r"\b(day after tomorrow|tomorrow|tmrw|tmr|today|tonight|next week)\b")),
+    ("in", re.compile(rf"\bin\s+({_NUMBER})\s+(days?|weeks?)\b")),
+    (
+        "weekday",
+        # Abbreviations ("sat", "sun", "wed") only after this/next/on
+        re.compile(
+            r"\b(?:(this|next|on)\s+)?(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"
+            r"|\b(this|next|on)\s+(mon|tues?|wed|thu(?:rs?)?|fri|sat|sun)\b\.?"
+        ),
+    ),
+    ("month_day", re.compile(rf"\b({_MONTH_NAMES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b")),
+    ("day_month", re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_NAMES})\b")),
+    # "the 14th"; a bare "5th" is usually a street
+    ("day_of_month", re.compile(r"\bthe\s+(\d{1,2})(?:st|nd|rd|th)\b")),
+)
+
+_TIME_PATTERNS = (
+    ("ampm", re.compile(r"\b(\d{1,2})(?::([0-5]\d))?\s*(a\.?m\.?|p\.?m\.?)(?![a-z])")),
+    ("clock", re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")),
+    # A bare "at 9" is too often an address ("at 9 Harbour Rd")
+    ("oclock", re.compile(r"\b(\d{1,2})\s*(?:o'?clock|sharp)\b")),
+    (
+        "window",
+        re.compile(r"\b(first thing|morning|noon|midday|lunch|afternoon|end of day|eod|evening|tonight)\b"),
+    ),
+)
+
+# Most messages have no scheduling phrase, and running every pattern over
+# every message is what costs. So the text is split into words once, and a
+# pattern only runs if one of its trigger words is among them.
+_TRIGGERS: Dict[bytes, Set[str]] = {}
+
+
+def _triggers(kinds: Tuple[str, ...], words: str) -> None:
+    for word in words.split():
+        _TRIGGERS.setdefault(word.encode(), set()).update(kinds)
+
+
+def _ordinal(n: int) -> str:
+    if n % 10 in (1, 2, 3) and n not in (11, 12, 13):
+        return f"{n}{('st', 'nd', 'rd')[n % 10 - 1]}"
+    return f"{n}th"
+
+
+_triggers(("relative",), "today tonight tomorrow tmrw tmr week")
+_triggers(("in",), "day days week weeks")
+_triggers(
+    ("weekday",),
+    "monday tuesday wednesday thursday friday saturday sunday "
+    "mon tue tues wed thu thur thurs fri sat sun",
+)
+_triggers(
+    ("month_day", "day_month"),
+    "jan january feb february mar march apr april may jun june jul july aug august "
+    "sep sept september oct october nov november dec december",
+)
+_triggers(("day_of_month",), " ".join(_ordinal(n) for n in range(1, 32)))
+_triggers(("oclock",), "oclock clock sharp")
+_triggers(("window",), "first morning noon midday lunch afternoon end eod evening tonight")
+_TRIGGER_WORDS = frozenset(_TRIGGERS)
+
+# Bytes other than a-z and 0-9 become spaces: one C-level pass splits
+# "friday," "(tonight)" "o'clock" and "tomorrow—" into plain words
+_WORD_BYTES = bytes(
+    c if chr(c).isascii() and (chr(c).islower() or chr(c).isdigit()) else 0x20
+    for c in range(256)
+)
+_CLOCK_HINT = re.compile(r"\d:[0-5]\d")
+
+
+def _pattern_kinds(lowered: str) -> Set[str]:
+    kinds: Set[str] = set()
+    words = lowered.encode().translate(_WORD_BYTES).split()
+    for word in _TRIGGER_WORDS.intersection(words):
+        kinds |= _TRIGGERS[word]
+    # Times glued to digits ("3pm", "15:30") aren't words of their own
+    if "am" in lowered or "pm" in lowered or "a.m" in lowered or "p.m" in lowered:
+        kinds.add("ampm")
+    if ":" in lowered and _CLOCK_HINT.search(lowered):
+        kinds.add("clock")
+    return kinds
+
+
+def _number(word: str) -> int:
+    return int(word) if word.isdigit() else _NUMBER_WORDS[word]
+
+
+def _day_spec(kind: str, m: "re.Match[str]") -> Optional[DaySpec]:
+    if kind == "relative":
+        return ("offset", _RELATIVE_DAYS[m.group(1)])
+    if kind == "in":
+        n = _number(m.group(1))
+        return ("offset", n * 7 if m.group(2).startswith("week") else n)
+    if kind == "weekday":
+        prefix = m.group(1) or m.group(3)
+        weekday = _WEEKDAYS[m.group(2) or m.group(4)]
+        return ("next_weekday" if prefix == "next" else "weekday", weekday)
+    if kind == "month_day":
+        month, day = _MONTHS[m.group(1)[:3]], int(m.group(2))
+    elif kind == "day_month":
+        day, month = int(m.group(1)), _MONTHS[m.group(2)[:3]]
+    else:
+        day = int(m.group(1))
+        return ("day_of_month", day) if 1 <= day <= 31 else None
+    return ("month_day", (month, day)) if 1 <= day <= 31 else None
+
+
+def _time_minutes(kind: str, m: "re.Match[str]") -> Optional[int]:
+    if kind == "window":
+        return _WINDOWS[m.group(1)]
+    hour = int(m.group(1))
+    if kind == "ampm":
+        if not 1 <= hour <= 12:
+            return None
+        minute = int(m.group(2) or 0)
+        hour = hour % 12 + (12 if m.group(3).startswith("p") else 0)
+        return hour * 60 + minute
+    if kind == "clock":
+        return hour * 60 + int(m.group(2))
+    # "at 3 o'clock" on a job site is 3pm; 7-12 are mornings
+    if not 1 <= hour <= 12:
+        return None
+    return (hour + 12 if hour < 7 else hour) * 60
+
+
+def find_schedule(lowered: str) -> Optional[ScheduleSpec]:
+    """The scheduling expression in already-lowercased text, or None."""
+    kinds = _pattern_kinds(lowered)
+    if not kinds:
+        return None
+    day = None
+    for kind, pattern in _DAY_PATTERNS:
+        if kind not in kinds:
+            continue
+        m = pattern.search(lowered)
+        if m:
+            day = _day_spec(kind, m)
+            if day is not None:
+                break
+    minutes = None
+    for kind, pattern in _TIME_PATTERNS:
+        if kind not in kinds:
+            continue
+        m = pattern.search(lowered)
+        if m:
+            minutes = _time_minutes(kind, m)
+            if minutes is not None:
+                break
+    if day is None and minutes is None:
+        return None
+    return ScheduleSpec(day, minutes)
+
+
+@lru_cache(maxsize=None)
+def get_zone(tz: str) -> ZoneInfo:
+    """ZoneInfo for an IANA name; unknown names fall back to UTC."""
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        print("[schedule] unknown timezone, using UTC:", tz)
+        return ZoneInfo("UTC")
+
+
+def _add_month(d: date) -> date:
+    return date(d.year + (d.month == 12), d.month % 12 + 1, 1)
+
+
+def _resolve_day(spec: DaySpec, today: date) -> Optional[date]:
+    kind, value = spec
+    if kind == "offset":
+        return today + timedelta(days=value)  # type: ignore[arg-type]
+    if kind in ("weekday", "next_weekday"):
+        day = today + timedelta(days=(value - today.weekday()) % 7)  # type: ignore[operator]
+        # "next friday" is the one in next week, even if this week's is still ahead
+        if kind == "next_weekday" and day.isocalendar()[:2] == today.isocalendar()[:2]:
+            day += timedelta(days=7)
+        return day
+    if kind == "day_of_month":
+        # This month if that day is still ahead, else the next month that has it
+        month_start = today.replace(day=1)
+        for _ in range(12):
+            try:
+                day = month_start.replace(day=value)  # type: ignore[arg-type]
+            except ValueError:
+                day = None
+            if day is not None and day >= today:
+                return day
+            month_start = _add_month(month_start)
+        return None
+    month, day_of_month = value  # type: ignore[misc]
+    for year in (today.year, today.year + 1):
+        try:
+            day = date(year, month, day_of_month)
+        except ValueError:
+            # Feb 29 outside a leap year
+            continue
+        if day >= today:
+            return day
+    return None
+
+
+_schedule_cache: Optional[TTLCache] = None
+
+
+def schedule_cache() -> TTLCache:
+    """(spec, local day, tz) -> naive UTC datetime, or None if the spec has no such date."""
+    global _schedule_cache
+    if _schedule_cache is None:
+        _schedule_cache = TTLCache(
+            max_size=get_settings().SCHEDULE_CACHE_MAX_SIZE,
+            # Keys carry their day, so old entries are never hit again; the
+            # TTL just lets them go before LRU eviction would
+            ttl_seconds=2 * 24 * 3600,
+            negative_ttl_seconds=2 * 24 * 3600,
+        )
+        register_cache("schedule", _schedule_cache)
+    return _schedule_cache
+
+
+def _resolve(spec: ScheduleSpec, today: date, tz: str) -> Optional[datetime]:
+    key = (spec, today, tz)
+    cache = schedule_cache()
+    cached = cache.get(key)
+    if cached is not MISSING:
+        return cached
+    day = today if spec.day is None else _resolve_day(spec.day, today)
+    resolved = None
+    if day is not None:
+        minutes = DEFAULT_HOUR * 60 if spec.minutes is None else spec.minutes
+        local = datetime.combine(day, time(minutes // 60, minutes % 60), get_zone(tz))
+        resolved = local.astimezone(timezone.utc).replace(tzinfo=None)
+    cache.set(key, resolved)
+    return resolved
+
+
+def resolve_schedule(
+    spec: ScheduleSpec,
+    tz: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """
+    When `spec` happens, as a naive UTC datetime (how jobs store times).
+    `now` is naive UTC; `tz` is the company's IANA timezone name
+    (None = DEFAULT_TIMEZONE).
+    """
+    tz = tz or get_settings().DEFAULT_TIMEZONE
+    now = now or datetime.utcnow()
+    today = now.replace(tzinfo=timezone.utc).astimezone(get_zone(tz)).date()
+    resolved = _resolve(spec, today, tz)
+    rolls = spec.day is None or spec.day[0] in _ROLLING_DAYS
+    if rolls and resolved is not None and resolved < now:
+        # "at 3pm" said at 4pm means tomorrow; "the 14th at 3pm" said then
+        # means next month's 14th, as _resolve_day skips today from tomorrow
+        resolved = _resolve(spec, today + timedelta(days=1), tz)
+    return resolved
+
+
+def parse_schedule(
+    lowered: str,
+    tz: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """find_schedule() + resolve_schedule() in one call."""
+    spec = find_schedule(lowered)
+    if spec is None:
+        return None
+    return resolve_schedule(spec, tz, now)
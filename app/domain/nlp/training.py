@@ -0,0 +1,235 @@
+"""
+Offline training for the job classifier (see job_classifier.py).
+
+    python -m app.domain.nlp.training --out models/job_classifier.npy --from-db
+    python -m app.domain.nlp.training --out models/job_classifier.npy --labeled labeled.jsonl
+
+Examples come from two places:
+
+- --labeled: JSON lines of {"text": ..., "is_job": true|false}, e.g.
+  messages an owner reviewed. These always win over weak labels.
+- --from-db: raw_text of stored jobs, weak-labeled from their analysis
+  (intake keywords or client/address/budget fields → job; follow-ups,
+  digests and short chatter → not a job; anything else is skipped).
+  Stored jobs only hold messages that got past the old length check, so
+  short negatives mostly come from --labeled.
+
+The model is logistic regression on hashed n-grams, trained with
+AdaGrad on mini-batches. A held-out 20% is scored against both the
+model and the length heuristic before the weights are written.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.nlp.analysis import Intent, MessageAnalysis, analyze_message
+from app.domain.nlp.job_classifier import (
+    DEFAULT_BUCKETS,
+    MIN_JOB_LENGTH,
+    HashedNgramClassifier,
+    hashed_features,
+    metadata_path,
+    weights_path,
+)
+
+Example = Tuple[str, int]
+
+
+def weak_label(analysis: MessageAnalysis) -> Optional[int]:
+    """1 = job, 0 = not a job, None = too ambiguous to train on."""
+    has_fields = bool(analysis.client_name or analysis.location or analysis.budget is not None)
+    if analysis.intent is Intent.JOB_INTAKE:
+        return 1
+    if analysis.intent in (Intent.FOLLOW_UP, Intent.DAILY_DIGEST):
+        return 0
+    if analysis.intent is Intent.UNKNOWN and has_fields:
+        return 1
+    if len(analysis.tokens) < 4 and not has_fields:
+        return 0
+    return None
+
+
+def read_labeled(path: Path) -> List[Example]:
+    examples = []
+    with path.open() as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["text"], int(bool(row["is_job"]))))
+    return examples
+
+
+async def read_stored_texts(limit: int) -> List[str]:
+    from app.infrastructure.db import jobs_collection
+
+    cursor = jobs_collection.find(
+        {"raw_text": {"$type": "string"}},
+        {"raw_text": 1, "_id": 0},
+    ).limit(limit)
+    return [doc["raw_text"] async for doc in cursor]
+
+
+def weak_examples(texts: Sequence[str]) -> List[Example]:
+    examples = []
+    for text in texts:
+        label = weak_label(analyze_message(text))
+        if label is not None:
+            examples.append((text, label))
+    return examples
+
+
+def merge_examples(labeled: List[Example], weak: List[Example]) -> List[Example]:
+    """Labeled examples override weak labels for the same text; duplicates collapse."""
+    merged: Dict[str, int] = dict(weak)
+    merged.update(labeled)
+    return list(merged.items())
+
+
+def featurize(texts: Sequence[str], n_buckets: int) -> List[np.ndarray]:
+    return [hashed_features(analyze_message(t).tokens, n_buckets) for t in texts]
+
+
+def train(
+    rows: Sequence[np.ndarray],
+    labels: np.ndarray,
+    *,
+    n_buckets: int,
+    epochs: int = 10,
+    batch_size: int = 64,
+    learning_rate: float = 0.3,
+    l2: float = 1e-5,
+    seed: int = 0,
+) -> np.ndarray:
+    """Weights (n_buckets + 1, bias last) of an AdaGrad-trained logistic regression."""
+    rng = np.random.default_rng(seed)
+    w = np.zeros(n_buckets + 1, dtype=np.float64)
+    accumulated = np.full(n_buckets + 1, 1e-8)
+    bias = n_buckets
+
+    for _ in range(epochs):
+        order = rng.permutation(len(rows))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            lengths = np.fromiter((len(rows[i]) for i in batch), dtype=np.intp, count=len(batch))
+            idx = np.concatenate([rows[i] for i in batch]) if lengths.sum() else np.empty(0, np.intp)
+            segments = np.repeat(np.arange(len(batch)), lengths)
+
+            logits = np.bincount(segments, weights=w[idx], minlength=len(batch)) + w[bias]
+            err = 1.0 / (1.0 + np.exp(-np.clip(logits, -30, 30))) - labels[batch]
+
+            touched, inverse = np.unique(idx, return_inverse=True)
+            grad = np.bincount(inverse, weights=err[segments], minlength=len(touched))
+            grad = grad / len(batch) + l2 * w[touched]
+            accumulated[touched] += grad * grad
+            w[touched] -= learning_rate * grad / np.sqrt(accumulated[touched])
+
+            bias_grad = err.mean()
+            accumulated[bias] += bias_grad * bias_grad
+            w[bias] -= learning_rate * bias_grad / np.sqrt(accumulated[bias])
+
+    return w.astype(np.float32)
+
+
+def evaluate(predicted: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    tp = int(np.sum(predicted & (labels == 1)))
+    fp = int(np.sum(predicted & (labels == 0)))
+    fn = int(np.sum(~predicted & (labels == 1)))
+    return {
+        "accuracy": round(float(np.mean(predicted == (labels == 1))), 4) if len(labels) else 0.0,
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 0.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", type=Path, required=True, help="weights .npy to write (.npy is added if missing)")
+    parser.add_argument("--labeled", type=Path, help="JSON lines of {text, is_job}")
+    parser.add_argument("--from-db", action="store_true", help="weak-label stored jobs' raw_text")
+    parser.add_argument("--limit", type=int, default=200_000, help="max stored jobs to read")
+    parser.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS, help="power of two")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.5, help="recommended threshold")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.buckets <= 0 or args.buckets & (args.buckets - 1):
+        parser.error("--buckets must be a power of two")
+    if not args.labeled and not args.from_db:
+        parser.error("give --labeled and/or --from-db")
+    # np.save() appends .npy, and the metadata .json is named after the
+    # weights file, so both come from the name that actually gets written
+    out = weights_path(args.out)
+
+    labeled = read_labeled(args.labeled) if args.labeled else []
+    weak = weak_examples(asyncio.run(read_stored_texts(args.limit))) if args.from_db else []
+    examples = merge_examples(labeled, weak)
+    positives = sum(label for _, label in examples)
+    print(
+        f"[training] {len(examples)} examples ({len(labeled)} labeled, {len(weak)} weak), "
+        f"{positives} jobs / {len(examples) - positives} non-jobs"
+    )
+    if positives == 0 or positives == len(examples):
+        print("[training] need both jobs and non-jobs to train", file=sys.stderr)
+        return 1
+
+    random.Random(args.seed).shuffle(examples)
+    held_out = max(1, len(examples) // 5)
+    train_set, test_set = examples[held_out:], examples[:held_out]
+
+    weights = train(
+        featurize([t for t, _ in train_set], args.buckets),
+        np.array([label for _, label in train_set], dtype=np.float64),
+        n_buckets=args.buckets,
+        epochs=args.epochs,
+        seed=args.seed,
+    )
+
+    classifier = HashedNgramClassifier(weights, args.threshold)
+    test_texts = [t for t, _ in test_set]
+    test_labels = np.array([label for _, label in test_set])
+    scores = classifier.score_batch([analyze_message(t).tokens for t in test_texts])
+    metrics = {
+        "model": evaluate(scores >= args.threshold, test_labels),
+        "length_heuristic": evaluate(
+            np.array([len(t.strip()) >= MIN_JOB_LENGTH for t in test_texts]),
+            test_labels,
+        ),
+    }
+    print("[training] held-out", len(test_set), json.dumps(metrics))
+    labeled_texts = {text for text, _ in labeled}
+    weak_held_out = sum(text not in labeled_texts for text in test_texts)
+    if weak_held_out:
+        # Weak labels come from the same heuristics the model is meant to
+        # replace: scoring well on them is agreement, not accuracy
+        print(
+            f"[training] note: {weak_held_out} of {len(test_set)} held-out examples are "
+            "weak-labeled (--from-db); on those the scores only measure agreement with "
+            "the labeling heuristics. Evaluate with --labeled for real accuracy."
+        )
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    HashedNgramClassifier.save(
+        out,
+        weights,
+        {
+            "threshold": args.threshold,
+            "n_buckets": args.buckets,
+            "examples": len(examples),
+            "trained_at": datetime.utcnow().isoformat(),
+            "held_out": metrics,
+        },
+    )
+    print("[training] wrote", out, "and", metadata_path(out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
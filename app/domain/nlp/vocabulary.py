@@ -0,0 +1,139 @@
+"""
+Per-company intent matchers, compiled lazily and cached.
+
+A company's matcher is INTENT_KEYWORDS plus its own vocabulary (stored
+with a version number, see repositories.add_company_keywords). Cached
+matchers are trusted for VOCABULARY_RECHECK_SECONDS; after that the
+next lookup reads only the version and recompiles if it changed, so
+edits made through another app instance show up within that window.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from app.core.config import get_settings
+from app.domain.nlp.analysis import (
+    DEFAULT_INTENT_MATCHER,
+    Intent,
+    MessageAnalysis,
+    analyze_message,
+    build_intent_matcher,
+)
+from app.domain.nlp.keywords import KeywordMatcher
+from app.domain.repositories import (
+    add_company_keywords,
+    get_company_vocabulary,
+    get_company_vocabulary_version,
+    remove_company_keywords,
+)
+from app.domain.models import Vocabulary
+from app.infrastructure.metrics import register_cache
+
+_settings = get_settings()
+
+
+class _Compiled:
+    __slots__ = ("version", "matcher", "checked_at")
+
+    def __init__(self, version: Optional[int], matcher: KeywordMatcher[Intent], checked_at: float):
+        self.version = version
+        self.matcher = matcher
+        self.checked_at = checked_at
+
+
+class CompanyMatchers:
+    """LRU of compiled matchers by company_id, revalidated by vocabulary version."""
+
+    def __init__(self, *, max_size: int, recheck_seconds: float):
+        self.max_size = max(1, max_size)
+        self.recheck_seconds = recheck_seconds
+        self._data: "OrderedDict[Hashable, _Compiled]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    async def get(self, company_id: Any) -> KeywordMatcher[Intent]:
+        key = str(company_id)
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None and now - entry.checked_at < self.recheck_seconds:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry.matcher
+
+        self.misses += 1
+        version = await get_company_vocabulary_version(company_id)
+        if entry is not None and entry.version == version:
+            entry.checked_at = now
+            self._data.move_to_end(key)
+            return entry.matcher
+
+        vocabulary = await get_company_vocabulary(company_id) if version is not None else None
+        matcher = self.compile(vocabulary)
+        self.rebuilds += 1
+        self._data[key] = _Compiled(
+            vocabulary.version if vocabulary else None,
+            matcher,
+            now,
+        )
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+        return matcher
+
+    @staticmethod
+    def compile(vocabulary: Optional[Vocabulary]) -> KeywordMatcher[Intent]:
+        if vocabulary is None or not any(vocabulary.keywords.values()):
+            # Companies without their own keywords share one matcher
+            return DEFAULT_INTENT_MATCHER
+        return build_intent_matcher(vocabulary.keywords)
+
+    def invalidate(self, company_id: Any) -> None:
+        self._data.pop(str(company_id), None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rebuilds": self.rebuilds,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+company_matchers = CompanyMatchers(
+    max_size=_settings.VOCABULARY_CACHE_MAX_SIZE,
+    recheck_seconds=_settings.VOCABULARY_RECHECK_SECONDS,
+)
+register_cache("company_matcher", company_matchers)
+
+
+async def analyze_for_company(text: str, company_id: Any) -> MessageAnalysis:
+    """analyze_message() with the company's vocabulary deciding the intent."""
+    return analyze_message(text, await company_matchers.get(company_id))
+
+
+async def add_keywords(company_id: Any, intent: Intent, keywords: List[str]) -> Vocabulary:
+    vocabulary = await add_company_keywords(
+        company_id=company_id,
+        intent=intent.value,
+        keywords=keywords,
+    )
+    # Other instances notice the new version within VOCABULARY_RECHECK_SECONDS
+    company_matchers.invalidate(company_id)
+    return vocabulary
+
+
+async def remove_keywords(company_id: Any, intent: Intent, keywords: List[str]) -> Optional[Vocabulary]:
+    vocabulary = await remove_company_keywords(
+        company_id=company_id,
+        intent=intent.value,
+        keywords=keywords,
+    )
+    company_matchers.invalidate(company_id)
+    return vocabulary
@@ -1,21 +1,57 @@
-from datetime import datetime
-from typing import Optional, Union, List
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional, Union, List, Tuple
+import base64
+import binascii
 import random
 import string
 
 from bson import ObjectId
-
-from app.infrastructure.db import (
-    companies_collection,
-    employees_collection,
-    jobs_collection,
-    integrations_collection,
+from bson.errors import InvalidId
+
+from app.core.config import get_settings
+from app.domain.events import build_job_created_payload
+from app.domain.digest import local_day
+from app.domain.models import (
+    COMPANY_BRIEF_FIELDS,
+    Company,
+    CompanyBrief,
+    DailyRollup,
+    Employee,
+    JOB_SUMMARY_FIELDS,
+    Job,
+    JobPage,
+    JobSummary,
+    UserRole,
+    Vocabulary,
 )
-from app.domain.models import Company, Employee, Job, UserRole
+from app.infrastructure import n8n_client
+from app.infrastructure.cache import MISSING, TTLCache
+from app.infrastructure.metrics import register_cache, timed_repository
+from app.infrastructure.storage import DuplicateKeyError, get_storage
 
 
 ObjectIdLike = Union[ObjectId, str]
 
+_settings = get_settings()
+
+# Employee lookups by Telegram ID run on every free-text message,
+# while membership rarely changes. Writers below invalidate it.
+employee_cache = TTLCache(
+    max_size=_settings.EMPLOYEE_CACHE_MAX_SIZE,
+    ttl_seconds=_settings.EMPLOYEE_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=_settings.EMPLOYEE_CACHE_NEGATIVE_TTL_SECONDS,
+)
+register_cache("employee", employee_cache)
+
+# Owner + timezone by company ID: read for every job (see _record_rollup).
+# set_company_timezone and company deletes invalidate it.
+company_brief_cache = TTLCache(
+    max_size=_settings.COMPANY_CACHE_MAX_SIZE,
+    ttl_seconds=_settings.COMPANY_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=_settings.COMPANY_CACHE_NEGATIVE_TTL_SECONDS,
+)
+register_cache("company_brief", company_brief_cache)
+
 
 def _to_object_id(value: ObjectIdLike) -> ObjectId:
     if isinstance(value, ObjectId):
@@ -28,68 +64,189 @@ def _generate_office_code(length: int = 6) -> str:
     return "".join(random.choice(alphabet) for _ in range(length))
 
 
+# Collisions are caught by the storage backend's unique office_code
+# constraint (see indexes.py for Mongo) and retried with a fresh code.
+OFFICE_CODE_ATTEMPTS = 5
+
+
+def _is_office_code_collision(error: DuplicateKeyError) -> bool:
+    return error.key == "office_code"
+
+
 # -------------------- COMPANY --------------------
 
 
+def _new_company_doc(owner_telegram_id: int, title: str, first: bool = False) -> dict:
+    doc = {
+        "_id": ObjectId(),
+        "owner_telegram_id": owner_telegram_id,
+        "title": title,
+        "office_code": _generate_office_code(),
+        "created_at": datetime.utcnow(),
+    }
+    if first:
+        # unique per owner (see indexes.py): one /owner_setup company each
+        doc["first_company"] = True
+    return doc
+
+
+@timed_repository
 async def create_company(
     *,
     owner_telegram_id: int,
     title: str,
 ) -> Company:
-    office_code = _generate_office_code()
+    attempts = 0
+    while True:
+        doc = _new_company_doc(owner_telegram_id, title)
+        try:
+            await get_storage().insert_company(doc)
+            return Company.model_validate(doc)
+        except DuplicateKeyError as e:
+            attempts += 1
+            if not _is_office_code_collision(e) or attempts >= OFFICE_CODE_ATTEMPTS:
+                raise
+
+
+@timed_repository
+async def create_company_with_owner(
+    *,
+    owner_telegram_id: int,
+    title: str,
+    owner_name: str,
+) -> Tuple[Company, Employee]:
+    """
+    Create a company and link its owner as an employee: two round trips,
+    and the owner row is an upsert, so retries never duplicate it.
+    """
+    company = await create_company(owner_telegram_id=owner_telegram_id, title=title)
+    owner = await _upsert_employee(
+        company_oid=company.id,
+        telegram_id=owner_telegram_id,
+        name=owner_name,
+        role=UserRole.OWNER,
+    )
+    return company, owner
+
+
+@timed_repository
+async def setup_first_company(
+    *,
+    owner_telegram_id: int,
+    title: str,
+    owner_name: str,
+) -> Tuple[Company, Optional[Employee]]:
+    """
+    /owner_setup in one step: return the owner's existing company, or
+    create one together with the owner's employee row.
+
+    The lookup and the insert are one storage call (a find_one_and_update
+    upsert on Mongo). Two concurrent calls can both miss and both insert;
+    the unique (partial) owner_telegram_id index lets only one through and
+    the other returns its company. The employee is None when the company
+    already existed.
+    """
+    attempts = 0
+    while True:
+        new_doc = _new_company_doc(owner_telegram_id, title, first=True)
+        try:
+            before = await get_storage().insert_company_unless_owner_has_one(new_doc)
+            break
+        except DuplicateKeyError as e:
+            if e.key == "owner":
+                before = await get_storage().find_company_by_owner(owner_telegram_id)
+                if before is None:
+                    raise
+                break
+            attempts += 1
+            if not _is_office_code_collision(e) or attempts >= OFFICE_CODE_ATTEMPTS:
+                raise
+
+    if before is not None:
+        return Company.model_validate(before), None
+
+    company = Company.model_validate(new_doc)
+    owner = await _upsert_employee(
+        company_oid=company.id,
+        telegram_id=owner_telegram_id,
+        name=owner_name,
+        role=UserRole.OWNER,
+    )
+    return company, owner
 
-    doc = {
-        "owner_telegram_id": owner_telegram_id,
-        "title": title,
-        "office_code": office_code,
-        "created_at": datetime.utcnow(),
-    }
 
-    result = await companies_collection.insert_one(doc)
-    doc["_id"] = result.inserted_id
+@timed_repository
+async def get_company_by_id(company_id: ObjectIdLike) -> Optional[Company]:
+    doc = await get_storage().find_company_by_id(_to_object_id(company_id))
+    if not doc:
+        return None
     return Company.model_validate(doc)
 
 
+@timed_repository
+async def get_company_brief(company_id: ObjectIdLike) -> Optional[CompanyBrief]:
+    """Just the owner and timezone, for the per-message paths. Cached."""
+    company_oid = _to_object_id(company_id)
+    cached = company_brief_cache.get(company_oid)
+    if cached is not MISSING:
+        return cached
+
+    generation = company_brief_cache.generation(company_oid)
+    doc = await get_storage().find_company_by_id(company_oid, fields=COMPANY_BRIEF_FIELDS)
+    brief = CompanyBrief.from_doc(doc) if doc else None
+    company_brief_cache.set(company_oid, brief, generation)
+    return brief
+
+
+@timed_repository
 async def get_company_by_owner(owner_telegram_id: int) -> Optional[Company]:
-    doc = await companies_collection.find_one({"owner_telegram_id": owner_telegram_id})
+    doc = await get_storage().find_company_by_owner(owner_telegram_id)
     if not doc:
         return None
     return Company.model_validate(doc)
 
 
+@timed_repository
 async def get_companies_by_owner(owner_telegram_id: int) -> List[Company]:
-    cursor = companies_collection.find({"owner_telegram_id": owner_telegram_id})
-    companies: List[Company] = []
-    async for doc in cursor:
-        companies.append(Company.model_validate(doc))
-    return companies
+    docs = await get_storage().find_companies_by_owner(owner_telegram_id)
+    return [Company.model_validate(doc) for doc in docs]
 
 
+@timed_repository
 async def get_company_by_code(office_code: str) -> Optional[Company]:
-    doc = await companies_collection.find_one(
-        {"office_code": office_code.strip().upper()}
-    )
+    doc = await get_storage().find_company_by_code(office_code.strip().upper())
     if not doc:
         return None
     return Company.model_validate(doc)
 
 
+@timed_repository
+async def set_company_timezone(company_id: ObjectIdLike, timezone: str) -> bool:
+    """`timezone` is an IANA name, e.g. "America/Toronto"; validate it first."""
+    company_oid = _to_object_id(company_id)
+    updated = await get_storage().update_company(company_oid, {"timezone": timezone})
+    company_brief_cache.invalidate(company_oid)
+    return updated
+
+
+@timed_repository
 async def delete_company_and_related(company_id: ObjectIdLike) -> int:
     """
-    Delete a company and all its employees + jobs + integrations.
+    Delete a company and all its employees + jobs + integrations + vocabulary,
+    and its outbox records that haven't been delivered.
     Returns number of company docs deleted (0 or 1).
     """
-    company_oid = _to_object_id(company_id)
-    res_company = await companies_collection.delete_one({"_id": company_oid})
-    await employees_collection.delete_many({"company_id": company_oid})
-    await jobs_collection.delete_many({"company_id": company_oid})
-    await integrations_collection.delete_many({"company_id": company_oid})
-    return res_company.deleted_count
+    deleted = await get_storage().delete_company_cascade(_to_object_id(company_id))
+    # Rare enough that dropping the whole cache beats looking up who was in it
+    employee_cache.clear()
+    company_brief_cache.invalidate(_to_object_id(company_id))
+    return deleted
 
 
 # -------------------- EMPLOYEE --------------------
 
 
+@timed_repository
 async def create_employee(
     *,
     company_id: ObjectIdLike,
@@ -100,6 +257,7 @@ async def create_employee(
     company_oid = _to_object_id(company_id)
 
     doc = {
+        "_id": ObjectId(),
         "company_id": company_oid,
         "telegram_id": telegram_id,
         "name": name,
@@ -107,11 +265,37 @@ async def create_employee(
         "created_at": datetime.utcnow(),
     }
 
-    result = await employees_collection.insert_one(doc)
-    doc["_id"] = result.inserted_id
+    await get_storage().insert_employee(doc)
+    employee_cache.invalidate(telegram_id)
     return Employee.model_validate(doc)
 
 
+async def _upsert_employee(
+    *,
+    company_oid: ObjectId,
+    telegram_id: int,
+    name: str,
+    role: UserRole,
+) -> Employee:
+    """
+    Return the (company, telegram_id) employee row, inserting it if missing,
+    in one storage call. The unique (company_id, telegram_id) constraint
+    makes concurrent calls converge on one row.
+    """
+    doc = await get_storage().upsert_employee(
+        company_oid,
+        telegram_id,
+        {
+            "name": name,
+            "role": role.value,
+            "created_at": datetime.utcnow(),
+        },
+    )
+    employee_cache.invalidate(telegram_id)
+    return Employee.model_validate(doc)
+
+
+@timed_repository
 async def get_or_create_employee_by_telegram(
     *,
     company_id: ObjectIdLike,
@@ -119,49 +303,54 @@ async def get_or_create_employee_by_telegram(
     name: Optional[str] = None,
     role: UserRole = UserRole.EMPLOYEE,
 ) -> Employee:
-    company_oid = _to_object_id(company_id)
-
-    existing = await employees_collection.find_one(
-        {"company_id": company_oid, "telegram_id": telegram_id}
+    return await _upsert_employee(
+        company_oid=_to_object_id(company_id),
+        telegram_id=telegram_id,
+        name=name or "Unknown",
+        role=role,
     )
-    if existing:
-        return Employee.model_validate(existing)
-
-    doc = {
-        "company_id": company_oid,
-        "telegram_id": telegram_id,
-        "name": name or "Unknown",
-        "role": role.value,
-        "created_at": datetime.utcnow(),
-    }
-
-    result = await employees_collection.insert_one(doc)
-    doc["_id"] = result.inserted_id
-    return Employee.model_validate(doc)
 
 
+@timed_repository
 async def get_employee_by_telegram(
     *,
     telegram_id: int,
 ) -> Optional[Employee]:
-    doc = await employees_collection.find_one({"telegram_id": telegram_id})
+    cached = employee_cache.get(telegram_id)
+    if cached is not MISSING:
+        return cached
+
+    # an invalidate() while we read means `doc` may already be stale
+    generation = employee_cache.generation(telegram_id)
+    doc = await get_storage().find_employee_by_telegram(telegram_id)
+    employee = Employee.model_validate(doc) if doc else None
+    employee_cache.set(telegram_id, employee, generation)
+    return employee
+
+
+@timed_repository
+async def get_company_employee(company_id: ObjectIdLike, telegram_id: int) -> Optional[Employee]:
+    doc = await get_storage().find_employee(_to_object_id(company_id), telegram_id)
     if not doc:
         return None
     return Employee.model_validate(doc)
 
 
+@timed_repository
 async def delete_employee_by_telegram(telegram_id: int) -> int:
     """
     Remove an employee from whatever company they belong to.
     (Assumes one company per Telegram user for now.)
     """
-    res = await employees_collection.delete_many({"telegram_id": telegram_id})
-    return res.deleted_count
+    deleted = await get_storage().delete_employees_by_telegram(telegram_id)
+    employee_cache.invalidate(telegram_id)
+    return deleted
 
 
 # -------------------- JOB --------------------
 
 
+@timed_repository
 async def create_job(
     *,
     company_id: ObjectIdLike,
@@ -174,11 +363,25 @@ async def create_job(
     budget: Optional[float] = None,
     notes: Optional[str] = None,
     raw_text: str,
+    intent: Optional[str] = None,
+    telegram_user: Optional[dict] = None,
+    telegram_chat_id: Optional[int] = None,
+    telegram_message_id: Optional[int] = None,
+    employee_name: Optional[str] = None,
 ) -> Job:
+    """
+    Store a job, queue its job-created deliveries in the outbox and count
+    it in the company's daily rollup. `telegram_user` is copied into the
+    webhook payload; `employee_name` is what the digest calls the employee.
+
+    With the source Telegram message given, creating a job for the same
+    message twice returns the first job and queues nothing new.
+    """
     company_oid = _to_object_id(company_id)
     employee_oid = _to_object_id(employee_id)
 
     doc = {
+        "_id": ObjectId(),
         "company_id": company_oid,
         "created_by_employee_id": employee_oid,
         "client_name": client_name,
@@ -190,16 +393,174 @@ async def create_job(
         "raw_text": raw_text,
         "created_at": datetime.utcnow(),
         "status": "new",
+        "intent": intent,
     }
+    if telegram_message_id is not None:
+        doc["telegram_chat_id"] = telegram_chat_id
+        doc["telegram_message_id"] = telegram_message_id
+
+    job = Job.model_validate(doc)
+
+    storage = get_storage()
+    try:
+        # One write: a job is never stored without its deliveries queued
+        await storage.insert_job_with_outbox(doc, _job_created_records(job, telegram_user))
+    except DuplicateKeyError as e:
+        # Same Telegram message seen twice (redelivery to another instance)
+        if e.key != "telegram_message":
+            raise
+        existing = await storage.find_job_by_message(telegram_chat_id, telegram_message_id)
+        if not existing:
+            raise
+        job = Job.model_validate(existing)
+        # A job stored without its records (a server without transactions,
+        # crashed in between) gets them now
+        if not await storage.outbox_exists_for_job(job.id):
+            print("[outbox] job", job.id, "had no deliveries queued, queueing them")
+            await storage.insert_outbox(_job_created_records(job, telegram_user))
+        return job
+
+    try:
+        await _record_rollup(job, employee_name)
+    except Exception as e:
+        # Only the digest is off by one; the job and its webhooks are stored
+        print("[rollups] could not count job", job.id, "error:", repr(e))
+    return job
+
+
+@timed_repository
+async def update_job_from_edit(
+    *,
+    telegram_chat_id: int,
+    telegram_message_id: int,
+    title: str,
+    scheduled_for: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    location: Optional[str] = None,
+    budget: Optional[float] = None,
+    notes: Optional[str] = None,
+    raw_text: str,
+    intent: Optional[str] = None,
+) -> Optional[Job]:
+    """
+    Apply an edited Telegram message to the job it created, and move its
+    job type and budget in the daily rollup. Returns None if that message
+    never became a job.
+    """
+    fields = {
+        "client_name": client_name,
+        "job_type": title,
+        "location": location,
+        "scheduled_for": scheduled_for,
+        "budget": budget,
+        "notes": notes,
+        "raw_text": raw_text,
+        "intent": intent,
+        "updated_at": datetime.utcnow(),
+    }
+    before = await get_storage().update_job_by_message(telegram_chat_id, telegram_message_id, fields)
+    if not before:
+        return None
+    old = Job.model_validate(before)
+    job = Job.model_validate({**before, **fields})
+
+    try:
+        await _move_rollup(old, job)
+    except Exception as e:
+        print("[rollups] could not recount edited job", job.id, "error:", repr(e))
+    return job
+
 
-    result = await jobs_collection.insert_one(doc)
-    doc["_id"] = result.inserted_id
-    return Job.model_validate(doc)
+class InvalidCursor(ValueError):
+    """A job listing cursor that this code didn't hand out."""
+
+
+def encode_job_cursor(created_at: datetime, job_id: ObjectIdLike) -> str:
+    """Opaque cursor for what comes after a job: its (created_at, _id), URL-safe."""
+    raw = f"{created_at.isoformat()}|{job_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_job_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, _, job_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), ObjectId(job_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, InvalidId) as e:
+        raise InvalidCursor(cursor) from e
+
+
+@timed_repository
+async def list_company_jobs(
+    *,
+    company_id: ObjectIdLike,
+    status: Optional[str] = None,
+    employee_id: Optional[ObjectIdLike] = None,
+    created_from: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> JobPage:
+    """
+    A page of a company's jobs, newest first, with the JobSummary fields
+    only. Pass the returned `next_cursor` back for the next page.
+
+    Pages are keyset-paginated on (company_id, created_at, _id): each
+    one is a single index range read starting after the cursor, however
+    many jobs the company has or how deep the listing goes.
+
+    Raises InvalidCursor for a cursor this function didn't return.
+    """
+    limit = min(max(1, limit or _settings.JOB_LIST_PAGE_SIZE), _settings.JOB_LIST_MAX_PAGE_SIZE)
+    after = decode_job_cursor(cursor) if cursor else None
+
+    # One extra row says whether there's a next page, without a count
+    docs = await get_storage().find_jobs_page(
+        _to_object_id(company_id),
+        limit=limit + 1,
+        status=status,
+        employee_id=_to_object_id(employee_id) if employee_id is not None else None,
+        created_from=created_from,
+        created_before=created_before,
+        after=after,
+        fields=JOB_SUMMARY_FIELDS,
+    )
+    jobs = [JobSummary.from_doc(doc) for doc in docs[:limit]]
+    next_cursor = encode_job_cursor(jobs[-1].created_at, jobs[-1].id) if len(docs) > limit else None
+    return JobPage(jobs, next_cursor)
+
+
+def iter_company_jobs(
+    *,
+    company_id: ObjectIdLike,
+    fields: Tuple[str, ...],
+    created_from: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    All of a company's jobs (the `fields` of each), oldest first, read a
+    batch at a time: for exports too big to hold. `cursor` is a job's
+    encode_job_cursor(); iteration resumes right after that job.
+
+    Not @timed_repository: it returns the iterator instead of awaiting a
+    result, so the cursor is checked here (InvalidCursor) before any row.
+    """
+    return get_storage().iter_jobs(
+        _to_object_id(company_id),
+        batch_size=batch_size or _settings.JOB_EXPORT_BATCH_SIZE,
+        created_from=created_from,
+        created_before=created_before,
+        after=decode_job_cursor(cursor) if cursor else None,
+        fields=fields,
+    )
 
 
 # -------------------- INTEGRATIONS (webhooks) --------------------
 
 
+@timed_repository
 async def set_company_webhook(
     *,
     company_id: ObjectIdLike,
@@ -219,20 +580,295 @@ async def set_company_webhook(
         "created_at": datetime.utcnow(),
     }
 
-    await integrations_collection.update_one(
-        {"company_id": company_oid, "name": name},
-        {"$set": doc},
-        upsert=True,
-    )
+    await get_storage().upsert_integration(company_oid, name, doc)
 
 
+@timed_repository
 async def get_company_webhooks(
     *,
     company_id: ObjectIdLike,
 ) -> List[dict]:
-    company_oid = _to_object_id(company_id)
-    cursor = integrations_collection.find({"company_id": company_oid})
-    webhooks: List[dict] = []
-    async for doc in cursor:
-        webhooks.append(doc)
-    return webhooks
+    return await get_storage().find_integrations(_to_object_id(company_id))
+
+
+@timed_repository
+async def get_company_webhook_urls(
+    *,
+    company_id: ObjectIdLike,
+) -> List[str]:
+    docs = await get_storage().find_integrations(_to_object_id(company_id), fields=("url",))
+    return [doc["url"] for doc in docs if doc.get("url")]
+
+
+# -------------------- VOCABULARIES (per-company intent keywords) --------------------
+
+
+def _normalize_keywords(keywords: List[str]) -> List[str]:
+    return list(dict.fromkeys(k.strip().lower() for k in keywords if k.strip()))
+
+
+@timed_repository
+async def get_company_vocabulary(company_id: ObjectIdLike) -> Optional[Vocabulary]:
+    doc = await get_storage().find_vocabulary(_to_object_id(company_id))
+    if not doc:
+        return None
+    return Vocabulary.model_validate(doc)
+
+
+@timed_repository
+async def get_company_vocabulary_version(company_id: ObjectIdLike) -> Optional[int]:
+    """Current vocabulary version, None if the company never set keywords."""
+    return await get_storage().find_vocabulary_version(_to_object_id(company_id))
+
+
+@timed_repository
+async def add_company_keywords(
+    *,
+    company_id: ObjectIdLike,
+    intent: str,
+    keywords: List[str],
+) -> Vocabulary:
+    doc = await get_storage().add_vocabulary_keywords(
+        _to_object_id(company_id),
+        intent,
+        _normalize_keywords(keywords),
+        datetime.utcnow(),
+    )
+    return Vocabulary.model_validate(doc)
+
+
+@timed_repository
+async def remove_company_keywords(
+    *,
+    company_id: ObjectIdLike,
+    intent: str,
+    keywords: List[str],
+) -> Optional[Vocabulary]:
+    doc = await get_storage().remove_vocabulary_keywords(
+        _to_object_id(company_id),
+        intent,
+        _normalize_keywords(keywords),
+        datetime.utcnow(),
+    )
+    if not doc:
+        return None
+    return Vocabulary.model_validate(doc)
+
+
+# -------------------- DAILY ROLLUPS (digests) --------------------
+
+
+def _rollup_key(value: Optional[str], default: str) -> str:
+    # Becomes a field name: Mongo doesn't allow "." in one or "$" in front
+    key = (value or "").strip().lower().replace(".", "_").replace("$", "_")[:60]
+    return key or default
+
+
+async def _record_rollup(job: Job, employee_name: Optional[str]) -> None:
+    """One $inc upsert per job, on the company's rollup for its local day."""
+    company = await get_company_brief(job.company_id)
+    tz = company.timezone if company else None
+    employee = str(job.created_by_employee_id)
+
+    increments = {
+        "jobs": 1,
+        f"by_status.{_rollup_key(job.status, 'new')}": 1,
+        f"by_job_type.{_rollup_key(job.job_type, 'other')}": 1,
+        f"by_employee.{employee}": 1,
+    }
+    if job.budget:
+        increments["budget"] = job.budget
+    fields = {"updated_at": job.created_at}
+    if employee_name:
+        fields[f"employee_names.{employee}"] = employee_name
+
+    await get_storage().increment_rollup(
+        job.company_id,
+        local_day(tz, job.created_at),
+        increments,
+        {"timezone": tz, "digest_sent_at": None, "created_at": job.created_at},
+        fields,
+    )
+
+
+async def _move_rollup(old: Job, new: Job) -> None:
+    """$inc the old→new job type and budget deltas of an edited job into its day's rollup."""
+    increments: Dict[str, float] = {}
+    old_type = _rollup_key(old.job_type, "other")
+    new_type = _rollup_key(new.job_type, "other")
+    if old_type != new_type:
+        increments[f"by_job_type.{old_type}"] = -1
+        increments[f"by_job_type.{new_type}"] = 1
+    budget_delta = (new.budget or 0) - (old.budget or 0)
+    if budget_delta:
+        increments["budget"] = budget_delta
+    if not increments:
+        return
+
+    # Same rollup _record_rollup counted the job in: its creation day
+    company = await get_company_brief(new.company_id)
+    tz = company.timezone if company else None
+    await get_storage().increment_rollup(
+        new.company_id,
+        local_day(tz, new.created_at),
+        increments,
+        {"timezone": tz, "digest_sent_at": None, "created_at": new.created_at},
+        {"updated_at": new.updated_at or datetime.utcnow()},
+    )
+
+
+@timed_repository
+async def get_daily_rollup(company_id: ObjectIdLike, day: str) -> Optional[DailyRollup]:
+    doc = await get_storage().find_rollup(_to_object_id(company_id), day)
+    if not doc:
+        return None
+    return DailyRollup.model_validate(doc)
+
+
+@timed_repository
+async def get_unsent_rollups(days: List[str]) -> List[DailyRollup]:
+    """Rollups of every company for `days` whose digest hasn't gone out, in one fetch."""
+    docs = await get_storage().find_unsent_rollups(days)
+    return [DailyRollup.model_validate(doc) for doc in docs]
+
+
+@timed_repository
+async def claim_daily_digest(rollup_id: ObjectIdLike) -> bool:
+    """Claim a rollup's digest for sending; False if it's already taken."""
+    return await get_storage().claim_rollup_digest(_to_object_id(rollup_id), datetime.utcnow())
+
+
+# -------------------- OUTBOX (job-created deliveries) --------------------
+
+OUTBOX_PENDING = "pending"
+OUTBOX_DELIVERED = "delivered"
+OUTBOX_DEAD = "dead"
+
+
+def _outbox_record(
+    *,
+    job: Job,
+    payload: dict,
+    destinations: Optional[List[str]],
+    now: datetime,
+) -> dict:
+    return {
+        "event": "job_created",
+        "company_id": job.company_id,
+        "job_id": job.id,
+        "payload": payload,
+        # None = "all company webhooks", resolved by the dispatcher on first try
+        "destinations": destinations,
+        "status": OUTBOX_PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "last_error": None,
+        "created_at": now,
+    }
+
+
+def _job_created_records(job: Job, telegram_user: Optional[dict]) -> List[dict]:
+    now = datetime.utcnow()
+    records = [
+        _outbox_record(
+            job=job,
+            payload=build_job_created_payload(job, telegram_user),
+            destinations=None,
+            now=now,
+        )
+    ]
+
+    n8n_url = n8n_client.job_created_url()
+    if n8n_url:
+        records.append(
+            _outbox_record(
+                job=job,
+                payload=n8n_client.build_job_created_payload(job),
+                destinations=[n8n_url],
+                now=now,
+            )
+        )
+    return records
+
+
+@timed_repository
+async def claim_outbox_batch(*, limit: int, lease_seconds: float) -> List[dict]:
+    """
+    Claim up to `limit` due outbox records.
+
+    Claiming pushes `next_attempt_at` forward by the lease, so other
+    dispatchers skip the record, and it becomes due again by itself
+    if this process dies before reporting back.
+    """
+    now = datetime.utcnow()
+    return await get_storage().claim_outbox(
+        status=OUTBOX_PENDING,
+        now=now,
+        lease_until=now + timedelta(seconds=lease_seconds),
+        limit=limit,
+        token=ObjectId(),
+    )
+
+
+@timed_repository
+async def extend_outbox_leases(tokens: List[ObjectId], *, lease_seconds: float) -> None:
+    """Renew the lease of records still held under these claims (see claim_outbox_batch)."""
+    if tokens:
+        lease_until = datetime.utcnow() + timedelta(seconds=lease_seconds)
+        await get_storage().extend_outbox_leases(tokens, lease_until)
+
+
+@timed_repository
+async def mark_outbox_delivered(record_id: ObjectIdLike) -> None:
+    await get_storage().update_outbox(
+        _to_object_id(record_id),
+        {
+            "status": OUTBOX_DELIVERED,
+            "delivered_at": datetime.utcnow(),
+            "last_error": None,
+            "claim_token": None,
+        },
+    )
+
+
+@timed_repository
+async def reschedule_outbox(
+    record_id: ObjectIdLike,
+    *,
+    attempts: int,
+    next_attempt_at: datetime,
+    destinations: Optional[List[str]],
+    error: str,
+) -> None:
+    """Keep a record pending, narrowed down to the destinations that failed."""
+    await get_storage().update_outbox(
+        _to_object_id(record_id),
+        {
+            "attempts": attempts,
+            "next_attempt_at": next_attempt_at,
+            "destinations": destinations,
+            "last_error": error,
+            "claim_token": None,
+        },
+    )
+
+
+@timed_repository
+async def dead_letter_outbox(
+    record_id: ObjectIdLike,
+    *,
+    attempts: int,
+    destinations: Optional[List[str]],
+    error: str,
+) -> None:
+    await get_storage().update_outbox(
+        _to_object_id(record_id),
+        {
+            "status": OUTBOX_DEAD,
+            "attempts": attempts,
+            "destinations": destinations,
+            "last_error": error,
+            "dead_at": datetime.utcnow(),
+            "claim_token": None,
+        },
+    )
@@ -1,42 +1,45 @@
 from aiogram import Bot
 
-from app.domain.models import Job
 from app.domain.repositories import (
     create_job,
-    get_employee_by_telegram_id,
-    get_company_by_id,
+    get_employee_by_telegram,
+    get_company_brief,
 )
-from app.domain.nlp.parser import parse_job_intake
-from app.infrastructure.n8n_client import trigger_job_created
+from app.infrastructure.extraction_pool import extraction_pool
+from app.telegram.notifications import owner_notifier
+from app.telegram.sender import outbound_sender
 
 
 async def handle_job_intake(bot: Bot, telegram_user_id: int, text: str):
-    employee = await get_employee_by_telegram_id(telegram_user_id)
+    employee = await get_employee_by_telegram(telegram_id=telegram_user_id)
     if not employee:
-        await bot.send_message(
-            chat_id=telegram_user_id,
-            text="I couldn't find your company link. Send /join <office_code> first."
+        await outbound_sender.send(
+            bot,
+            telegram_user_id,
+            "I couldn't find your company link. Send /join_company <office_code> first.",
         )
         return
 
-    parsed = parse_job_intake(text)
+    company = await get_company_brief(employee.company_id)
 
-    job = Job(
+    # Off the event loop when the extractor pool is enabled
+    parsed = await extraction_pool.extract(text, company.timezone if company else None)
+
+    # create_job() also queues the job-created webhooks (and n8n) in the outbox
+    job = await create_job(
         company_id=employee.company_id,
-        created_by_employee_id=employee.id,
+        employee_id=employee.id,
+        title=parsed.job_type or "New job",
+        description=parsed.notes,
+        scheduled_for=parsed.scheduled_for,
         client_name=parsed.client_name,
-        job_type=parsed.job_type,
         location=parsed.location,
-        scheduled_for=parsed.scheduled_for,
         budget=parsed.budget,
         notes=parsed.notes,
         raw_text=text,
+        employee_name=employee.name,
     )
 
-    job = await create_job(job)
-
-    await trigger_job_created(job)
-
     confirm_msg = (
         "✅ Job captured!\n\n"
         f"<b>Client:</b> {job.client_name or 'N/A'}\n"
@@ -44,19 +47,11 @@ async def handle_job_intake(bot: Bot, telegram_user_id: int, text: str):
         f"<b>Location:</b> {job.location or 'N/A'}\n"
         f"<b>Budget:</b> {job.budget or 'N/A'}\n"
     )
-    await bot.send_message(chat_id=telegram_user_id, text=confirm_msg)
+    await outbound_sender.send(bot, telegram_user_id, confirm_msg)
 
-    company = await get_company_by_id(job.company_id)
     if company:
-        owner_text = (
-            "📥 <b>New job added</b>\n\n"
-            f"From employee ID: <code>{employee.telegram_id}</code>\n"
-            f"Client: {job.client_name or 'N/A'}\n"
-            f"Job: {job.job_type or 'N/A'}\n"
-            f"Location: {job.location or 'N/A'}\n"
-            f"Budget: {job.budget or 'N/A'}\n"
-        )
+        # Coalesced per owner: a busy crew doesn't mean one message per job
         try:
-            await bot.send_message(chat_id=company.owner_telegram_id, text=owner_text)
+            await owner_notifier.job_created(bot, company.owner_telegram_id, job, employee.telegram_id)
         except Exception as e:
             print("[owner notify] error:", e)
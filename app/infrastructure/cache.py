@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Returned by TTLCache.get() when nothing usable is cached.
+# (None is a valid cached value: it means "we looked, it doesn't exist".)
+MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class TTLCache:
+    """
+    Small in-process cache with a TTL per entry and LRU eviction.
+
+    `None` values are cached too ("negative" entries) but expire after
+    `negative_ttl_seconds`, so a lookup for something that doesn't exist
+    yet isn't repeated on every message.
+
+    A read-through fill takes `generation(key)` before it reads the
+    database and passes it to `set()`; if the key was invalidated (or the
+    cache cleared) while it was reading, the now stale value is not cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+    ):
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # bumped by invalidate(); the epoch by clear(), and when this many
+        # keys have been invalidated (so the table stays bounded)
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        if entry.expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[Tuple[int, int]] = None) -> None:
+        if generation is not None and generation != self.generation(key):
+            return
+        ttl = self.negative_ttl_seconds if value is None else self.ttl_seconds
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+        self._data[key] = _Entry(value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        if len(self._generations) >= self.max_size:
+            self._generations.clear()
+            self._epoch += 1
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._generations.clear()
+        self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -15,4 +15,8 @@ db = client[_settings.MONGODB_DB_NAME]
 companies_collection = db["companies"]
 employees_collection = db["employees"]
 jobs_collection = db["jobs"]
-integrations_collection = db["integrations"]
\ No newline at end of file
+integrations_collection = db["integrations"]
+outbox_collection = db["outbox"]
+processed_updates_collection = db["processed_updates"]
+vocabularies_collection = db["vocabularies"]
+rollups_collection = db["daily_rollups"]
@@ -0,0 +1,100 @@
+from collections import deque
+from datetime import datetime
+from typing import Deque, Set
+
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import get_settings
+from app.infrastructure.db import processed_updates_collection
+from app.infrastructure.metrics import metrics
+
+settings = get_settings()
+
+
+class RecentIds:
+    """Sliding window over the last `size` ids, with O(1) membership checks."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._order: Deque[int] = deque()
+        self._ids: Set[int] = set()
+
+    def __contains__(self, value: int) -> bool:
+        return value in self._ids
+
+    def add(self, value: int) -> bool:
+        """Remember `value`. Returns False if it was already in the window."""
+        if value in self._ids:
+            return False
+        self._ids.add(value)
+        self._order.append(value)
+        if len(self._order) > self.size:
+            self._ids.discard(self._order.popleft())
+        return True
+
+    def discard(self, value: int) -> None:
+        """Forget `value`. O(size), but only failed updates need it."""
+        if value in self._ids:
+            self._ids.discard(value)
+            self._order.remove(value)
+
+
+class UpdateDeduplicator:
+    """
+    Tells whether a Telegram update_id was already accepted.
+
+    The in-memory window catches redeliveries to the same process. With
+    `use_mongo`, ids are also inserted into processed_updates (unique _id,
+    TTL-expired), which catches redeliveries that land on another instance.
+
+    An id is marked when its update arrives, so a redelivery that comes
+    in while the first copy is still being handled is skipped too. If
+    handling fails before Telegram got its 200, release() the id: Telegram
+    will redeliver, and that copy must not be skipped.
+    """
+
+    def __init__(self, *, window_size: int, use_mongo: bool):
+        self.recent = RecentIds(window_size)
+        self.use_mongo = use_mongo
+        self.duplicates = 0
+
+    async def is_duplicate(self, update_id: int) -> bool:
+        if not self.recent.add(update_id):
+            self.duplicates += 1
+            return True
+
+        if not self.use_mongo:
+            return False
+
+        try:
+            await processed_updates_collection.insert_one(
+                {"_id": update_id, "created_at": datetime.utcnow()}
+            )
+        except DuplicateKeyError:
+            self.duplicates += 1
+            return True
+        except Exception as e:
+            # Fail open: a missed duplicate is better than a dropped update
+            print("[dedup] could not record update", update_id, "error:", repr(e))
+        return False
+
+    async def release(self, update_id: int) -> None:
+        self.recent.discard(update_id)
+        if not self.use_mongo:
+            return
+        try:
+            await processed_updates_collection.delete_one({"_id": update_id})
+        except Exception as e:
+            # The redelivery will be skipped; nothing more we can do here
+            print("[dedup] could not release update", update_id, "error:", repr(e))
+
+
+update_deduplicator = UpdateDeduplicator(
+    window_size=settings.DEDUP_WINDOW_SIZE,
+    use_mongo=settings.DEDUP_MONGO_ENABLED,
+)
+metrics.gauge_func(
+    "artlix_duplicate_updates",
+    "Redelivered Telegram updates skipped since start.",
+    lambda: update_deduplicator.duplicates,
+)
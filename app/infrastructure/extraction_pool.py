@@ -0,0 +1,184 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set
+
+from app.core.config import get_settings
+from app.domain.nlp.extractors import Extractor, RegexExtractor, load_extractor
+from app.domain.nlp.parser import ParsedJob
+from app.infrastructure.metrics import extraction_total
+
+settings = get_settings()
+
+# -------------------- worker process side --------------------
+
+_worker_extractor: Optional[Extractor] = None
+
+
+def _init_worker(path: str) -> None:
+    global _worker_extractor
+    extractor = load_extractor(path)
+    extractor.warm_up()
+    _worker_extractor = extractor
+
+
+def _worker_ready() -> None:
+    pass
+
+
+def _worker_extract(text: str, tz: Optional[str]) -> ParsedJob:
+    return _worker_extractor.extract(text, tz)  # type: ignore[union-attr]
+
+
+# -------------------- event loop side --------------------
+
+
+class ExtractionPool:
+    """
+    Runs the configured extractor so CPU-heavy extraction doesn't stall
+    the event loop (and every other chat with it).
+
+    - With the pool enabled, `workers` processes each load and warm_up()
+      the extractor once, at start(), before any message reaches them.
+    - A call that arrives while `max_pending` calls are already queued,
+      or that takes longer than `timeout_seconds`, is answered by the
+      regex extractor inline. A timed-out call keeps its worker busy
+      until it finishes and still counts as pending.
+    - With the pool disabled, the extractor runs inline.
+    """
+
+    def __init__(
+        self,
+        extractor_path: str,
+        *,
+        enabled: bool,
+        workers: Optional[int] = None,
+        timeout_seconds: float = 2.0,
+        max_pending: Optional[int] = None,
+    ):
+        self.extractor_path = extractor_path
+        self.enabled = enabled
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout_seconds = timeout_seconds
+        self.max_pending = max_pending or 2 * self.workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[Future] = set()
+        self._inline: Optional[Extractor] = None
+        self._fallback = RegexExtractor()
+        self._outcomes: Dict[str, int] = {}
+
+    async def start(self) -> None:
+        if not self.enabled or self._executor is not None:
+            return
+        started = time.perf_counter()
+        self._executor = self._new_executor()
+        # One ready-call per worker spawns them all now; each runs warm_up()
+        # in its initializer before taking work, so the first messages don't
+        # pay for it (a fast worker may answer more than one ready-call)
+        ready = [
+            asyncio.wrap_future(self._executor.submit(_worker_ready))
+            for _ in range(self.workers)
+        ]
+        try:
+            await asyncio.gather(*ready)
+        except Exception as e:
+            # e.g. the extractor doesn't import: run it inline instead of
+            # keeping the app from starting
+            print("[extraction] pool failed to start, running inline:", repr(e))
+            await self.stop()
+            return
+        print(
+            "[extraction] pool ready:",
+            self.workers,
+            "workers running",
+            self.extractor_path,
+            f"in {time.perf_counter() - started:.2f}s",
+        )
+
+    async def stop(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: forking the app process would copy the running
+        # event loop and Motor's background threads into every worker
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.extractor_path,),
+        )
+
+    def _count(self, outcome: str) -> None:
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+        extraction_total.inc(outcome=outcome)
+
+    def _regex(self, text: str, tz: Optional[str], reason: str) -> ParsedJob:
+        self._count(reason)
+        return self._fallback.extract(text, tz)
+
+    async def extract(self, text: str, tz: Optional[str] = None) -> ParsedJob:
+        if self._executor is None:
+            if self._inline is None:
+                self._inline = load_extractor(self.extractor_path)
+                self._inline.warm_up()
+            self._count("inline")
+            return self._inline.extract(text, tz)
+
+        self._pending = {f for f in self._pending if not f.done()}
+        if len(self._pending) >= self.max_pending:
+            return self._regex(text, tz, "saturated")
+
+        try:
+            future = self._executor.submit(_worker_extract, text, tz)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._restart(e)
+            return self._regex(text, tz, "error")
+        self._pending.add(future)
+
+        try:
+            parsed = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            return self._regex(text, tz, "timeout")
+        except BrokenProcessPool as e:
+            self._restart(e)
+            return self._regex(text, tz, "error")
+        except Exception as e:
+            print("[extraction] extractor failed:", repr(e))
+            return self._regex(text, tz, "error")
+        self._count("pool")
+        return parsed
+
+    def _restart(self, error: Exception) -> None:
+        # A worker died (e.g. OOM-killed); replace the whole pool. Its
+        # workers warm up on their first call instead of at startup.
+        print("[extraction] pool broken, restarting:", repr(error))
+        old, self._executor = self._executor, self._new_executor()
+        self._pending.clear()
+        if old is not None:
+            old.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._executor is not None,
+            "extractor": self.extractor_path,
+            "workers": self.workers,
+            "pending": sum(1 for f in self._pending if not f.done()),
+            "max_pending": self.max_pending,
+            "outcomes": dict(self._outcomes),
+        }
+
+
+extraction_pool = ExtractionPool(
+    settings.EXTRACTOR,
+    enabled=settings.EXTRACTOR_POOL_ENABLED,
+    workers=settings.EXTRACTOR_WORKERS,
+    timeout_seconds=settings.EXTRACTOR_TIMEOUT_SECONDS,
+    max_pending=settings.EXTRACTOR_MAX_PENDING,
+)
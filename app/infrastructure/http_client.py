@@ -0,0 +1,51 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.core.config import get_settings
+
+# One pooled client for all outbound HTTP (webhooks, n8n, ...).
+# Owned by the app lifespan; created lazily if used outside of it.
+_client: Optional[httpx.AsyncClient] = None
+# Caps concurrent webhook deliveries process-wide. Made with the client,
+# so it belongs to the event loop that runs the app, not whichever one
+# (if any) existed at import.
+_in_flight: Optional[asyncio.Semaphore] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    return httpx.AsyncClient(
+        timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.WEBHOOK_MAX_IN_FLIGHT,
+            max_keepalive_connections=settings.WEBHOOK_MAX_IN_FLIGHT,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client, _in_flight
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        _in_flight = asyncio.Semaphore(get_settings().WEBHOOK_MAX_IN_FLIGHT)
+    return _client
+
+
+def get_in_flight_limit() -> asyncio.Semaphore:
+    """The process-wide delivery cap that goes with get_http_client()."""
+    get_http_client()
+    return _in_flight  # type: ignore[return-value]
+
+
+async def start_http_client() -> None:
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client, _in_flight
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _in_flight = None
@@ -0,0 +1,370 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import ConnectionFailure
+
+from app.core.config import get_settings
+from app.infrastructure.db import db
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    keys: List[Tuple[str, int]]
+    name: str
+    unique: bool = False
+    expire_after_seconds: Optional[int] = None
+    partial_filter: Optional[Dict[str, Any]] = None
+
+    def model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return IndexModel(self.keys, **options)
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query the repositories run, checked with explain() after indexing."""
+
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+@dataclass
+class IndexReport:
+    ensured: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    unindexed: List[str] = field(default_factory=list)
+    unverified: Dict[str, str] = field(default_factory=dict)
+
+
+# One entry per index; names are fixed so re-running is a no-op.
+INDEXES: List[IndexSpec] = [
+    # companies: /join_company, /delete_company, /connect_webhook
+    IndexSpec("companies", [("office_code", ASCENDING)], "office_code_unique", unique=True),
+    # companies: /owner_setup, /my_companies
+    IndexSpec("companies", [("owner_telegram_id", ASCENDING)], "owner_telegram_id"),
+    # companies: /owner_setup creates at most one company per owner, even
+    # when two arrive at once; companies made otherwise aren't flagged
+    IndexSpec(
+        "companies",
+        [("owner_telegram_id", ASCENDING), ("first_company", ASCENDING)],
+        "owner_first_company_unique",
+        unique=True,
+        partial_filter={"first_company": True},
+    ),
+    # employees: every free-text message, /leave_company
+    IndexSpec("employees", [("telegram_id", ASCENDING)], "telegram_id"),
+    # employees: /join_company; prefix also serves company deletes
+    IndexSpec(
+        "employees",
+        [("company_id", ASCENDING), ("telegram_id", ASCENDING)],
+        "company_id_telegram_id_unique",
+        unique=True,
+    ),
+    # jobs: keyset pages of a company's listing, newest first; prefix
+    # serves company deletes (replaces company_id_created_at, see RETIRED_INDEXES)
+    IndexSpec(
+        "jobs",
+        [("company_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+        "company_id_created_at_id",
+    ),
+    # jobs: listings filtered by employee or status
+    IndexSpec(
+        "jobs",
+        [
+            ("company_id", ASCENDING),
+            ("created_by_employee_id", ASCENDING),
+            ("created_at", ASCENDING),
+            ("_id", ASCENDING),
+        ],
+        "company_id_employee_created_at_id",
+    ),
+    IndexSpec(
+        "jobs",
+        [
+            ("company_id", ASCENDING),
+            ("status", ASCENDING),
+            ("created_at", ASCENDING),
+            ("_id", ASCENDING),
+        ],
+        "company_id_status_created_at_id",
+    ),
+    # jobs: edits of a Telegram message update the job it created;
+    # unique so a redelivered message can never insert a second job
+    IndexSpec(
+        "jobs",
+        [("telegram_chat_id", ASCENDING), ("telegram_message_id", ASCENDING)],
+        "telegram_message_unique",
+        unique=True,
+        partial_filter={"telegram_message_id": {"$exists": True}},
+    ),
+    # integrations: set_company_webhook upsert; prefix serves the webhook lookups
+    IndexSpec(
+        "integrations",
+        [("company_id", ASCENDING), ("name", ASCENDING)],
+        "company_id_name_unique",
+        unique=True,
+    ),
+    # vocabularies: one per company; version checks read only this index's doc
+    IndexSpec(
+        "vocabularies",
+        [("company_id", ASCENDING)],
+        "company_id_unique",
+        unique=True,
+    ),
+    # daily_rollups: the $inc upsert for each job and /digest; prefix serves company deletes
+    IndexSpec(
+        "daily_rollups",
+        [("company_id", ASCENDING), ("day", ASCENDING)],
+        "company_id_day_unique",
+        unique=True,
+    ),
+    # daily_rollups: the digest scheduler's one fetch of unsent days
+    IndexSpec(
+        "daily_rollups",
+        [("day", ASCENDING), ("digest_sent_at", ASCENDING)],
+        "day_digest_sent_at",
+    ),
+    # daily_rollups: old days expire on their own
+    IndexSpec(
+        "daily_rollups",
+        [("updated_at", ASCENDING)],
+        "updated_at_ttl",
+        expire_after_seconds=settings.ROLLUP_RETENTION_SECONDS,
+    ),
+    # outbox: dispatcher claim query
+    IndexSpec(
+        "outbox",
+        [("status", ASCENDING), ("next_attempt_at", ASCENDING)],
+        "status_next_attempt_at",
+    ),
+    # outbox: /delete_company drops the company's undelivered records
+    IndexSpec("outbox", [("company_id", ASCENDING)], "company_id"),
+    # outbox: a claim reads back the records it tagged
+    IndexSpec("outbox", [("claim_token", ASCENDING)], "claim_token"),
+    # outbox: a redelivered message checks its job has its records
+    IndexSpec("outbox", [("job_id", ASCENDING)], "job_id"),
+    # outbox: delivered records expire on their own
+    IndexSpec(
+        "outbox",
+        [("delivered_at", ASCENDING)],
+        "delivered_at_ttl",
+        expire_after_seconds=settings.OUTBOX_RETENTION_SECONDS,
+    ),
+    # processed_updates: update_id dedup entries expire on their own
+    IndexSpec(
+        "processed_updates",
+        [("created_at", ASCENDING)],
+        "created_at_ttl",
+        expire_after_seconds=settings.DEDUP_TTL_SECONDS,
+    ),
+]
+
+
+_SAMPLE_OID = ObjectId()
+
+QUERIES: List[QueryShape] = [
+    QueryShape("get_company_by_code", "companies", {"office_code": "ABC123"}),
+    QueryShape("get_companies_by_owner", "companies", {"owner_telegram_id": 0}),
+    QueryShape("get_employee_by_telegram", "employees", {"telegram_id": 0}),
+    QueryShape(
+        "get_or_create_employee_by_telegram",
+        "employees",
+        {"company_id": _SAMPLE_OID, "telegram_id": 0},
+    ),
+    QueryShape("delete_company_and_related:employees", "employees", {"company_id": _SAMPLE_OID}),
+    QueryShape("delete_company_and_related:jobs", "jobs", {"company_id": _SAMPLE_OID}),
+    QueryShape(
+        "delete_company_and_related:integrations",
+        "integrations",
+        {"company_id": _SAMPLE_OID},
+    ),
+    QueryShape(
+        "set_company_webhook",
+        "integrations",
+        {"company_id": _SAMPLE_OID, "name": "default_webhook"},
+    ),
+    QueryShape("get_company_webhooks", "integrations", {"company_id": _SAMPLE_OID}),
+    QueryShape("get_company_webhook_urls", "integrations", {"company_id": _SAMPLE_OID}),
+    QueryShape(
+        "update_job_from_edit",
+        "jobs",
+        {"telegram_chat_id": 0, "telegram_message_id": 0},
+    ),
+    QueryShape(
+        "list_company_jobs",
+        "jobs",
+        {
+            "company_id": _SAMPLE_OID,
+            "created_at": {"$lte": datetime(2000, 1, 1)},
+            "$or": [
+                {"created_at": {"$lt": datetime(2000, 1, 1)}},
+                {"created_at": datetime(2000, 1, 1), "_id": {"$lt": _SAMPLE_OID}},
+            ],
+        },
+        sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+    QueryShape(
+        "list_company_jobs:employee",
+        "jobs",
+        {"company_id": _SAMPLE_OID, "created_by_employee_id": _SAMPLE_OID},
+        sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+    QueryShape(
+        "list_company_jobs:status",
+        "jobs",
+        {"company_id": _SAMPLE_OID, "status": "new"},
+        sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+    QueryShape(
+        "iter_company_jobs",
+        "jobs",
+        {"company_id": _SAMPLE_OID, "created_at": {"$gte": datetime(2000, 1, 1)}},
+        sort=[("created_at", ASCENDING), ("_id", ASCENDING)],
+    ),
+    QueryShape(
+        "get_company_employee",
+        "employees",
+        {"company_id": _SAMPLE_OID, "telegram_id": 0},
+    ),
+    QueryShape(
+        "get_company_vocabulary_version",
+        "vocabularies",
+        {"company_id": _SAMPLE_OID},
+    ),
+    QueryShape(
+        "get_daily_rollup",
+        "daily_rollups",
+        {"company_id": _SAMPLE_OID, "day": "2000-01-01"},
+    ),
+    QueryShape(
+        "get_unsent_rollups",
+        "daily_rollups",
+        {"day": {"$in": ["2000-01-01", "2000-01-02"]}, "digest_sent_at": None},
+    ),
+    QueryShape("delete_company_and_related:daily_rollups", "daily_rollups", {"company_id": _SAMPLE_OID}),
+    QueryShape("create_job:outbox_exists_for_job", "outbox", {"job_id": _SAMPLE_OID}),
+    QueryShape(
+        "delete_company_and_related:outbox",
+        "outbox",
+        {"company_id": _SAMPLE_OID, "status": {"$ne": "delivered"}},
+    ),
+    QueryShape(
+        "claim_outbox_batch",
+        "outbox",
+        {"status": "pending", "next_attempt_at": {"$lte": datetime(2000, 1, 1)}},
+        sort=[("next_attempt_at", ASCENDING)],
+    ),
+    QueryShape("claim_outbox_batch:claimed", "outbox", {"claim_token": _SAMPLE_OID}),
+]
+
+
+# (collection, name) of indexes an entry in INDEXES has replaced; dropped
+# once their replacements exist, so writes stop maintaining them.
+RETIRED_INDEXES: List[Tuple[str, str]] = [
+    ("jobs", "company_id_created_at"),
+]
+
+
+def _uses_collscan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_uses_collscan(v) for v in plan.values())
+    if isinstance(plan, list):
+        return any(_uses_collscan(v) for v in plan)
+    return False
+
+
+async def _explain(shape: QueryShape) -> dict:
+    cursor = db[shape.collection].find(shape.filter)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    return await cursor.explain()
+
+
+async def ensure_indexes(
+    indexes: Optional[List[IndexSpec]] = None,
+    queries: Optional[List[QueryShape]] = None,
+    retired: Optional[List[Tuple[str, str]]] = None,
+) -> IndexReport:
+    """
+    Create every index in INDEXES (safe to run on every startup), drop
+    the RETIRED_INDEXES still present, then explain() each query in
+    QUERIES and report the ones that still scan a whole collection.
+
+    Failures are reported instead of raised, so a conflicting index or
+    duplicate data doesn't keep the app from starting.
+    """
+    indexes = INDEXES if indexes is None else indexes
+    queries = QUERIES if queries is None else queries
+    retired = RETIRED_INDEXES if retired is None else retired
+    report = IndexReport()
+
+    for spec in indexes:
+        key = f"{spec.collection}.{spec.name}"
+        # One call per index so one conflict doesn't hide the others
+        try:
+            await db[spec.collection].create_indexes([spec.model()])
+            report.ensured.append(key)
+        except ConnectionFailure as e:
+            # Mongo is unreachable: every other call would just time out too
+            report.failed[key] = repr(e)
+            print("[indexes] giving up, database unreachable:", repr(e))
+            return report
+        except Exception as e:
+            report.failed[key] = repr(e)
+
+    for collection, name in retired:
+        key = f"{collection}.{name}"
+        # Keep the old index if anything on this collection failed: it may
+        # be what its queries still rely on
+        if any(failed.startswith(f"{collection}.") for failed in report.failed):
+            continue
+        try:
+            if name in await db[collection].index_information():
+                await db[collection].drop_index(name)
+                report.dropped.append(key)
+        except Exception as e:
+            report.failed[key] = repr(e)
+
+    for shape in queries:
+        try:
+            explained = await _explain(shape)
+        except Exception as e:
+            report.unverified[shape.name] = repr(e)
+            continue
+        winning = explained.get("queryPlanner", {}).get("winningPlan", explained)
+        if _uses_collscan(winning):
+            report.unindexed.append(shape.name)
+
+    print(
+        "[indexes] ensured",
+        len(report.ensured),
+        "dropped",
+        report.dropped or "none",
+        "failed",
+        len(report.failed),
+        "unindexed queries",
+        report.unindexed or "none",
+    )
+    for name, error in report.failed.items():
+        print("[indexes] could not create", name, "error:", error)
+    for name, error in report.unverified.items():
+        print("[indexes] could not explain", name, "error:", error)
+
+    return report
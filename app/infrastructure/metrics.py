@@ -0,0 +1,301 @@
+import functools
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Everything here runs on the event loop thread, so plain dict/list updates
+# are enough: no locks on the hot path.
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every label set, without the header."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observe() is a bisect and two list writes."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: object) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+GaugeReading = Union[float, Dict[LabelValues, float]]
+
+
+class GaugeFunc(_Metric):
+    """
+    Gauge read at scrape time from a callback, e.g. a queue's current depth.
+    The callback returns a number, or {label values: number} with labelnames.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], GaugeReading],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        try:
+            reading = self.fn()
+        except Exception as e:
+            print("[metrics] gauge", self.name, "failed:", repr(e))
+            return []
+        if not isinstance(reading, dict):
+            return [f"{self.name} {_format_value(reading)}"]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in reading.items()
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Module reloads re-register; keep the original series
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def gauge_func(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], GaugeReading],
+        labelnames: Sequence[str] = (),
+    ) -> GaugeFunc:
+        return self.register(GaugeFunc(name, help, fn, labelnames))  # type: ignore[return-value]
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+# -------------------- shared metrics --------------------
+
+update_seconds = metrics.histogram(
+    "artlix_update_handling_seconds",
+    "Time to handle one Telegram update, by command.",
+    ["command"],
+)
+
+repository_seconds = metrics.histogram(
+    "artlix_repository_seconds",
+    "Latency of repository functions.",
+    ["function", "outcome"],
+)
+
+telegram_api_seconds = metrics.histogram(
+    "artlix_telegram_api_seconds",
+    "Latency of Bot API calls, by method.",
+    ["method", "outcome"],
+)
+
+telegram_sends_total = metrics.counter(
+    "artlix_telegram_sends_total",
+    "Outbound Telegram messages by outcome (sent, retry_after, error, dropped) and priority.",
+    ["outcome", "priority"],
+)
+
+# Labelled by status class, not destination: hosts are customer-supplied
+# (one series each, and they'd be listed to whoever reads /metrics)
+outbound_webhook_seconds = metrics.histogram(
+    "artlix_outbound_webhook_seconds",
+    "Latency of outbound webhook POSTs, by status class (2xx..5xx, 'error' if no response).",
+    ["status"],
+)
+
+outbound_webhook_total = metrics.counter(
+    "artlix_outbound_webhook_total",
+    "Outbound webhook POSTs by status class (2xx..5xx, 'error' if no response).",
+    ["status"],
+)
+
+extraction_total = metrics.counter(
+    "artlix_extraction_total",
+    "Field extractions by where they ran: pool, inline, or why the regex fallback was used.",
+    ["outcome"],
+)
+
+
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """Expose a cache's stats() (hits, misses, size, hit_rate) as gauges."""
+    _caches[name] = cache
+
+
+def _cache_stat(stat: str) -> Callable[[], Dict[LabelValues, float]]:
+    return lambda: {(name,): c.stats()[stat] for name, c in _caches.items()}  # type: ignore[attr-defined]
+
+
+metrics.gauge_func("artlix_cache_hits", "Cache hits since start.", _cache_stat("hits"), ["cache"])
+metrics.gauge_func("artlix_cache_misses", "Cache misses since start.", _cache_stat("misses"), ["cache"])
+metrics.gauge_func("artlix_cache_hit_ratio", "Cache hit ratio since start.", _cache_stat("hit_rate"), ["cache"])
+metrics.gauge_func("artlix_cache_size", "Entries currently cached.", _cache_stat("size"), ["cache"])
+
+
+def timed_repository(fn):
+    """Record a repository coroutine's latency under its function name."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            repository_seconds.observe(
+                time.perf_counter() - started,
+                function=name,
+                outcome=outcome,
+            )
+
+    return wrapper
@@ -1,23 +1,25 @@
-import httpx
+from typing import Optional
+
 from app.core.config import get_settings
 from app.domain.models import Job
+from app.infrastructure.http_client import get_http_client
 
 settings = get_settings()
 
 
-async def trigger_job_created(job: Job):
-    """
-    Trigger n8n workflow for:
-    - Google Sheets tracking
-    - Calendar sync
-    - follow-up automation
-    """
-    url = f"{settings.N8N_BASE_URL}/webhook/job-created/{settings.N8N_WEBHOOK_SECRET}"
+def job_created_url() -> Optional[str]:
+    """n8n webhook URL for job-created events, or None if n8n isn't configured."""
+    if not settings.N8N_BASE_URL or not settings.N8N_WEBHOOK_SECRET:
+        return None
+    base = settings.N8N_BASE_URL.rstrip("/")
+    return f"{base}/webhook/job-created/{settings.N8N_WEBHOOK_SECRET}"
 
-    payload = {
-        "job_id": job.id,
-        "company_id": job.company_id,
-        "created_by_employee_id": job.created_by_employee_id,
+
+def build_job_created_payload(job: Job) -> dict:
+    return {
+        "job_id": str(job.id),
+        "company_id": str(job.company_id),
+        "created_by_employee_id": str(job.created_by_employee_id),
         "client_name": job.client_name,
         "job_type": job.job_type,
         "location": job.location,
@@ -25,10 +27,25 @@ async def trigger_job_created(job: Job):
         "budget": job.budget,
         "notes": job.notes,
         "status": job.status,
+        "intent": job.intent,
     }
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            await client.post(url, json=payload)
-        except Exception as e:
-            print("[n8n] job-created error:", e)
+
+async def trigger_job_created(job: Job):
+    """
+    Trigger n8n workflow for:
+    - Google Sheets tracking
+    - Calendar sync
+    - follow-up automation
+
+    Jobs stored through create_job() already reach n8n via the outbox;
+    this is for one-off, best-effort calls.
+    """
+    url = job_created_url()
+    if not url:
+        return
+
+    try:
+        await get_http_client().post(url, json=build_job_created_payload(job), timeout=10)
+    except Exception as e:
+        print("[n8n] job-created error:", e)
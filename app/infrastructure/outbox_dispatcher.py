@@ -0,0 +1,204 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+from app.domain.repositories import (
+    claim_outbox_batch,
+    dead_letter_outbox,
+    extend_outbox_leases,
+    get_company_webhook_urls,
+    mark_outbox_delivered,
+    reschedule_outbox,
+)
+from app.infrastructure.webhook_delivery import DeliveryResult, deliver_webhooks
+
+settings = get_settings()
+
+
+def backoff_seconds(attempts: int) -> float:
+    """
+    Exponential backoff with jitter for the `attempts`-th failure (1-based):
+    half of the delay is fixed, the other half is random.
+    """
+    delay = min(
+        settings.OUTBOX_BACKOFF_MAX_SECONDS,
+        settings.OUTBOX_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)),
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _describe_failure(result: DeliveryResult) -> str:
+    if result.error:
+        return f"{result.url}: {result.error}"
+    return f"{result.url}: HTTP {result.status_code}"
+
+
+class OutboxDispatcher:
+    """
+    Background task that delivers job-created outbox records.
+
+    Each claimed record is delivered on its own task, up to `max_in_flight`
+    at once; as soon as one finishes, its slot is refilled by claiming
+    again. So a slow endpoint only holds its own records' slots, never
+    the deliveries of other companies claimed alongside them.
+
+    Failures are retried with backoff; after OUTBOX_MAX_ATTEMPTS they
+    are dead-lettered.
+
+    A record can wait a long time for its host's delivery slot (a slow
+    integration with many jobs queued). While it is in flight its lease
+    is renewed every third of OUTBOX_LEASE_SECONDS, so it never comes due
+    again and gets POSTed a second time; if this process dies, renewals
+    stop and the lease runs out as before.
+    """
+
+    def __init__(self, *, max_in_flight: int = 200):
+        self.max_in_flight = max(1, max_in_flight)
+        self._task: Optional[asyncio.Task] = None
+        self._renewer: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        # set when a delivery finishes (a slot is free) or on stop()
+        self._wakeup = asyncio.Event()
+        # delivery task -> the claim token its record is held under
+        self._in_flight: Dict[asyncio.Task, object] = {}
+
+    def start(self) -> None:
+        if self._task:
+            return
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+        self._renewer = asyncio.create_task(self._renew_leases(), name="outbox-lease-renewer")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        if self._in_flight:
+            # Unfinished records go back to pending when their lease runs out
+            _, unfinished = await asyncio.wait(
+                list(self._in_flight), timeout=settings.WEBHOOK_TIMEOUT_SECONDS + 5
+            )
+            for task in unfinished:
+                task.cancel()
+        if self._renewer:
+            self._renewer.cancel()
+            await asyncio.gather(self._renewer, return_exceptions=True)
+            self._renewer = None
+        self._task = None
+
+    async def run_once(self) -> int:
+        """
+        Claim one batch and wait for all of it (scripts and tests; the
+        running dispatcher doesn't wait per batch). Returns how many
+        records were claimed.
+        """
+        records = await claim_outbox_batch(
+            limit=settings.OUTBOX_BATCH_SIZE,
+            lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+        )
+        if records:
+            await asyncio.gather(*(self._process(r) for r in records))
+        return len(records)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            free = self.max_in_flight - len(self._in_flight)
+            wanted = min(settings.OUTBOX_BATCH_SIZE, free)
+            if wanted > 0:
+                try:
+                    records = await claim_outbox_batch(
+                        limit=wanted,
+                        lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+                    )
+                except Exception as e:
+                    print("[outbox] dispatcher error:", repr(e))
+                    records = []
+                for record in records:
+                    task = asyncio.create_task(self._process(record))
+                    self._in_flight[task] = record.get("claim_token")
+                    task.add_done_callback(self._finished)
+                if len(records) == wanted:
+                    # More may be due right now
+                    continue
+
+            try:
+                if wanted > 0:
+                    # Nothing more due: poll again later
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+                    )
+                else:
+                    # Every slot busy: claim again as soon as one frees up
+                    await self._wakeup.wait()
+            except asyncio.TimeoutError:
+                pass
+
+    async def _renew_leases(self) -> None:
+        interval = settings.OUTBOX_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            tokens = list({token for token in self._in_flight.values() if token is not None})
+            try:
+                await extend_outbox_leases(tokens, lease_seconds=settings.OUTBOX_LEASE_SECONDS)
+            except Exception as e:
+                print("[outbox] lease renewal error:", repr(e))
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._in_flight.pop(task, None)
+        if not task.cancelled() and task.exception() is not None:
+            print("[outbox] delivery error:", repr(task.exception()))
+        self._wakeup.set()
+
+    async def _process(self, record: dict) -> None:
+        record_id = record["_id"]
+        destinations = record.get("destinations")
+
+        try:
+            if destinations is None:
+                destinations = await get_company_webhook_urls(company_id=record["company_id"])
+
+            if not destinations:
+                await mark_outbox_delivered(record_id)
+                return
+
+            results = await deliver_webhooks(destinations, record["payload"])
+        except Exception as e:
+            # Still None if the webhook lookup itself failed; resolved next try
+            failed: Optional[List[str]] = destinations
+            error = repr(e)
+        else:
+            failed_results = [r for r in results if not r.ok]
+            if not failed_results:
+                await mark_outbox_delivered(record_id)
+                return
+            failed = [r.url for r in failed_results]
+            error = "; ".join(_describe_failure(r) for r in failed_results)
+
+        attempts = record.get("attempts", 0) + 1
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            print("[outbox] dead-lettering", record_id, "after", attempts, "attempts:", error)
+            await dead_letter_outbox(
+                record_id,
+                attempts=attempts,
+                destinations=failed,
+                error=error,
+            )
+            return
+
+        await reschedule_outbox(
+            record_id,
+            attempts=attempts,
+            next_attempt_at=datetime.utcnow() + timedelta(seconds=backoff_seconds(attempts)),
+            destinations=failed,
+            error=error,
+        )
+
+
+outbox_dispatcher = OutboxDispatcher(max_in_flight=settings.OUTBOX_MAX_IN_FLIGHT)
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from app.core.config import get_settings
+from app.infrastructure.storage.base import DuplicateKeyError, StorageBackend
+
+__all__ = ["DuplicateKeyError", "StorageBackend", "get_storage", "use_storage"]
+
+_storage: Optional[StorageBackend] = None
+
+
+def _create(backend: str) -> StorageBackend:
+    # Imported here so the memory backend never loads Motor
+    if backend == "mongo":
+        from app.infrastructure.storage.mongo import MongoStorage
+
+        return MongoStorage()
+    if backend == "memory":
+        from app.infrastructure.storage.memory import InMemoryStorage
+
+        return InMemoryStorage()
+    raise ValueError(f"unknown STORAGE_BACKEND {backend!r} (expected 'mongo' or 'memory')")
+
+
+def get_storage() -> StorageBackend:
+    """The backend selected by STORAGE_BACKEND, created on first use."""
+    global _storage
+    if _storage is None:
+        _storage = _create(get_settings().STORAGE_BACKEND)
+    return _storage
+
+
+def use_storage(backend: StorageBackend) -> None:
+    """Swap the backend, e.g. a fresh InMemoryStorage per test or benchmark run."""
+    global _storage
+    _storage = backend
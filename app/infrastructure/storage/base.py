@@ -0,0 +1,268 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+Doc = Dict[str, Any]
+
+
+class DuplicateKeyError(Exception):
+    """
+    A write hit a unique constraint.
+
+    `key` names the constraint: "office_code", "owner" (one /owner_setup
+    company per owner), "employee" (company_id + telegram_id),
+    "telegram_message" (job source) or "other".
+    """
+
+    def __init__(self, key: str, detail: str = ""):
+        super().__init__(f"duplicate {key}: {detail}" if detail else f"duplicate {key}")
+        self.key = key
+
+
+class StorageBackend(ABC):
+    """
+    Document-level storage for the repositories in app/domain/repositories.py.
+
+    One method per query shape the repositories run, so each backend can
+    serve it from a matching index. Documents are plain dicts shaped like
+    the Mongo documents (ObjectId `_id`, `company_id`, ...).
+
+    Reads that take `fields` return only those fields plus `_id`, like a
+    Mongo projection; None returns whole documents.
+    """
+
+    name = "abstract"
+
+    # -------------------- companies --------------------
+
+    @abstractmethod
+    async def insert_company(self, doc: Doc) -> None:
+        """Raises DuplicateKeyError("office_code") on a code collision."""
+
+    @abstractmethod
+    async def insert_company_unless_owner_has_one(self, doc: Doc) -> Optional[Doc]:
+        """
+        Insert `doc` unless its owner already has a company.
+        Returns that existing company, or None if `doc` was inserted.
+        Raises DuplicateKeyError("owner") if a concurrent call inserted
+        the owner's company first, or ("office_code") on a code collision.
+        """
+
+    @abstractmethod
+    async def find_company_by_id(
+        self,
+        company_id: ObjectId,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def find_company_by_owner(self, owner_telegram_id: int) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def find_companies_by_owner(self, owner_telegram_id: int) -> List[Doc]: ...
+
+    @abstractmethod
+    async def find_company_by_code(self, office_code: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def update_company(self, company_id: ObjectId, fields: Doc) -> bool:
+        """Set `fields` (not office_code or owner) on a company; False if it doesn't exist."""
+
+    @abstractmethod
+    async def delete_company_cascade(self, company_id: ObjectId) -> int:
+        """
+        Delete a company with its employees, jobs, integrations, vocabulary,
+        rollups and undelivered (pending or dead) outbox records. Returns 0 or 1.
+        """
+
+    # -------------------- employees --------------------
+
+    @abstractmethod
+    async def insert_employee(self, doc: Doc) -> None: ...
+
+    @abstractmethod
+    async def upsert_employee(
+        self,
+        company_id: ObjectId,
+        telegram_id: int,
+        on_insert: Doc,
+    ) -> Doc:
+        """Return the (company_id, telegram_id) row, inserting it with `on_insert` fields if missing."""
+
+    @abstractmethod
+    async def find_employee_by_telegram(self, telegram_id: int) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def find_employee(self, company_id: ObjectId, telegram_id: int) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def delete_employees_by_telegram(self, telegram_id: int) -> int: ...
+
+    # -------------------- jobs --------------------
+
+    @abstractmethod
+    async def insert_job(self, doc: Doc) -> None:
+        """Raises DuplicateKeyError("telegram_message") if the source message already has a job."""
+
+    @abstractmethod
+    async def find_job_by_message(self, chat_id: int, message_id: int) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def update_job_by_message(
+        self,
+        chat_id: int,
+        message_id: int,
+        fields: Doc,
+    ) -> Optional[Doc]:
+        """
+        Set `fields` on the job created from a message; returns the job as
+        it was just before the update (so callers can diff it), or None.
+        """
+
+    @abstractmethod
+    async def find_jobs_page(
+        self,
+        company_id: ObjectId,
+        *,
+        limit: int,
+        status: Optional[str] = None,
+        employee_id: Optional[ObjectId] = None,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        """
+        Up to `limit` of a company's jobs, newest first by (created_at, _id),
+        matching the filters. `after` is the (created_at, _id) of the last
+        job of the previous page: the page starts right after it, so the
+        cost doesn't grow with how deep the listing goes.
+        """
+
+    @abstractmethod
+    def iter_jobs(
+        self,
+        company_id: ObjectId,
+        *,
+        batch_size: int,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Doc]:
+        """
+        Every job of a company, oldest first by (created_at, _id), starting
+        after `after`. Documents are read `batch_size` at a time, so only
+        one batch is held however many jobs there are.
+        """
+
+    # -------------------- integrations --------------------
+
+    @abstractmethod
+    async def upsert_integration(self, company_id: ObjectId, name: str, doc: Doc) -> None: ...
+
+    @abstractmethod
+    async def find_integrations(
+        self,
+        company_id: ObjectId,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]: ...
+
+    # -------------------- vocabularies --------------------
+
+    @abstractmethod
+    async def find_vocabulary(self, company_id: ObjectId) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def find_vocabulary_version(self, company_id: ObjectId) -> Optional[int]:
+        """Just the version number, so change checks stay cheap."""
+
+    @abstractmethod
+    async def add_vocabulary_keywords(
+        self,
+        company_id: ObjectId,
+        intent: str,
+        keywords: List[str],
+        now: datetime,
+    ) -> Doc:
+        """Add keywords (no duplicates) under `intent` and bump the version; returns the vocabulary."""
+
+    @abstractmethod
+    async def remove_vocabulary_keywords(
+        self,
+        company_id: ObjectId,
+        intent: str,
+        keywords: List[str],
+        now: datetime,
+    ) -> Optional[Doc]:
+        """Remove keywords and bump the version; None if the company has no vocabulary."""
+
+    # -------------------- daily rollups --------------------
+
+    @abstractmethod
+    async def increment_rollup(
+        self,
+        company_id: ObjectId,
+        day: str,
+        increments: Dict[str, float],
+        on_insert: Doc,
+        fields: Doc,
+    ) -> None:
+        """
+        Add `increments` to the company's rollup for `day` and set `fields`,
+        creating it with the `on_insert` fields if missing. Keys may be
+        dotted paths, e.g. "by_status.new".
+        """
+
+    @abstractmethod
+    async def find_rollup(self, company_id: ObjectId, day: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def find_unsent_rollups(self, days: List[str]) -> List[Doc]:
+        """Rollups of any company for any of `days` whose digest isn't claimed yet."""
+
+    @abstractmethod
+    async def claim_rollup_digest(self, rollup_id: ObjectId, now: datetime) -> bool:
+        """Mark the rollup's digest as sent; False if it already was (e.g. by another instance)."""
+
+    # -------------------- outbox --------------------
+
+    @abstractmethod
+    async def insert_outbox(self, records: List[Doc]) -> None: ...
+
+    @abstractmethod
+    async def insert_job_with_outbox(self, doc: Doc, records: List[Doc]) -> None:
+        """
+        insert_job and insert_outbox as one write: the job and its outbox
+        records are stored together or not at all. Raises DuplicateKeyError
+        like insert_job, with nothing stored.
+        """
+
+    @abstractmethod
+    async def outbox_exists_for_job(self, job_id: ObjectId) -> bool: ...
+
+    @abstractmethod
+    async def claim_outbox(
+        self,
+        *,
+        status: str,
+        now: datetime,
+        lease_until: datetime,
+        limit: int,
+        token: ObjectId,
+    ) -> List[Doc]:
+        """
+        Claim up to `limit` records with `status` due at `now`, oldest first,
+        moving their `next_attempt_at` to `lease_until` and tagging them
+        with `claim_token` = `token`. A record is never claimed twice while
+        its lease runs.
+        """
+
+    @abstractmethod
+    async def extend_outbox_leases(self, tokens: List[ObjectId], lease_until: datetime) -> None:
+        """Move `next_attempt_at` to `lease_until` on records still tagged with any of `tokens`."""
+
+    @abstractmethod
+    async def update_outbox(self, record_id: ObjectId, fields: Doc) -> None: ...
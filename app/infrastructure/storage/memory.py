@@ -0,0 +1,523 @@
+import asyncio
+import bisect
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from bson import ObjectId
+
+from app.infrastructure.storage.base import Doc, DuplicateKeyError, StorageBackend
+
+
+def _copy(doc: Optional[Doc]) -> Optional[Doc]:
+    # Callers get their own dict, like documents decoded from Mongo
+    return dict(doc) if doc is not None else None
+
+
+def _project(doc: Optional[Doc], fields: Optional[Sequence[str]]) -> Optional[Doc]:
+    # Same shape as a Mongo projection: the fields that exist, plus _id
+    if doc is None or not fields:
+        return _copy(doc)
+    projected = {f: doc[f] for f in fields if f in doc}
+    if "_id" in doc:
+        projected["_id"] = doc["_id"]
+    return projected
+
+
+def _dotted(doc: Doc, path: str) -> Tuple[Doc, str]:
+    """The dict holding `path`'s last part, creating the ones above it."""
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    return doc, leaf
+
+
+JobKey = Tuple[datetime, ObjectId]
+
+
+class InMemoryStorage(StorageBackend):
+    """
+    Process-local storage for tests, benchmarks and single-instance demos.
+
+    Each lookup the repositories make has its own dict index, mirroring
+    the Mongo indexes in indexes.py, so every query is O(1) or O(matches).
+    No method awaits, so each one is atomic on the event loop, the same
+    guarantee the Mongo backend gets from single-document updates.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._companies: Dict[ObjectId, Doc] = {}
+        self._company_by_code: Dict[str, ObjectId] = {}
+        self._companies_by_owner: Dict[int, List[ObjectId]] = {}
+
+        self._employees: Dict[ObjectId, Doc] = {}
+        self._employee_by_key: Dict[Tuple[ObjectId, int], ObjectId] = {}
+        self._employees_by_telegram: Dict[int, List[ObjectId]] = {}
+        self._employees_by_company: Dict[ObjectId, Set[ObjectId]] = {}
+
+        self._jobs: Dict[ObjectId, Doc] = {}
+        self._job_by_message: Dict[Tuple[int, int], ObjectId] = {}
+        self._jobs_by_company: Dict[ObjectId, Set[ObjectId]] = {}
+        # (created_at, _id) keys in order, per company and per (company,
+        # employee): the (company_id, [created_by_employee_id,] created_at, _id) indexes
+        self._job_keys_by_company: Dict[ObjectId, List[JobKey]] = {}
+        self._job_keys_by_employee: Dict[Tuple[ObjectId, ObjectId], List[JobKey]] = {}
+
+        # company_id -> name -> integration
+        self._integrations: Dict[ObjectId, Dict[str, Doc]] = {}
+
+        self._vocabularies: Dict[ObjectId, Doc] = {}
+
+        # (company_id, day) -> rollup
+        self._rollups: Dict[Tuple[ObjectId, str], Doc] = {}
+        self._rollup_days_by_company: Dict[ObjectId, Set[str]] = {}
+        self._rollup_companies_by_day: Dict[str, Set[ObjectId]] = {}
+        self._rollup_ids: Dict[ObjectId, Tuple[ObjectId, str]] = {}
+
+        self._outbox: Dict[ObjectId, Doc] = {}
+        # status -> record ids; the claim scan only looks at one status
+        self._outbox_by_status: Dict[str, Set[ObjectId]] = {}
+        self._outbox_job_ids: Set[ObjectId] = set()
+        # claim token -> records it still holds
+        self._outbox_by_claim: Dict[ObjectId, Set[ObjectId]] = {}
+
+    # -------------------- companies --------------------
+
+    async def insert_company(self, doc: Doc) -> None:
+        self._insert_company(doc)
+
+    def _insert_company(self, doc: Doc) -> None:
+        code = doc["office_code"]
+        if code in self._company_by_code:
+            raise DuplicateKeyError("office_code", code)
+        doc = dict(doc)
+        doc.setdefault("_id", ObjectId())
+        self._companies[doc["_id"]] = doc
+        self._company_by_code[code] = doc["_id"]
+        self._companies_by_owner.setdefault(doc["owner_telegram_id"], []).append(doc["_id"])
+
+    async def insert_company_unless_owner_has_one(self, doc: Doc) -> Optional[Doc]:
+        owned = self._companies_by_owner.get(doc["owner_telegram_id"])
+        if owned:
+            return _copy(self._companies[owned[0]])
+        self._insert_company(doc)
+        return None
+
+    async def find_company_by_id(
+        self,
+        company_id: ObjectId,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[Doc]:
+        return _project(self._companies.get(company_id), fields)
+
+    async def find_company_by_owner(self, owner_telegram_id: int) -> Optional[Doc]:
+        owned = self._companies_by_owner.get(owner_telegram_id)
+        return _copy(self._companies[owned[0]]) if owned else None
+
+    async def find_companies_by_owner(self, owner_telegram_id: int) -> List[Doc]:
+        return [dict(self._companies[i]) for i in self._companies_by_owner.get(owner_telegram_id, ())]
+
+    async def find_company_by_code(self, office_code: str) -> Optional[Doc]:
+        company_id = self._company_by_code.get(office_code)
+        return _copy(self._companies[company_id]) if company_id is not None else None
+
+    async def update_company(self, company_id: ObjectId, fields: Doc) -> bool:
+        doc = self._companies.get(company_id)
+        if doc is None:
+            return False
+        doc.update(fields)
+        return True
+
+    async def delete_company_cascade(self, company_id: ObjectId) -> int:
+        doc = self._companies.pop(company_id, None)
+        if doc is not None:
+            self._company_by_code.pop(doc["office_code"], None)
+            owned = self._companies_by_owner.get(doc["owner_telegram_id"], [])
+            if company_id in owned:
+                owned.remove(company_id)
+            if not owned:
+                self._companies_by_owner.pop(doc["owner_telegram_id"], None)
+
+        for employee_id in self._employees_by_company.pop(company_id, set()):
+            self._remove_employee(employee_id)
+        self._job_keys_by_company.pop(company_id, None)
+        for job_id in self._jobs_by_company.pop(company_id, set()):
+            job = self._jobs.pop(job_id)
+            self._job_keys_by_employee.pop((company_id, job.get("created_by_employee_id")), None)
+            if job.get("telegram_message_id") is not None:
+                self._job_by_message.pop(
+                    (job.get("telegram_chat_id"), job["telegram_message_id"]), None
+                )
+        self._integrations.pop(company_id, None)
+        self._vocabularies.pop(company_id, None)
+        for day in self._rollup_days_by_company.pop(company_id, set()):
+            rollup = self._rollups.pop((company_id, day))
+            self._rollup_ids.pop(rollup["_id"], None)
+            self._rollup_companies_by_day.get(day, set()).discard(company_id)
+        # Records that failed once keep their destinations, so they would
+        # still be POSTed; delivered ones stay, as on Mongo until they expire
+        for record in [
+            r for r in self._outbox.values()
+            if r["company_id"] == company_id and r["status"] != "delivered"
+        ]:
+            self._release_claim(record)
+            self._outbox_by_status.get(record["status"], set()).discard(record["_id"])
+            self._outbox_job_ids.discard(record.get("job_id"))
+            del self._outbox[record["_id"]]
+        return 0 if doc is None else 1
+
+    # -------------------- employees --------------------
+
+    async def insert_employee(self, doc: Doc) -> None:
+        self._insert_employee(doc)
+
+    def _insert_employee(self, doc: Doc) -> Doc:
+        key = (doc["company_id"], doc["telegram_id"])
+        if key in self._employee_by_key:
+            raise DuplicateKeyError("employee", repr(key))
+        doc = dict(doc)
+        doc.setdefault("_id", ObjectId())
+        employee_id = doc["_id"]
+        self._employees[employee_id] = doc
+        self._employee_by_key[key] = employee_id
+        self._employees_by_telegram.setdefault(doc["telegram_id"], []).append(employee_id)
+        self._employees_by_company.setdefault(doc["company_id"], set()).add(employee_id)
+        return doc
+
+    def _remove_employee(self, employee_id: ObjectId) -> None:
+        doc = self._employees.pop(employee_id, None)
+        if doc is None:
+            return
+        self._employee_by_key.pop((doc["company_id"], doc["telegram_id"]), None)
+        ids = self._employees_by_telegram.get(doc["telegram_id"], [])
+        if employee_id in ids:
+            ids.remove(employee_id)
+        if not ids:
+            self._employees_by_telegram.pop(doc["telegram_id"], None)
+        members = self._employees_by_company.get(doc["company_id"])
+        if members is not None:
+            members.discard(employee_id)
+
+    async def upsert_employee(
+        self,
+        company_id: ObjectId,
+        telegram_id: int,
+        on_insert: Doc,
+    ) -> Doc:
+        employee_id = self._employee_by_key.get((company_id, telegram_id))
+        if employee_id is not None:
+            return dict(self._employees[employee_id])
+        doc = self._insert_employee(
+            {**on_insert, "company_id": company_id, "telegram_id": telegram_id}
+        )
+        return dict(doc)
+
+    async def find_employee_by_telegram(self, telegram_id: int) -> Optional[Doc]:
+        ids = self._employees_by_telegram.get(telegram_id)
+        return _copy(self._employees[ids[0]]) if ids else None
+
+    async def find_employee(self, company_id: ObjectId, telegram_id: int) -> Optional[Doc]:
+        employee_id = self._employee_by_key.get((company_id, telegram_id))
+        return _copy(self._employees[employee_id]) if employee_id is not None else None
+
+    async def delete_employees_by_telegram(self, telegram_id: int) -> int:
+        ids = list(self._employees_by_telegram.get(telegram_id, ()))
+        for employee_id in ids:
+            self._remove_employee(employee_id)
+        return len(ids)
+
+    # -------------------- jobs --------------------
+
+    async def insert_job(self, doc: Doc) -> None:
+        message_key = None
+        if doc.get("telegram_message_id") is not None:
+            message_key = (doc.get("telegram_chat_id"), doc["telegram_message_id"])
+            if message_key in self._job_by_message:
+                raise DuplicateKeyError("telegram_message", repr(message_key))
+        doc = dict(doc)
+        doc.setdefault("_id", ObjectId())
+        self._jobs[doc["_id"]] = doc
+        self._jobs_by_company.setdefault(doc["company_id"], set()).add(doc["_id"])
+        key = (doc["created_at"], doc["_id"])
+        bisect.insort(self._job_keys_by_company.setdefault(doc["company_id"], []), key)
+        bisect.insort(
+            self._job_keys_by_employee.setdefault(
+                (doc["company_id"], doc.get("created_by_employee_id")), []
+            ),
+            key,
+        )
+        if message_key is not None:
+            self._job_by_message[message_key] = doc["_id"]
+
+    async def find_job_by_message(self, chat_id: int, message_id: int) -> Optional[Doc]:
+        job_id = self._job_by_message.get((chat_id, message_id))
+        return _copy(self._jobs[job_id]) if job_id is not None else None
+
+    async def update_job_by_message(
+        self,
+        chat_id: int,
+        message_id: int,
+        fields: Doc,
+    ) -> Optional[Doc]:
+        job_id = self._job_by_message.get((chat_id, message_id))
+        if job_id is None:
+            return None
+        job = self._jobs[job_id]
+        before = dict(job)
+        job.update(fields)
+        return before
+
+    async def find_jobs_page(
+        self,
+        company_id: ObjectId,
+        *,
+        limit: int,
+        status: Optional[str] = None,
+        employee_id: Optional[ObjectId] = None,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        if employee_id is not None:
+            keys = self._job_keys_by_employee.get((company_id, employee_id), [])
+        else:
+            keys = self._job_keys_by_company.get(company_id, [])
+
+        # Walk back from the newest key below both the cursor and created_before
+        end = len(keys)
+        if after is not None:
+            end = bisect.bisect_left(keys, tuple(after))
+        if created_before is not None:
+            end = min(end, bisect.bisect_left(keys, (created_before,)))
+
+        page: List[Doc] = []
+        for i in range(end - 1, -1, -1):
+            if len(page) >= limit:
+                break
+            created_at, job_id = keys[i]
+            if created_from is not None and created_at < created_from:
+                break
+            job = self._jobs[job_id]
+            if status is not None and job.get("status") != status:
+                continue
+            page.append(_project(job, fields))
+        return page
+
+    async def iter_jobs(
+        self,
+        company_id: ObjectId,
+        *,
+        batch_size: int,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Doc]:
+        last: Optional[Tuple] = tuple(after) if after is not None else None
+        if created_from is not None and (last is None or last < (created_from,)):
+            last = (created_from,)
+        while True:
+            # Re-find the position each batch: jobs inserted (or a company
+            # deleted) while the consumer was away mustn't shift the walk
+            keys = self._job_keys_by_company.get(company_id, [])
+            start = bisect.bisect_right(keys, last) if last is not None else 0
+            batch = keys[start : start + batch_size]
+            for key in batch:
+                if created_before is not None and key[0] >= created_before:
+                    return
+                job = self._jobs.get(key[1])
+                if job is not None:
+                    yield _project(job, fields)
+                last = key
+            if len(batch) < batch_size:
+                return
+            # Let other tasks run between batches, as a Mongo getMore would
+            await asyncio.sleep(0)
+
+    # -------------------- integrations --------------------
+
+    async def upsert_integration(self, company_id: ObjectId, name: str, doc: Doc) -> None:
+        by_name = self._integrations.setdefault(company_id, {})
+        existing = by_name.get(name)
+        if existing is None:
+            by_name[name] = {"_id": ObjectId(), **doc}
+        else:
+            existing.update(doc)
+
+    async def find_integrations(
+        self,
+        company_id: ObjectId,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        return [_project(doc, fields) for doc in self._integrations.get(company_id, {}).values()]
+
+    # -------------------- vocabularies --------------------
+
+    @staticmethod
+    def _copy_vocabulary(doc: Doc) -> Doc:
+        copied = dict(doc)
+        copied["keywords"] = {k: list(v) for k, v in doc["keywords"].items()}
+        return copied
+
+    async def find_vocabulary(self, company_id: ObjectId) -> Optional[Doc]:
+        doc = self._vocabularies.get(company_id)
+        return self._copy_vocabulary(doc) if doc is not None else None
+
+    async def find_vocabulary_version(self, company_id: ObjectId) -> Optional[int]:
+        doc = self._vocabularies.get(company_id)
+        return doc["version"] if doc is not None else None
+
+    async def add_vocabulary_keywords(
+        self,
+        company_id: ObjectId,
+        intent: str,
+        keywords: List[str],
+        now: datetime,
+    ) -> Doc:
+        doc = self._vocabularies.get(company_id)
+        if doc is None:
+            doc = self._vocabularies[company_id] = {
+                "_id": ObjectId(),
+                "company_id": company_id,
+                "version": 0,
+                "keywords": {},
+            }
+        words = doc["keywords"].setdefault(intent, [])
+        words.extend(k for k in dict.fromkeys(keywords) if k not in words)
+        doc["version"] += 1
+        doc["updated_at"] = now
+        return self._copy_vocabulary(doc)
+
+    async def remove_vocabulary_keywords(
+        self,
+        company_id: ObjectId,
+        intent: str,
+        keywords: List[str],
+        now: datetime,
+    ) -> Optional[Doc]:
+        doc = self._vocabularies.get(company_id)
+        if doc is None:
+            return None
+        if intent in doc["keywords"]:
+            doc["keywords"][intent] = [k for k in doc["keywords"][intent] if k not in keywords]
+        doc["version"] += 1
+        doc["updated_at"] = now
+        return self._copy_vocabulary(doc)
+
+    # -------------------- daily rollups --------------------
+
+    async def increment_rollup(
+        self,
+        company_id: ObjectId,
+        day: str,
+        increments: Dict[str, float],
+        on_insert: Doc,
+        fields: Doc,
+    ) -> None:
+        key = (company_id, day)
+        doc = self._rollups.get(key)
+        if doc is None:
+            doc = self._rollups[key] = {"_id": ObjectId(), "company_id": company_id, "day": day, **on_insert}
+            self._rollup_days_by_company.setdefault(company_id, set()).add(day)
+            self._rollup_companies_by_day.setdefault(day, set()).add(company_id)
+            self._rollup_ids[doc["_id"]] = key
+        # same semantics as $inc / $set on dotted paths
+        for path, amount in increments.items():
+            parent, leaf = _dotted(doc, path)
+            parent[leaf] = parent.get(leaf, 0) + amount
+        for path, value in fields.items():
+            parent, leaf = _dotted(doc, path)
+            parent[leaf] = value
+
+    @staticmethod
+    def _copy_rollup(doc: Doc) -> Doc:
+        return {k: dict(v) if isinstance(v, dict) else v for k, v in doc.items()}
+
+    async def find_rollup(self, company_id: ObjectId, day: str) -> Optional[Doc]:
+        doc = self._rollups.get((company_id, day))
+        return self._copy_rollup(doc) if doc is not None else None
+
+    async def find_unsent_rollups(self, days: List[str]) -> List[Doc]:
+        docs = (
+            self._rollups[(company_id, day)]
+            for day in set(days)
+            for company_id in self._rollup_companies_by_day.get(day, ())
+        )
+        return [self._copy_rollup(doc) for doc in docs if doc.get("digest_sent_at") is None]
+
+    async def claim_rollup_digest(self, rollup_id: ObjectId, now: datetime) -> bool:
+        key = self._rollup_ids.get(rollup_id)
+        doc = self._rollups.get(key) if key is not None else None
+        if doc is None or doc.get("digest_sent_at") is not None:
+            return False
+        doc["digest_sent_at"] = now
+        return True
+
+    # -------------------- outbox --------------------
+
+    async def insert_outbox(self, records: List[Doc]) -> None:
+        for record in records:
+            record = dict(record)
+            record.setdefault("_id", ObjectId())
+            self._outbox[record["_id"]] = record
+            self._outbox_by_status.setdefault(record["status"], set()).add(record["_id"])
+            if record.get("job_id") is not None:
+                self._outbox_job_ids.add(record["job_id"])
+
+    async def insert_job_with_outbox(self, doc: Doc, records: List[Doc]) -> None:
+        # Neither call awaits anything, so nothing runs in between
+        await self.insert_job(doc)
+        await self.insert_outbox(records)
+
+    async def outbox_exists_for_job(self, job_id: ObjectId) -> bool:
+        return job_id in self._outbox_job_ids
+
+    async def claim_outbox(
+        self,
+        *,
+        status: str,
+        now: datetime,
+        lease_until: datetime,
+        limit: int,
+        token: ObjectId,
+    ) -> List[Doc]:
+        due = [
+            self._outbox[i]
+            for i in self._outbox_by_status.get(status, ())
+            if self._outbox[i]["next_attempt_at"] <= now
+        ]
+        due.sort(key=lambda r: r["next_attempt_at"])
+        claimed: List[Doc] = []
+        for record in due[:limit]:
+            self._release_claim(record)
+            record["next_attempt_at"] = lease_until
+            record["claim_token"] = token
+            self._outbox_by_claim.setdefault(token, set()).add(record["_id"])
+            claimed.append(dict(record))
+        return claimed
+
+    async def extend_outbox_leases(self, tokens: List[ObjectId], lease_until: datetime) -> None:
+        for token in tokens:
+            for record_id in self._outbox_by_claim.get(token, ()):
+                self._outbox[record_id]["next_attempt_at"] = lease_until
+
+    def _release_claim(self, record: Doc) -> None:
+        held = self._outbox_by_claim.get(record.get("claim_token"))
+        if held is not None:
+            held.discard(record["_id"])
+            if not held:
+                del self._outbox_by_claim[record["claim_token"]]
+
+    async def update_outbox(self, record_id: ObjectId, fields: Doc) -> None:
+        record = self._outbox.get(record_id)
+        if record is None:
+            return
+        old_status = record["status"]
+        if "claim_token" in fields:
+            self._release_claim(record)
+        record.update(fields)
+        if record["status"] != old_status:
+            self._outbox_by_status.get(old_status, set()).discard(record_id)
+            self._outbox_by_status.setdefault(record["status"], set()).add(record_id)
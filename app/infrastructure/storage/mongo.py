@@ -0,0 +1,415 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo import errors as mongo_errors
+
+from app.infrastructure.db import (
+    client,
+    companies_collection,
+    employees_collection,
+    integrations_collection,
+    jobs_collection,
+    outbox_collection,
+    rollups_collection,
+    vocabularies_collection,
+)
+from app.infrastructure.storage.base import Doc, DuplicateKeyError, StorageBackend
+
+
+def _duplicate_key(error: mongo_errors.DuplicateKeyError) -> DuplicateKeyError:
+    """Name the unique index a write hit (see indexes.py)."""
+    details = error.details or {}
+    fields = details.get("keyPattern") or details.get("keyValue") or {}
+    message = str(error)
+    if "office_code" in fields or "office_code" in message:
+        key = "office_code"
+    elif "owner_telegram_id" in fields or "owner_first_company_unique" in message:
+        key = "owner"
+    elif "telegram_message_id" in fields or "telegram_message_unique" in message:
+        key = "telegram_message"
+    elif "telegram_id" in fields or "company_id_telegram_id_unique" in message:
+        key = "employee"
+    else:
+        key = "other"
+    return DuplicateKeyError(key, message)
+
+
+def _projection(fields: Optional[Sequence[str]]) -> Optional[Doc]:
+    # _id comes back unless excluded, which is what callers expect
+    return {f: 1 for f in fields} if fields else None
+
+
+# "Transaction numbers are only allowed on a replica set member or mongos"
+_NO_TRANSACTIONS = 20
+
+
+class MongoStorage(StorageBackend):
+    """Motor-backed storage; relies on the indexes declared in indexes.py."""
+
+    name = "mongo"
+
+    def __init__(self):
+        # Cleared on a standalone server, which can't run transactions
+        self._transactions = True
+
+    # -------------------- companies --------------------
+
+    async def insert_company(self, doc: Doc) -> None:
+        try:
+            await companies_collection.insert_one(doc)
+        except mongo_errors.DuplicateKeyError as e:
+            raise _duplicate_key(e) from e
+
+    async def insert_company_unless_owner_has_one(self, doc: Doc) -> Optional[Doc]:
+        # owner_telegram_id comes from the query, so it can't be in $setOnInsert too
+        on_insert = {k: v for k, v in doc.items() if k != "owner_telegram_id"}
+        try:
+            return await companies_collection.find_one_and_update(
+                {"owner_telegram_id": doc["owner_telegram_id"]},
+                {"$setOnInsert": on_insert},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except mongo_errors.DuplicateKeyError as e:
+            raise _duplicate_key(e) from e
+
+    async def find_company_by_id(
+        self,
+        company_id: ObjectId,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[Doc]:
+        return await companies_collection.find_one({"_id": company_id}, _projection(fields))
+
+    async def find_company_by_owner(self, owner_telegram_id: int) -> Optional[Doc]:
+        return await companies_collection.find_one({"owner_telegram_id": owner_telegram_id})
+
+    async def find_companies_by_owner(self, owner_telegram_id: int) -> List[Doc]:
+        cursor = companies_collection.find({"owner_telegram_id": owner_telegram_id})
+        return [doc async for doc in cursor]
+
+    async def find_company_by_code(self, office_code: str) -> Optional[Doc]:
+        return await companies_collection.find_one({"office_code": office_code})
+
+    async def update_company(self, company_id: ObjectId, fields: Doc) -> bool:
+        res = await companies_collection.update_one({"_id": company_id}, {"$set": fields})
+        return res.matched_count > 0
+
+    async def delete_company_cascade(self, company_id: ObjectId) -> int:
+        res = await companies_collection.delete_one({"_id": company_id})
+        await employees_collection.delete_many({"company_id": company_id})
+        await jobs_collection.delete_many({"company_id": company_id})
+        await integrations_collection.delete_many({"company_id": company_id})
+        await vocabularies_collection.delete_one({"company_id": company_id})
+        await rollups_collection.delete_many({"company_id": company_id})
+        # Records that failed once keep their destinations, so they would
+        # still be POSTed; delivered ones expire on their own
+        await outbox_collection.delete_many({"company_id": company_id, "status": {"$ne": "delivered"}})
+        return res.deleted_count
+
+    # -------------------- employees --------------------
+
+    async def insert_employee(self, doc: Doc) -> None:
+        try:
+            await employees_collection.insert_one(doc)
+        except mongo_errors.DuplicateKeyError as e:
+            raise _duplicate_key(e) from e
+
+    async def upsert_employee(
+        self,
+        company_id: ObjectId,
+        telegram_id: int,
+        on_insert: Doc,
+    ) -> Doc:
+        query = {"company_id": company_id, "telegram_id": telegram_id}
+        try:
+            return await employees_collection.find_one_and_update(
+                query,
+                {"$setOnInsert": on_insert},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except mongo_errors.DuplicateKeyError:
+            # Lost the race against a concurrent upsert: the row exists now
+            return await employees_collection.find_one(query)
+
+    async def find_employee_by_telegram(self, telegram_id: int) -> Optional[Doc]:
+        return await employees_collection.find_one({"telegram_id": telegram_id})
+
+    async def find_employee(self, company_id: ObjectId, telegram_id: int) -> Optional[Doc]:
+        return await employees_collection.find_one({"company_id": company_id, "telegram_id": telegram_id})
+
+    async def delete_employees_by_telegram(self, telegram_id: int) -> int:
+        res = await employees_collection.delete_many({"telegram_id": telegram_id})
+        return res.deleted_count
+
+    # -------------------- jobs --------------------
+
+    async def insert_job(self, doc: Doc) -> None:
+        try:
+            await jobs_collection.insert_one(doc)
+        except mongo_errors.DuplicateKeyError as e:
+            raise _duplicate_key(e) from e
+
+    async def find_job_by_message(self, chat_id: int, message_id: int) -> Optional[Doc]:
+        return await jobs_collection.find_one(
+            {"telegram_chat_id": chat_id, "telegram_message_id": message_id}
+        )
+
+    async def update_job_by_message(
+        self,
+        chat_id: int,
+        message_id: int,
+        fields: Doc,
+    ) -> Optional[Doc]:
+        return await jobs_collection.find_one_and_update(
+            {"telegram_chat_id": chat_id, "telegram_message_id": message_id},
+            {"$set": fields},
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    async def find_jobs_page(
+        self,
+        company_id: ObjectId,
+        *,
+        limit: int,
+        status: Optional[str] = None,
+        employee_id: Optional[ObjectId] = None,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        query: Doc = {"company_id": company_id}
+        if status is not None:
+            query["status"] = status
+        if employee_id is not None:
+            query["created_by_employee_id"] = employee_id
+        created: Doc = {}
+        if created_from is not None:
+            created["$gte"] = created_from
+        if created_before is not None:
+            created["$lt"] = created_before
+        if after is not None:
+            last_created_at, last_id = after
+            # The $lte bounds the index scan; the $or skips what the
+            # previous page already returned at that same timestamp
+            if created_before is None or last_created_at < created_before:
+                created.pop("$lt", None)
+                created["$lte"] = last_created_at
+            query["$or"] = [
+                {"created_at": {"$lt": last_created_at}},
+                {"created_at": last_created_at, "_id": {"$lt": last_id}},
+            ]
+        if created:
+            query["created_at"] = created
+
+        cursor = (
+            jobs_collection.find(query, _projection(fields))
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit)
+        )
+        return [doc async for doc in cursor]
+
+    async def iter_jobs(
+        self,
+        company_id: ObjectId,
+        *,
+        batch_size: int,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> AsyncIterator[Doc]:
+        query: Doc = {"company_id": company_id}
+        created: Doc = {}
+        if created_from is not None:
+            created["$gte"] = created_from
+        if created_before is not None:
+            created["$lt"] = created_before
+        if after is not None:
+            last_created_at, last_id = after
+            # The $gte bounds the index scan; the $or skips the last job sent
+            if created_from is None or last_created_at > created_from:
+                created["$gte"] = last_created_at
+            query["$or"] = [
+                {"created_at": {"$gt": last_created_at}},
+                {"created_at": last_created_at, "_id": {"$gt": last_id}},
+            ]
+        if created:
+            query["created_at"] = created
+
+        cursor = (
+            jobs_collection.find(query, _projection(fields))
+            .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+            .batch_size(batch_size)
+        )
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            # The consumer may stop early (client gone); free the server cursor now
+            await cursor.close()
+
+    # -------------------- integrations --------------------
+
+    async def upsert_integration(self, company_id: ObjectId, name: str, doc: Doc) -> None:
+        await integrations_collection.update_one(
+            {"company_id": company_id, "name": name},
+            {"$set": doc},
+            upsert=True,
+        )
+
+    async def find_integrations(
+        self,
+        company_id: ObjectId,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        cursor = integrations_collection.find({"company_id": company_id}, _projection(fields))
+        return [doc async for doc in cursor]
+
+    # -------------------- vocabularies --------------------
+
+    async def find_vocabulary(self, company_id: ObjectId) -> Optional[Doc]:
+        return await vocabularies_collection.find_one({"company_id": company_id})
+
+    async def find_vocabulary_version(self, company_id: ObjectId) -> Optional[int]:
+        doc = await vocabularies_collection.find_one(
+            {"company_id": company_id},
+            {"_id": 0, "version": 1},
+        )
+        return doc["version"] if doc else None
+
+    async def add_vocabulary_keywords(
+        self,
+        company_id: ObjectId,
+        intent: str,
+        keywords: List[str],
+        now: datetime,
+    ) -> Doc:
+        return await vocabularies_collection.find_one_and_update(
+            {"company_id": company_id},
+            {
+                "$addToSet": {f"keywords.{intent}": {"$each": keywords}},
+                "$inc": {"version": 1},
+                "$set": {"updated_at": now},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def remove_vocabulary_keywords(
+        self,
+        company_id: ObjectId,
+        intent: str,
+        keywords: List[str],
+        now: datetime,
+    ) -> Optional[Doc]:
+        return await vocabularies_collection.find_one_and_update(
+            {"company_id": company_id},
+            {
+                "$pull": {f"keywords.{intent}": {"$in": keywords}},
+                "$inc": {"version": 1},
+                "$set": {"updated_at": now},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+    # -------------------- daily rollups --------------------
+
+    async def increment_rollup(
+        self,
+        company_id: ObjectId,
+        day: str,
+        increments: Dict[str, float],
+        on_insert: Doc,
+        fields: Doc,
+    ) -> None:
+        # Concurrent first upserts of a day: the server retries the loser
+        # as an update, thanks to the unique (company_id, day) index
+        await rollups_collection.update_one(
+            {"company_id": company_id, "day": day},
+            {"$inc": increments, "$setOnInsert": on_insert, "$set": fields},
+            upsert=True,
+        )
+
+    async def find_rollup(self, company_id: ObjectId, day: str) -> Optional[Doc]:
+        return await rollups_collection.find_one({"company_id": company_id, "day": day})
+
+    async def find_unsent_rollups(self, days: List[str]) -> List[Doc]:
+        cursor = rollups_collection.find({"day": {"$in": days}, "digest_sent_at": None})
+        return [doc async for doc in cursor]
+
+    async def claim_rollup_digest(self, rollup_id: ObjectId, now: datetime) -> bool:
+        res = await rollups_collection.update_one(
+            {"_id": rollup_id, "digest_sent_at": None},
+            {"$set": {"digest_sent_at": now}},
+        )
+        return res.modified_count > 0
+
+    # -------------------- outbox --------------------
+
+    async def insert_outbox(self, records: List[Doc]) -> None:
+        await outbox_collection.insert_many(records)
+
+    async def insert_job_with_outbox(self, doc: Doc, records: List[Doc]) -> None:
+        if self._transactions:
+            try:
+                async with await client.start_session() as session:
+                    async with session.start_transaction():
+                        await jobs_collection.insert_one(doc, session=session)
+                        await outbox_collection.insert_many(records, session=session)
+                return
+            except mongo_errors.DuplicateKeyError as e:
+                raise _duplicate_key(e) from e
+            except mongo_errors.OperationFailure as e:
+                if e.code != _NO_TRANSACTIONS:
+                    raise
+                # Nothing was written: the first insert is what failed
+                self._transactions = False
+                print("[storage] server has no transactions (not a replica set); "
+                      "job and outbox writes are no longer atomic")
+        await self.insert_job(doc)
+        await self.insert_outbox(records)
+
+    async def outbox_exists_for_job(self, job_id: ObjectId) -> bool:
+        return await outbox_collection.find_one({"job_id": job_id}, {"_id": 1}) is not None
+
+    async def claim_outbox(
+        self,
+        *,
+        status: str,
+        now: datetime,
+        lease_until: datetime,
+        limit: int,
+        token: ObjectId,
+    ) -> List[Doc]:
+        # Three round trips whatever the batch size: pick the due ids, tag
+        # them with our token, read back what we got. The update re-checks
+        # that each record is still due, so a record another dispatcher
+        # tagged in between is left to it
+        due = outbox_collection.find(
+            {"status": status, "next_attempt_at": {"$lte": now}},
+            {"_id": 1},
+            sort=[("next_attempt_at", 1)],
+            limit=limit,
+        )
+        ids = [doc["_id"] async for doc in due]
+        if not ids:
+            return []
+        await outbox_collection.update_many(
+            {"_id": {"$in": ids}, "status": status, "next_attempt_at": {"$lte": now}},
+            {"$set": {"next_attempt_at": lease_until, "claim_token": token}},
+        )
+        cursor = outbox_collection.find({"claim_token": token}, sort=[("next_attempt_at", 1)])
+        return [doc async for doc in cursor]
+
+    async def extend_outbox_leases(self, tokens: List[ObjectId], lease_until: datetime) -> None:
+        await outbox_collection.update_many(
+            {"claim_token": {"$in": tokens}},
+            {"$set": {"next_attempt_at": lease_until}},
+        )
+
+    async def update_outbox(self, record_id: ObjectId, fields: Doc) -> None:
+        await outbox_collection.update_one({"_id": record_id}, {"$set": fields})
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import get_settings
+from app.infrastructure.http_client import get_http_client, get_in_flight_limit
+from app.infrastructure.metrics import outbound_webhook_seconds, outbound_webhook_total
+
+settings = get_settings()
+
+
+class _HostLimit:
+    """A destination host's delivery cap, and how many deliveries hold or wait on it."""
+
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(settings.WEBHOOK_MAX_PER_HOST)
+        self.users = 0
+
+
+# Caps on concurrent deliveries: one for the whole process (see
+# get_in_flight_limit), one per destination host so a single slow
+# integration can't hog the pool. Only hosts with a delivery in flight
+# or waiting have an entry, so companies pointing webhooks at ever-new
+# hosts can't grow this without bound.
+_host_limits: Dict[str, _HostLimit] = {}
+
+
+@dataclass
+class DeliveryResult:
+    url: str
+    status_code: Optional[int] = None
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code is not None and 200 <= self.status_code < 300
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+@asynccontextmanager
+async def _host_slot(host: str) -> AsyncIterator[None]:
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits[host] = _HostLimit()
+    limit.users += 1
+    try:
+        async with limit.semaphore:
+            yield
+    finally:
+        limit.users -= 1
+        if limit.users == 0:
+            # Nobody holds or waits on it: a fresh one later is the same
+            del _host_limits[host]
+
+
+async def deliver_webhook(url: str, payload: dict) -> DeliveryResult:
+    """
+    POST one payload to one URL. Never raises: errors end up in the result.
+    """
+    client = get_http_client()
+    host = _host(url)
+    # Host slot first: deliveries waiting on a slow host must not hold
+    # global slots every other host needs
+    async with _host_slot(host), get_in_flight_limit():
+        started = time.perf_counter()
+        try:
+            resp = await client.post(url, json=payload)
+            result = DeliveryResult(url=url, status_code=resp.status_code)
+        except Exception as e:
+            result = DeliveryResult(url=url, error=repr(e))
+        elapsed = time.perf_counter() - started
+        result.latency_ms = elapsed * 1000
+
+    status = f"{result.status_code // 100}xx" if result.status_code else "error"
+    outbound_webhook_seconds.observe(elapsed, status=status)
+    outbound_webhook_total.inc(status=status)
+
+    if result.error:
+        print(
+            "[webhook] error sending to",
+            url,
+            f"after {result.latency_ms:.0f}ms",
+            "error:",
+            result.error,
+        )
+    else:
+        print(
+            "[webhook] sent to",
+            url,
+            "status",
+            result.status_code,
+            f"in {result.latency_ms:.0f}ms",
+        )
+    return result
+
+
+async def deliver_webhooks(urls: Iterable[str], payload: dict) -> List[DeliveryResult]:
+    """
+    Fan one payload out to many URLs concurrently.
+    Results come back in the same order as `urls`.
+    """
+    return list(
+        await asyncio.gather(*(deliver_webhook(url, payload) for url in urls if url))
+    )
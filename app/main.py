@@ -1,11 +1,73 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.routes.health import router as health_router
+from app.api.routes.jobs import router as jobs_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.telegram_webhook import router as telegram_router
+from app.api.routes.telegram_webhook import update_queue
 from app.api.debug_token import router as debug_router
+from app.core.config import get_settings
+from app.domain.nlp.job_classifier import load_job_classifier
+from app.infrastructure.extraction_pool import extraction_pool
+from app.infrastructure.http_client import start_http_client, close_http_client
+from app.infrastructure.indexes import ensure_indexes
+from app.infrastructure.outbox_dispatcher import outbox_dispatcher
+from app.telegram.digests import digest_scheduler
+from app.telegram.notifications import owner_notifier
+from app.telegram.sender import outbound_sender
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+
+    if settings.API_KEY is not None and not settings.API_KEY.strip():
+        # An empty key would look configured; unset it to close /api
+        raise RuntimeError("API_KEY is set but empty")
+
+    if settings.STORAGE_BACKEND == "mongo" and settings.ENSURE_INDEXES_ON_STARTUP:
+        await ensure_indexes()
+
+    if settings.JOB_CLASSIFIER_PATH:
+        try:
+            load_job_classifier(
+                settings.JOB_CLASSIFIER_PATH,
+                threshold=settings.JOB_CLASSIFIER_THRESHOLD,
+                max_batch=settings.JOB_CLASSIFIER_BATCH_SIZE,
+                max_wait_seconds=settings.JOB_CLASSIFIER_BATCH_WAIT_MS / 1000,
+            )
+        except Exception as e:
+            # Keep serving with the length heuristic rather than not starting
+            print("[startup] job classifier not loaded:", repr(e))
+
+    await extraction_pool.start()
+    await start_http_client()
+    outbound_sender.start()
+    outbox_dispatcher.start()
+    if settings.DAILY_DIGEST_ENABLED:
+        digest_scheduler.start()
+
+    if settings.WEBHOOK_ASYNC_MODE:
+        update_queue.start()
+
+    yield
+
+    await update_queue.stop(timeout=settings.UPDATE_DRAIN_TIMEOUT)
+    await digest_scheduler.stop()
+    # After the update workers, so their last replies and alerts still go out
+    await owner_notifier.stop()
+    await outbound_sender.stop()
+    await outbox_dispatcher.stop()
+    await close_http_client()
+    await extraction_pool.stop()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(jobs_router)
 app.include_router(telegram_router)
 app.include_router(debug_router)
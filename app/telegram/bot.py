@@ -1,20 +1,57 @@
+import time
+
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.client.telegram import TelegramAPIServer
 
 from app.core.config import get_settings
+from app.infrastructure.metrics import telegram_api_seconds
+from app.telegram.commands import aiogram_router
+from app.telegram.handlers import registry
 
 settings = get_settings()
 
+# All our message texts use HTML markup
+PARSE_MODE = "HTML"
+
+
+def _session() -> AiohttpSession | None:
+    # None = aiogram's default session against api.telegram.org
+    if not settings.TELEGRAM_API_BASE_URL:
+        return None
+    return AiohttpSession(api=TelegramAPIServer.from_base(settings.TELEGRAM_API_BASE_URL))
+
+
 bot = Bot(
     token=settings.TELEGRAM_BOT_TOKEN,
-    default=DefaultBotProperties(parse_mode="HTML"),
+    session=_session(),
+    default=DefaultBotProperties(parse_mode=PARSE_MODE),
 )
 
-dp = Dispatcher()
 
-from app.telegram.handlers import owner, employee, common  # noqa: E402
+class BotApiMetrics(BaseRequestMiddleware):
+    """Times every Bot API call made through `bot` (send_message, answer, ...)."""
+
+    async def __call__(self, make_request, bot, method):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await make_request(bot, method)
+            outcome = "ok"
+            return response
+        finally:
+            telegram_api_seconds.observe(
+                time.perf_counter() - started,
+                method=type(method).__name__,
+                outcome=outcome,
+            )
+
+
+bot.session.middleware(BotApiMetrics())
+
+dp = Dispatcher()
 
-# Order: specific logic first, generic fallback last
-dp.include_router(owner.router)
-dp.include_router(employee.router)
-dp.include_router(common.router)
+# Same command table the FastAPI webhook route dispatches through
+dp.include_router(aiogram_router(registry))
@@ -0,0 +1,226 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from aiogram import Router
+from aiogram.types import Message
+
+from app.telegram.sender import outbound_sender
+
+ReplyFunc = Callable[[str], Awaitable[None]]
+CommandHandler = Callable[["CommandContext"], Awaitable[None]]
+
+# Name the fallback handler is registered and reported under
+FREE_TEXT = "free_text"
+
+
+@dataclass(frozen=True)
+class Arg:
+    """
+    One positional command argument.
+
+    Arguments are split on whitespace; the last one takes the rest of
+    the line, so names and URLs with spaces still work.
+    """
+
+    name: str
+    required: bool = True
+    transform: Optional[Callable[[str], Any]] = None
+
+
+def office_code_arg(name: str = "office_code") -> Arg:
+    return Arg(name, transform=lambda v: v.strip().upper())
+
+
+def rest_arg(name: str, required: bool = True) -> Arg:
+    return Arg(name, required=required, transform=str.strip)
+
+
+@dataclass(frozen=True)
+class Command:
+    name: str
+    handler: CommandHandler
+    args: Tuple[Arg, ...] = ()
+    # Reply sent instead of calling the handler when a required arg is missing
+    usage: Optional[str] = None
+    # Repository functions the handler calls (documentation + metrics labels)
+    uses: Tuple[str, ...] = ()
+
+    def parse_args(self, rest: str) -> Optional[Dict[str, Any]]:
+        """Map the text after the command onto `args`; None if a required one is missing."""
+        values = rest.split(maxsplit=len(self.args) - 1) if self.args and rest else []
+        parsed: Dict[str, Any] = {}
+        for i, arg in enumerate(self.args):
+            if i >= len(values):
+                if arg.required:
+                    return None
+                continue
+            parsed[arg.name] = arg.transform(values[i]) if arg.transform else values[i]
+        return parsed
+
+
+@dataclass
+class CommandContext:
+    """
+    Everything a handler gets, independent of how the update arrived
+    (FastAPI webhook route or aiogram Dispatcher).
+
+    `user` is the sender: anything with id / username / first_name /
+    last_name / full_name, e.g. aiogram's User.
+    """
+
+    chat_id: int
+    user: Any
+    text: str
+    reply: ReplyFunc
+    message_id: Optional[int] = None
+    # True for edited_message updates
+    is_edit: bool = False
+    # aiogram Bot, for messages to other chats (e.g. owner alerts); None in scripts
+    bot: Any = None
+    command: str = FREE_TEXT
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+def parse_command(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Split "/cmd@botname rest of line" into ("cmd", "rest of line").
+    Any whitespace ends the command ("/owner_setup\nAcme" works too).
+    Returns None for text that isn't a command.
+    """
+    if not text.startswith("/"):
+        return None
+    parts = text.split(maxsplit=1)
+    name = parts[0][1:].split("@", 1)[0].lower()
+    if not name:
+        return None
+    return name, parts[1].strip() if len(parts) > 1 else ""
+
+
+class CommandRegistry:
+    """
+    Command name → handler table.
+
+    Text is tokenized once and looked up in a dict, so dispatch cost
+    doesn't grow with the number of commands. Unknown commands and plain
+    text go to the fallback handler.
+    """
+
+    def __init__(self):
+        self._commands: Dict[str, Command] = {}
+        self._fallback: Optional[Command] = None
+
+    @property
+    def commands(self) -> Dict[str, Command]:
+        return dict(self._commands)
+
+    def command(
+        self,
+        name: str,
+        *,
+        args: Sequence[Arg] = (),
+        usage: Optional[str] = None,
+        uses: Sequence[Callable[..., Any]] = (),
+    ) -> Callable[[CommandHandler], CommandHandler]:
+        def decorator(handler: CommandHandler) -> CommandHandler:
+            key = name.lower()
+            if key in self._commands:
+                raise ValueError(f"command /{key} is already registered")
+            self._commands[key] = Command(
+                name=key,
+                handler=handler,
+                args=tuple(args),
+                usage=usage,
+                uses=tuple(fn.__name__ for fn in uses),
+            )
+            return handler
+
+        return decorator
+
+    def fallback(
+        self,
+        *,
+        uses: Sequence[Callable[..., Any]] = (),
+    ) -> Callable[[CommandHandler], CommandHandler]:
+        def decorator(handler: CommandHandler) -> CommandHandler:
+            self._fallback = Command(
+                name=FREE_TEXT,
+                handler=handler,
+                uses=tuple(fn.__name__ for fn in uses),
+            )
+            return handler
+
+        return decorator
+
+    def resolve(self, text: str) -> Tuple[Optional[Command], Dict[str, Any], bool]:
+        """
+        Find the handler for `text`.
+        Returns (command, args, args_ok); command is None if nothing matches.
+        """
+        parsed = parse_command(text)
+        if parsed:
+            name, rest = parsed
+            command = self._commands.get(name)
+            if command is not None:
+                args = command.parse_args(rest)
+                return command, args or {}, args is not None
+        return self._fallback, {}, True
+
+    async def dispatch(self, ctx: CommandContext) -> Optional[str]:
+        """
+        Run the handler for `ctx.text`. Returns the name of the command that
+        handled it (FREE_TEXT for the fallback), or None if nothing did.
+        """
+        command, args, args_ok = self.resolve(ctx.text)
+        if command is None:
+            return None
+        if ctx.is_edit and command is not self._fallback:
+            # Re-running a command because its message was edited would
+            # e.g. create a second company; only free text reacts to edits
+            return None
+
+        ctx.command = command.name
+        ctx.args = args
+        if not args_ok:
+            if command.usage:
+                await ctx.reply(command.usage)
+            return command.name
+
+        await command.handler(ctx)
+        return command.name
+
+
+registry = CommandRegistry()
+
+
+def aiogram_router(commands: CommandRegistry) -> Router:
+    """Serve a registry from an aiogram Dispatcher (polling or aiogram webhooks)."""
+    router = Router()
+
+    async def dispatch_message(message: Message, is_edit: bool = False) -> None:
+        if message.from_user is None or message.from_user.is_bot:
+            return
+
+        async def reply(text: str) -> None:
+            await outbound_sender.send(message.bot, message.chat.id, text)
+
+        await commands.dispatch(
+            CommandContext(
+                chat_id=message.chat.id,
+                user=message.from_user,
+                text=(message.text or "").strip(),
+                reply=reply,
+                message_id=message.message_id,
+                is_edit=is_edit,
+                bot=message.bot,
+            )
+        )
+
+    @router.message()
+    async def on_message(message: Message) -> None:
+        await dispatch_message(message)
+
+    @router.edited_message()
+    async def on_edited_message(message: Message) -> None:
+        await dispatch_message(message, is_edit=True)
+
+    return router
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
+
+from app.domain.nlp.job_classifier import MIN_JOB_LENGTH, get_job_classifier, job_probability
 
 
 @dataclass
@@ -12,29 +14,58 @@ class JobClassificationResult:
     client_name: Optional[str] = None
     location: Optional[str] = None
     company_id: Optional[str] = None
+    # P(job) from the classifier; None when the length heuristic decided
+    confidence: Optional[float] = None
 
 
-def classify_message_and_build_job(text: str) -> JobClassificationResult:
+def classify_message_and_build_job(
+    text: str,
+    job_probability: Optional[float] = None,
+    threshold: float = 0.5,
+) -> JobClassificationResult:
     """
-    SUPER simple placeholder:
+    Decide whether `text` is a job and build it.
 
-    - If message is too short, treat it as non-job.
-    - Otherwise treat the whole text as job description.
+    - With a classifier score, it's a job if the score reaches `threshold`.
+    - Without one, messages shorter than MIN_JOB_LENGTH are treated as non-job.
+    - A job's description is the whole text.
     """
     if not text:
         return JobClassificationResult(is_job=False)
 
     cleaned = text.strip()
 
-    if len(cleaned) < 15:
-        return JobClassificationResult(is_job=False)
+    if job_probability is None:
+        is_job = len(cleaned) >= MIN_JOB_LENGTH
+    else:
+        is_job = bool(cleaned) and job_probability >= threshold
+
+    # Only non-default fields are passed: this runs on every message
+    if not is_job:
+        if job_probability is None:
+            return JobClassificationResult(is_job=False)
+        return JobClassificationResult(is_job=False, confidence=job_probability)
 
     return JobClassificationResult(
         is_job=True,
         title="New job",
         description=cleaned,
-        scheduled_for=None,
-        client_name=None,
-        location=None,
-        company_id=None,
+        confidence=job_probability,
     )
+
+
+async def classify_job(text: str, tokens: Sequence[str]) -> JobClassificationResult:
+    """
+    classify_message_and_build_job() scored by the loaded classifier
+    (micro-batched with concurrent messages), or by message length if
+    none is loaded or scoring fails.
+    """
+    classifier = get_job_classifier()
+    if classifier is None:
+        return classify_message_and_build_job(text)
+    try:
+        probability = await job_probability(tokens)
+    except Exception as e:
+        print("[decision_engine] classifier failed, using length heuristic:", repr(e))
+        return classify_message_and_build_job(text)
+    return classify_message_and_build_job(text, probability, classifier.threshold)
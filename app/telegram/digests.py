@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import get_settings
+from app.domain.digest import candidate_days, digest_due, render_digest
+from app.domain.models import DailyRollup
+from app.domain.repositories import claim_daily_digest, get_company_by_id, get_unsent_rollups
+from app.telegram.bot import bot
+from app.telegram.sender import NOTIFICATION, outbound_sender
+
+settings = get_settings()
+
+
+class DigestScheduler:
+    """
+    Background task that sends each owner the digest of their company's day.
+
+    Every `poll_seconds` it reads the unsent rollups of every company for
+    the dates it can currently be anywhere, in one indexed query, and keeps
+    the ones whose `hour` has come in their company's timezone. Each is
+    claimed first, so with several app instances only one sends it; then
+    the company is read and the digest queued with the outbound sender,
+    `concurrency` at a time.
+
+    Days without jobs have no rollup, so no digest. Neither do days whose
+    first job came after the hour: a digest only goes out at the hour, not
+    whenever a late rollup turns up. Jobs after the digest went out still
+    count in the rollup and show up in /digest.
+    """
+
+    def __init__(self, *, hour: int = 18, poll_seconds: float = 60.0, concurrency: int = 16):
+        self.hour = hour
+        self.poll_seconds = poll_seconds
+        self.concurrency = max(1, concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="digest-scheduler")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            # Claimed but unsent digests are skipped, not sent twice
+            self._task.cancel()
+        self._task = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Send every digest that is due. Returns how many were sent."""
+        now = now or datetime.utcnow()
+        due = [r for r in await get_unsent_rollups(candidate_days(now)) if digest_due(r, self.hour, now)]
+        if not due:
+            return 0
+
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def send(rollup: DailyRollup) -> bool:
+            async with slots:
+                return await self._send(rollup)
+
+        sent = await asyncio.gather(*(send(r) for r in due), return_exceptions=True)
+        for result in sent:
+            if isinstance(result, Exception):
+                print("[digest] error:", repr(result))
+        count = sum(1 for result in sent if result is True)
+        print("[digest] sent", count, "of", len(due), "due digests")
+        return count
+
+    async def _send(self, rollup: DailyRollup) -> bool:
+        if not await claim_daily_digest(rollup.id):
+            return False
+        company = await get_company_by_id(rollup.company_id)
+        if company is None:
+            return False
+        await outbound_sender.send(
+            bot,
+            company.owner_telegram_id,
+            render_digest(company.title, rollup, rollup.day),
+            NOTIFICATION,
+        )
+        return True
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                print("[digest] scheduler error:", repr(e))
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+digest_scheduler = DigestScheduler(
+    hour=settings.DAILY_DIGEST_HOUR,
+    poll_seconds=settings.DAILY_DIGEST_POLL_SECONDS,
+    concurrency=settings.DAILY_DIGEST_CONCURRENCY,
+)
@@ -0,0 +1,143 @@
+import json
+from typing import Any, Optional
+
+from aiogram.types import Update
+
+# Update types the bot acts on; everything else is acknowledged and dropped
+MESSAGE = "message"
+EDITED_MESSAGE = "edited_message"
+
+
+class LeanUser:
+    """The few sender fields handlers use, shaped like aiogram's User."""
+
+    __slots__ = ("id", "is_bot", "first_name", "last_name", "username")
+
+    def __init__(
+        self,
+        id: int,
+        is_bot: bool,
+        first_name: str,
+        last_name: Optional[str] = None,
+        username: Optional[str] = None,
+    ):
+        self.id = id
+        self.is_bot = is_bot
+        self.first_name = first_name
+        self.last_name = last_name
+        self.username = username
+
+    @property
+    def full_name(self) -> str:
+        if self.last_name:
+            return f"{self.first_name} {self.last_name}"
+        return self.first_name
+
+
+class LeanUpdate:
+    """
+    What the bot needs from a Telegram update.
+
+    `kind` is MESSAGE or EDITED_MESSAGE, or None for update types we
+    don't handle (then only `update_id` is set).
+    """
+
+    __slots__ = ("update_id", "kind", "message_id", "chat_id", "user", "text")
+
+    def __init__(
+        self,
+        update_id: int,
+        kind: Optional[str] = None,
+        message_id: Optional[int] = None,
+        chat_id: Optional[int] = None,
+        user: Optional[LeanUser] = None,
+        text: str = "",
+    ):
+        self.update_id = update_id
+        self.kind = kind
+        self.message_id = message_id
+        self.chat_id = chat_id
+        self.user = user
+        self.text = text
+
+    @property
+    def is_edit(self) -> bool:
+        return self.kind == EDITED_MESSAGE
+
+
+def _lean_from_aiogram(update: Update) -> LeanUpdate:
+    msg = update.message or update.edited_message
+    if msg is None:
+        return LeanUpdate(update.update_id)
+    user = None
+    if msg.from_user is not None:
+        u = msg.from_user
+        user = LeanUser(u.id, u.is_bot, u.first_name, u.last_name, u.username)
+    return LeanUpdate(
+        update.update_id,
+        kind=MESSAGE if update.message is not None else EDITED_MESSAGE,
+        message_id=msg.message_id,
+        chat_id=msg.chat.id,
+        user=user,
+        text=msg.text or "",
+    )
+
+
+def _int(value: Any) -> int:
+    # bool is an int subclass, but never a valid id
+    if type(value) is not int:
+        raise TypeError
+    return value
+
+
+def decode_update(body: bytes) -> LeanUpdate:
+    """
+    Decode a raw webhook body, reading only the fields the bot uses.
+
+    Message updates that don't have the expected shape go through full
+    aiogram validation instead, which either understands them or raises.
+    Raises ValueError for anything that isn't a Telegram update.
+    """
+    try:
+        data = json.loads(body)
+        update_id = _int(data["update_id"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"not a Telegram update: {e!r}") from e
+
+    if MESSAGE in data:
+        kind = MESSAGE
+    elif EDITED_MESSAGE in data:
+        kind = EDITED_MESSAGE
+    else:
+        return LeanUpdate(update_id)
+
+    try:
+        msg = data[kind]
+        sender = msg.get("from")
+        user = None
+        if sender is not None:
+            user = LeanUser(
+                _int(sender["id"]),
+                bool(sender["is_bot"]),
+                sender["first_name"],
+                sender.get("last_name"),
+                sender.get("username"),
+            )
+        text = msg.get("text") or ""
+        if not isinstance(text, str):
+            raise TypeError
+        return LeanUpdate(
+            update_id,
+            kind=kind,
+            message_id=_int(msg["message_id"]),
+            chat_id=_int(msg["chat"]["id"]),
+            user=user,
+            text=text,
+        )
+    except (AttributeError, KeyError, TypeError):
+        pass
+
+    try:
+        return _lean_from_aiogram(Update.model_validate(data))
+    except Exception as e:
+        raise ValueError(f"invalid Telegram update: {e!r}") from e
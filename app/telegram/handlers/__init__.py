@@ -0,0 +1,3 @@
+# Importing the handler modules registers their commands on the shared registry
+from app.telegram.commands import registry  # noqa: F401
+from app.telegram.handlers import common, employee, owner  # noqa: F401
@@ -1,40 +1,43 @@
-from aiogram import Router
-from aiogram.filters import Command
-from aiogram.types import Message
-
 from app.domain.repositories import (
     get_company_by_code,
+    get_company_brief,
     get_or_create_employee_by_telegram,
     get_employee_by_telegram,
+    delete_employee_by_telegram,
     create_job,
+    update_job_from_edit,
 )
-from app.telegram.decision_engine import classify_message_and_build_job
-
-router = Router()
-
-
-@router.message(Command("join_company"))
-async def join_company(message: Message) -> None:
+from app.domain.nlp.vocabulary import analyze_for_company
+from app.infrastructure.extraction_pool import extraction_pool
+from app.telegram.commands import (
+    CommandContext,
+    office_code_arg,
+    registry,
+    rest_arg,
+)
+from app.telegram.decision_engine import classify_job
+from app.telegram.notifications import owner_notifier
+
+
+@registry.command(
+    "join_company",
+    args=[office_code_arg(), rest_arg("name")],
+    usage=(
+        "To join a company, use:\n"
+        "<code>/join_company OFFICE_CODE Your Name</code>"
+    ),
+    uses=[get_company_by_code, get_or_create_employee_by_telegram],
+)
+async def join_company(ctx: CommandContext) -> None:
     """
     Employees join a company using the office code shared by the owner.
 
     Usage:
         /join_company OFFICE_CODE Your Name
     """
-    parts = (message.text or "").split(maxsplit=2)
-    if len(parts) < 3:
-        await message.answer(
-            "To join a company, use:\n"
-            "<code>/join_company OFFICE_CODE Your Name</code>"
-        )
-        return
-
-    office_code = parts[1].strip().upper()
-    employee_name = parts[2].strip()
-
-    company = await get_company_by_code(office_code)
+    company = await get_company_by_code(ctx.args["office_code"])
     if not company:
-        await message.answer(
+        await ctx.reply(
             "❌ I couldn't find a company with that office code.\n"
             "Double-check the code with your owner."
         )
@@ -42,66 +45,141 @@ async def join_company(message: Message) -> None:
 
     employee = await get_or_create_employee_by_telegram(
         company_id=company.id,
-        telegram_id=message.from_user.id,
-        name=employee_name,
+        telegram_id=ctx.user.id,
+        name=ctx.args["name"],
     )
 
-    await message.answer(
+    await ctx.reply(
         "✅ You’re now linked to this company.\n\n"
         f"🏢 <b>{company.title}</b>\n"
         f"👷 Employee: {employee.name}\n\n"
         "Now just send me job requests as text (who / what / where / when), "
-        "and I’ll capture them as jobs."
+        "and I’ll capture them as jobs.\n\n"
+        "If you ever need to leave, use:\n"
+        "<code>/leave_company</code>"
     )
 
 
-@router.message()
-async def capture_job(message: Message) -> None:
-    """
-    Default handler for non-command messages from employees:
-    tries to classify and store them as jobs.
-    """
-    text = message.text or ""
-
-    if text.startswith("/"):
+@registry.command("leave_company", uses=[delete_employee_by_telegram])
+async def leave_company(ctx: CommandContext) -> None:
+    deleted = await delete_employee_by_telegram(ctx.user.id)
+    if deleted == 0:
+        await ctx.reply(
+            "You are not currently linked to any company.\n\n"
+            "To join one, use:\n"
+            "<code>/join_company OFFICE_CODE Your Name</code>"
+        )
         return
 
-    employee = await get_employee_by_telegram(telegram_id=message.from_user.id)
+    await ctx.reply(
+        "✅ You have left your company.\n\n"
+        "If you want to join another company later, use:\n"
+        "<code>/join_company OFFICE_CODE Your Name</code>"
+    )
+
+
+@registry.fallback(
+    uses=[get_employee_by_telegram, get_company_brief, update_job_from_edit, create_job]
+)
+async def capture_job(ctx: CommandContext) -> None:
+    """
+    Any other text from an employee: try to classify and store it as a job.
+    Webhook deliveries go out through the outbox; the owner is alerted
+    (coalesced, see OwnerNotifier) unless they sent it themselves.
+
+    An edit of a message that already became a job updates that job.
+    """
+    employee = await get_employee_by_telegram(telegram_id=ctx.user.id)
     if not employee:
-        await message.answer(
+        await ctx.reply(
             "I don't know which company you're in yet.\n\n"
             "Ask your owner for the office code, then run:\n"
             "<code>/join_company OFFICE_CODE Your Name</code>"
         )
         return
 
-    classification = classify_message_and_build_job(text)
+    # One analysis feeds both the classifier (tokens) and the intent, which
+    # uses the company's own vocabulary; intent is stored on the job and sent
+    # to webhooks so automations can route e.g. scheduling vs new work
+    analysis = await analyze_for_company(ctx.text, employee.company_id)
+    classification = await classify_job(ctx.text, analysis.tokens)
     if not classification.is_job:
-        await message.answer(
+        await ctx.reply(
             "I couldn't understand this as a job yet.\n"
             "Try sending something like:\n"
             "<i>\"Pouring concrete for John at 123 Main on Friday morning\"</i>"
         )
         return
 
+    intent = analysis.intent.value
+
+    # Client, job type, location, budget and "Friday morning" (resolved in
+    # the company's timezone) come from the configured extractor: in the
+    # worker processes when the pool is enabled, so a heavy extractor
+    # doesn't stall every other chat. The brief is cached.
+    company = await get_company_brief(employee.company_id)
+    parsed = await extraction_pool.extract(ctx.text, company.timezone if company else None)
+    title = parsed.job_type or classification.title
+    scheduled_for = parsed.scheduled_for or classification.scheduled_for
+
+    if ctx.is_edit and ctx.message_id is not None:
+        job = await update_job_from_edit(
+            telegram_chat_id=ctx.chat_id,
+            telegram_message_id=ctx.message_id,
+            title=title,
+            scheduled_for=scheduled_for,
+            client_name=parsed.client_name,
+            location=parsed.location,
+            budget=parsed.budget,
+            raw_text=ctx.text,
+            intent=intent,
+        )
+        if job:
+            when_str = job.scheduled_for.isoformat() if job.scheduled_for else "unscheduled"
+            await ctx.reply(
+                "✏️ Job updated!\n\n"
+                f"📋 <b>{job.job_type}</b>\n"
+                f"👤 Client: {job.client_name or 'N/A'}\n"
+                f"📍 Location: {job.location or 'N/A'}\n"
+                f"🗓 When: {when_str}"
+            )
+            return
+
     job = await create_job(
         company_id=employee.company_id,
         employee_id=employee.id,
-        title=classification.title,
+        title=title,
         description=classification.description,
-        scheduled_for=classification.scheduled_for,
-        client_name=classification.client_name,
-        location=classification.location,
-        raw_text=text,
+        scheduled_for=scheduled_for,
+        client_name=parsed.client_name,
+        location=parsed.location,
+        budget=parsed.budget,
+        raw_text=ctx.text,
+        intent=intent,
+        telegram_user={
+            "user_id": ctx.user.id,
+            "username": ctx.user.username,
+            "first_name": ctx.user.first_name,
+            "last_name": ctx.user.last_name,
+        },
+        telegram_chat_id=ctx.chat_id,
+        telegram_message_id=ctx.message_id,
+        employee_name=employee.name,
     )
 
     when_str = job.scheduled_for.isoformat() if job.scheduled_for else "unscheduled"
 
-    await message.answer(
+    await ctx.reply(
         "✅ Job captured!\n\n"
         f"📋 <b>{job.job_type}</b>\n"
         f"👤 Client: {job.client_name or 'N/A'}\n"
         f"📍 Location: {job.location or 'N/A'}\n"
         f"🗓 When: {when_str}\n\n"
-        "Soon I'll sync this to your job tracking sheet and notify the owner."
+        "If you connected a webhook, this job was also sent to your automation."
     )
+
+    if ctx.bot is not None and company and company.owner_telegram_id != ctx.user.id:
+        try:
+            await owner_notifier.job_created(ctx.bot, company.owner_telegram_id, job, ctx.user.id)
+        except Exception as e:
+            print("[owner notify] error:", repr(e))
@@ -1,71 +1,471 @@
-from aiogram import Router
-from aiogram.filters import Command
-from aiogram.types import Message
+from datetime import date, timedelta, timezone as dt_timezone
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from app.domain.repositories import (
-    create_company,
+    setup_first_company,
+    create_company_with_owner,
     get_company_by_owner,
-    create_employee,
+    get_companies_by_owner,
+    get_company_by_code,
+    delete_company_and_related,
+    set_company_webhook,
+    set_company_timezone,
+    get_daily_rollup,
+    get_company_employee,
+    list_company_jobs,
+    InvalidCursor,
+    get_company_vocabulary,
 )
-from app.domain.models import UserRole
+from app.core.config import get_settings
+from app.domain.digest import local_day, local_day_start, render_digest
+from app.domain.models import JobSummary
+from app.domain.nlp.analysis import INTENT_KEYWORDS, Intent
+from app.domain.nlp.schedule import get_zone
+from app.domain.nlp.vocabulary import add_keywords, remove_keywords
+from app.telegram.commands import (
+    Arg,
+    CommandContext,
+    office_code_arg,
+    registry,
+    rest_arg,
+)
+
 
-router = Router()
+def _owner_name(user) -> str:
+    return user.full_name or user.username or "Owner"
 
 
-@router.message(Command("owner_setup"))
-async def owner_setup(message: Message) -> None:
+@registry.command(
+    "owner_setup",
+    args=[rest_arg("title", required=False)],
+    uses=[get_company_by_owner, setup_first_company],
+)
+async def owner_setup(ctx: CommandContext) -> None:
     """
-    Owner creates a company and gets an office code to share.
+    Owner creates their first company and gets an office code to share.
 
     Usage:
         /owner_setup My Company Name
     """
-    from_user = message.from_user
-    owner_tg_id = from_user.id
-
-    # Already has a company?
-    existing_company = await get_company_by_owner(owner_tg_id)
-    if existing_company:
-        await message.answer(
-            "✅ You already have a company set up.\n\n"
-            f"🏢 <b>{existing_company.title}</b>\n"
-            f"🔑 Office code: <code>{existing_company.office_code}</code>\n\n"
-            "Share this with employees. They can join using:\n"
-            f"<code>/join_company {existing_company.office_code} Their Name</code>"
+    owner_tg_id = ctx.user.id
+    title = ctx.args.get("title")
+
+    if not title:
+        company = await get_company_by_owner(owner_tg_id)
+        owner_employee = None
+    else:
+        # Returns the existing company, or creates company + owner row
+        company, owner_employee = await setup_first_company(
+            owner_telegram_id=owner_tg_id,
+            title=title,
+            owner_name=_owner_name(ctx.user),
+        )
+
+    if company and owner_employee is None:
+        await ctx.reply(
+            "✅ You already have at least one company set up.\n\n"
+            f"Example:\n"
+            f"🏢 <b>{company.title}</b>\n"
+            f"🔑 Office code: <code>{company.office_code}</code>\n\n"
+            "You can see all your companies with:\n"
+            "<code>/my_companies</code>\n\n"
+            "You can create a new one with:\n"
+            "<code>/new_company Another Company Name</code>"
         )
         return
 
-    parts = (message.text or "").split(maxsplit=1)
-    if len(parts) < 2:
-        await message.answer(
-            "To set up your company, use:\n"
+    if not company:
+        await ctx.reply(
+            "To set up your first company, use:\n"
             "<code>/owner_setup My Company Name</code>"
         )
         return
 
-    company_title = parts[1].strip()
-
-    company = await create_company(
-        owner_telegram_id=owner_tg_id,
-        title=company_title,
+    await ctx.reply(
+        "✅ Company created!\n\n"
+        f"🏢 <b>{company.title}</b>\n"
+        f"👑 Owner: {owner_employee.name}\n"
+        f"🔑 Office code (share with your team): "
+        f"<code>{company.office_code}</code>\n\n"
+        "Employees join with:\n"
+        f"<code>/join_company {company.office_code} Their Name</code>\n\n"
+        "You can create more companies later with:\n"
+        "<code>/new_company Another Company Name</code>"
     )
 
-    owner_name = from_user.full_name or from_user.username or "Owner"
 
-    owner_employee = await create_employee(
-        company_id=company.id,
-        name=owner_name,
-        telegram_id=owner_tg_id,
-        role=UserRole.OWNER,
+@registry.command(
+    "new_company",
+    args=[rest_arg("title")],
+    usage=(
+        "To create a new company, use:\n"
+        "<code>/new_company Another Company Name</code>"
+    ),
+    uses=[create_company_with_owner],
+)
+async def new_company(ctx: CommandContext) -> None:
+    company, owner_employee = await create_company_with_owner(
+        owner_telegram_id=ctx.user.id,
+        title=ctx.args["title"],
+        owner_name=_owner_name(ctx.user),
     )
 
-    await message.answer(
-        "✅ Company created!\n\n"
+    await ctx.reply(
+        "✅ New company created!\n\n"
         f"🏢 <b>{company.title}</b>\n"
         f"👑 Owner: {owner_employee.name}\n"
         f"🔑 Office code (share with your team): "
         f"<code>{company.office_code}</code>\n\n"
         "Employees join with:\n"
         f"<code>/join_company {company.office_code} Their Name</code>\n\n"
-        "After they join, they can send me job requests as plain text."
+        "See all your companies with:\n"
+        "<code>/my_companies</code>"
+    )
+
+
+@registry.command("my_companies", uses=[get_companies_by_owner])
+async def my_companies(ctx: CommandContext) -> None:
+    companies = await get_companies_by_owner(ctx.user.id)
+
+    if not companies:
+        await ctx.reply(
+            "You don't own any companies yet.\n\n"
+            "Create one with:\n"
+            "<code>/owner_setup My Company Name</code>"
+        )
+        return
+
+    lines = ["📋 <b>Your companies:</b>"]
+    for c in companies:
+        lines.append(
+            f"• {c.title} — code: <code>{c.office_code}</code>"
+        )
+
+    lines.append(
+        "\nDelete one with:\n"
+        "<code>/delete_company OFFICE_CODE</code>\n"
+        "Connect automations with:\n"
+        "<code>/connect_webhook OFFICE_CODE https://your-automation-url</code>"
+    )
+
+    await ctx.reply("\n".join(lines))
+
+
+@registry.command(
+    "delete_company",
+    args=[office_code_arg()],
+    usage=(
+        "To delete a company, use:\n"
+        "<code>/delete_company OFFICE_CODE</code>"
+    ),
+    uses=[get_company_by_code, delete_company_and_related],
+)
+async def delete_company(ctx: CommandContext) -> None:
+    company = await get_company_by_code(ctx.args["office_code"])
+    if not company:
+        await ctx.reply("❌ I couldn't find a company with that office code.")
+        return
+
+    if company.owner_telegram_id != ctx.user.id:
+        await ctx.reply(
+            "❌ You are not the owner of this company, "
+            "so you can't delete it."
+        )
+        return
+
+    deleted_count = await delete_company_and_related(company.id)
+    if deleted_count == 0:
+        await ctx.reply("Something went wrong while deleting that company.")
+        return
+
+    await ctx.reply(
+        "🗑️ Company deleted.\n\n"
+        f"🏢 <b>{company.title}</b>\n"
+        f"🔑 Code: <code>{company.office_code}</code>\n\n"
+        "All employees, jobs, and integrations linked to this company were removed."
+    )
+
+
+@registry.command(
+    "connect_webhook",
+    args=[office_code_arg(), rest_arg("url")],
+    usage=(
+        "Connect an automation webhook to a company:\n\n"
+        "<code>/connect_webhook OFFICE_CODE https://your-automation-url</code>\n\n"
+        "Example (n8n, Zapier, Make, etc.). "
+        "On each new job, Artlix will POST JSON to that URL."
+    ),
+    uses=[get_company_by_code, set_company_webhook],
+)
+async def connect_webhook(ctx: CommandContext) -> None:
+    webhook_url = ctx.args["url"]
+
+    company = await get_company_by_code(ctx.args["office_code"])
+    if not company:
+        await ctx.reply("❌ I couldn't find a company with that office code.")
+        return
+
+    if company.owner_telegram_id != ctx.user.id:
+        await ctx.reply("❌ Only the owner of this company can connect webhooks.")
+        return
+
+    await set_company_webhook(
+        company_id=company.id,
+        url=webhook_url,
+        name="default_webhook",
+    )
+
+    await ctx.reply(
+        "✅ Webhook connected!\n\n"
+        f"🏢 <b>{company.title}</b>\n"
+        f"🔗 URL: <code>{webhook_url}</code>\n\n"
+        "From now on, each new job for this company will be sent "
+        "as JSON to that URL."
+    )
+
+
+@registry.command(
+    "timezone",
+    args=[office_code_arg(), rest_arg("timezone", required=False)],
+    usage=(
+        "Set the timezone Artlix reads dates and times in:\n\n"
+        "<code>/timezone OFFICE_CODE America/Toronto</code>"
+    ),
+    uses=[get_company_by_code, set_company_timezone],
+)
+async def company_timezone(ctx: CommandContext) -> None:
+    company = await get_company_by_code(ctx.args["office_code"])
+    if not company:
+        await ctx.reply("❌ I couldn't find a company with that office code.")
+        return
+
+    if company.owner_telegram_id != ctx.user.id:
+        await ctx.reply("❌ Only the owner of this company can change its timezone.")
+        return
+
+    timezone = ctx.args.get("timezone")
+    if timezone is None:
+        await ctx.reply(
+            f"🕒 <b>{company.title}</b> uses "
+            f"<code>{company.timezone or get_settings().DEFAULT_TIMEZONE}</code>.\n\n"
+            "To change it, use e.g.:\n"
+            "<code>/timezone OFFICE_CODE America/Toronto</code>"
+        )
+        return
+
+    try:
+        ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        await ctx.reply(
+            f"❌ <code>{timezone}</code> isn't a timezone I know.\n"
+            "Use a name like <code>Europe/London</code> or <code>America/Chicago</code>."
+        )
+        return
+
+    await set_company_timezone(company.id, timezone)
+    await ctx.reply(
+        "✅ Timezone updated.\n\n"
+        f"🏢 <b>{company.title}</b>\n"
+        f"🕒 <code>{timezone}</code>\n\n"
+        "Times like \"Friday morning\" or \"the 14th at 3pm\" are now read in this timezone."
+    )
+
+
+@registry.command(
+    "digest",
+    args=[office_code_arg()],
+    usage=(
+        "See today's jobs so far (the full digest comes every evening):\n\n"
+        "<code>/digest OFFICE_CODE</code>"
+    ),
+    uses=[get_company_by_code, get_daily_rollup],
+)
+async def company_digest(ctx: CommandContext) -> None:
+    company = await get_company_by_code(ctx.args["office_code"])
+    if not company:
+        await ctx.reply("❌ I couldn't find a company with that office code.")
+        return
+
+    if company.owner_telegram_id != ctx.user.id:
+        await ctx.reply("❌ Only the owner of this company can see its digest.")
+        return
+
+    # One read of the day's rollup, however many jobs came in
+    day = local_day(company.timezone)
+    rollup = await get_daily_rollup(company.id, day)
+    await ctx.reply(render_digest(company.title, rollup, day))
+
+
+# Jobs per /jobs reply; the REST listing pages up to JOB_LIST_MAX_PAGE_SIZE
+JOBS_PAGE_SIZE = 10
+
+_JOB_FILTERS = ("status", "employee", "from", "to", "next")
+
+_JOBS_USAGE = (
+    "List a company's jobs, newest first:\n\n"
+    "<code>/jobs OFFICE_CODE</code>\n"
+    "<code>/jobs OFFICE_CODE status:new employee:123456789</code>\n"
+    "<code>/jobs OFFICE_CODE from:2026-10-01 to:2026-10-07</code>\n\n"
+    "Dates are days in the company's timezone; <code>employee</code> is "
+    "the Telegram ID shown in job alerts."
+)
+
+
+def _parse_job_filters(text: str) -> Optional[Dict[str, str]]:
+    """"status:new from:2026-10-01" -> {"status": "new", "from": "2026-10-01"}; None if malformed."""
+    filters: Dict[str, str] = {}
+    for token in text.split():
+        name, sep, value = token.partition(":")
+        name = name.lower()
+        if not sep or not value or name not in _JOB_FILTERS:
+            return None
+        filters[name] = value
+    return filters
+
+
+def _job_line(job: JobSummary, tz: str) -> str:
+    created = job.created_at.replace(tzinfo=dt_timezone.utc).astimezone(get_zone(tz))
+    line = f"• {created:%m-%d %H:%M} {job.job_type or 'Job'} for {job.client_name or 'N/A'}"
+    if job.location:
+        line += f" at {job.location}"
+    if job.budget:
+        line += f" ({job.budget:,.0f})"
+    return line + f" — {job.status}"
+
+
+@registry.command(
+    "jobs",
+    args=[office_code_arg(), rest_arg("filters", required=False)],
+    usage=_JOBS_USAGE,
+    uses=[get_company_by_code, get_company_employee, list_company_jobs],
+)
+async def company_jobs(ctx: CommandContext) -> None:
+    company = await get_company_by_code(ctx.args["office_code"])
+    if not company:
+        await ctx.reply("❌ I couldn't find a company with that office code.")
+        return
+
+    if company.owner_telegram_id != ctx.user.id:
+        await ctx.reply("❌ Only the owner of this company can list its jobs.")
+        return
+
+    filters = _parse_job_filters(ctx.args.get("filters") or "")
+    if filters is None:
+        await ctx.reply(_JOBS_USAGE)
+        return
+
+    tz = company.timezone or get_settings().DEFAULT_TIMEZONE
+    try:
+        # Whole local days: from the start of `from` to the end of `to`
+        created_from = local_day_start(tz, date.fromisoformat(filters["from"])) if "from" in filters else None
+        created_before = (
+            local_day_start(tz, date.fromisoformat(filters["to"]) + timedelta(days=1))
+            if "to" in filters
+            else None
+        )
+    except ValueError:
+        await ctx.reply("❌ Dates look like <code>2026-10-01</code>.")
+        return
+
+    employee_id = None
+    if "employee" in filters:
+        employee = (
+            await get_company_employee(company.id, int(filters["employee"]))
+            if filters["employee"].isdigit()
+            else None
+        )
+        if employee is None:
+            await ctx.reply("❌ That Telegram ID isn't an employee of this company.")
+            return
+        employee_id = employee.id
+
+    try:
+        page = await list_company_jobs(
+            company_id=company.id,
+            status=filters.get("status", "").lower() or None,
+            employee_id=employee_id,
+            created_from=created_from,
+            created_before=created_before,
+            cursor=filters.get("next"),
+            limit=JOBS_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        await ctx.reply("❌ That page link is broken; start again without <code>next:</code>.")
+        return
+
+    if not page.jobs:
+        await ctx.reply(f"🗂 <b>{company.title}</b>\n\nNo jobs match.")
+        return
+
+    text = f"🗂 <b>{company.title}</b> — jobs, newest first\n\n" + "\n".join(
+        _job_line(job, tz) for job in page.jobs
+    )
+    if page.next_cursor:
+        kept = " ".join(f"{name}:{value}" for name, value in filters.items() if name != "next")
+        more = f"/jobs {company.office_code} {kept} next:{page.next_cursor}".replace("  ", " ")
+        text += f"\n\nMore:\n<code>{more}</code>"
+    await ctx.reply(text)
+
+
+_KEYWORD_INTENTS = {intent.value: intent for intent, _ in INTENT_KEYWORDS}
+
+_KEYWORDS_USAGE = (
+    "Teach Artlix your trade words:\n\n"
+    "<code>/keywords OFFICE_CODE</code> – show them\n"
+    "<code>/keywords OFFICE_CODE add job_intake drywall, pour, rough-in</code>\n"
+    "<code>/keywords OFFICE_CODE remove job_intake pour</code>\n\n"
+    "Intents: " + ", ".join(f"<code>{name}</code>" for name in _KEYWORD_INTENTS)
+)
+
+
+@registry.command(
+    "keywords",
+    args=[
+        office_code_arg(),
+        Arg("action", required=False, transform=str.lower),
+        Arg("intent", required=False, transform=str.lower),
+        rest_arg("words", required=False),
+    ],
+    usage=_KEYWORDS_USAGE,
+    uses=[get_company_by_code, get_company_vocabulary, add_keywords, remove_keywords],
+)
+async def company_keywords(ctx: CommandContext) -> None:
+    company = await get_company_by_code(ctx.args["office_code"])
+    if not company:
+        await ctx.reply("❌ I couldn't find a company with that office code.")
+        return
+
+    if company.owner_telegram_id != ctx.user.id:
+        await ctx.reply("❌ Only the owner of this company can change its keywords.")
+        return
+
+    action = ctx.args.get("action")
+    if action is None:
+        vocabulary = await get_company_vocabulary(company.id)
+        lines = [f"🔤 Keywords for <b>{company.title}</b>:\n"]
+        for name, words in (vocabulary.keywords.items() if vocabulary else ()):
+            if words:
+                lines.append(f"• <code>{name}</code>: {', '.join(words)}")
+        if len(lines) == 1:
+            lines.append("None yet – only the built-in ones are used.")
+        await ctx.reply("\n".join(lines))
+        return
+
+    intent: Intent | None = _KEYWORD_INTENTS.get(ctx.args.get("intent") or "")
+    words = [w for w in (ctx.args.get("words") or "").split(",") if w.strip()]
+    if action not in ("add", "remove") or intent is None or not words:
+        await ctx.reply(_KEYWORDS_USAGE)
+        return
+
+    if action == "add":
+        vocabulary = await add_keywords(company.id, intent, words)
+    else:
+        vocabulary = await remove_keywords(company.id, intent, words)
+
+    current = vocabulary.keywords.get(intent.value, []) if vocabulary else []
+    await ctx.reply(
+        f"✅ Keywords for <code>{intent.value}</code> updated.\n\n"
+        f"🏢 <b>{company.title}</b>\n"
+        f"🔤 {', '.join(current) or 'none'}"
     )
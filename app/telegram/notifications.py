@@ -0,0 +1,142 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import get_settings
+from app.infrastructure.metrics import metrics
+from app.domain.models import Job
+from app.telegram.sender import NOTIFICATION, outbound_sender
+
+settings = get_settings()
+
+# Jobs listed one per line in a summary; the rest are counted
+SUMMARY_MAX_LINES = 25
+
+
+def _job_alert(job: Job, employee_telegram_id: int) -> str:
+    return (
+        "📥 <b>New job added</b>\n\n"
+        f"From employee ID: <code>{employee_telegram_id}</code>\n"
+        f"Client: {job.client_name or 'N/A'}\n"
+        f"Job: {job.job_type or 'N/A'}\n"
+        f"Location: {job.location or 'N/A'}\n"
+        f"Budget: {job.budget or 'N/A'}\n"
+    )
+
+
+def _summary_line(job: Job, employee_telegram_id: int) -> str:
+    line = f"• {job.job_type or 'Job'} for {job.client_name or 'N/A'}"
+    if job.location:
+        line += f" at {job.location}"
+    if job.budget:
+        line += f" ({job.budget})"
+    return line + f" — <code>{employee_telegram_id}</code>"
+
+
+def _summary(lines: List[str]) -> str:
+    shown = lines[:SUMMARY_MAX_LINES]
+    noun = "job" if len(lines) == 1 else "jobs"
+    text = f"📥 <b>{len(lines)} new {noun} added</b>\n\n" + "\n".join(shown)
+    if len(lines) > len(shown):
+        text += f"\n…and {len(lines) - len(shown)} more"
+    return text
+
+
+class _Window:
+    __slots__ = ("bot", "lines", "timer")
+
+    def __init__(self, bot: Any):
+        self.bot = bot
+        self.lines: List[str] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class OwnerNotifier:
+    """
+    "New job" alerts to company owners, coalesced per owner.
+
+    The first job after a quiet period is sent right away and opens a
+    `window_seconds` window. Jobs during the window are collected and sent
+    as one summary when it closes, or as soon as `max_events` have piled
+    up; each summary opens the next window. A window that closes with
+    nothing collected means the owner is quiet again.
+
+    So an owner with a busy crew gets at most one message per window,
+    instead of one per job. window_seconds <= 0 sends every alert.
+    """
+
+    def __init__(self, *, window_seconds: float = 30.0, max_events: int = 20):
+        self.window_seconds = window_seconds
+        self.max_events = max(1, max_events)
+        self._windows: Dict[int, _Window] = {}
+        self._flushing: Set[asyncio.Task] = set()
+
+    def pending(self) -> int:
+        """Alerts collected and not sent yet."""
+        return sum(len(w.lines) for w in self._windows.values())
+
+    async def job_created(self, bot: Any, owner_id: int, job: Job, employee_telegram_id: int) -> None:
+        if self.window_seconds <= 0:
+            await outbound_sender.send(bot, owner_id, _job_alert(job, employee_telegram_id), NOTIFICATION)
+            return
+
+        window = self._windows.get(owner_id)
+        if window is None:
+            window = self._windows[owner_id] = _Window(bot)
+            self._open(owner_id, window)
+            await outbound_sender.send(bot, owner_id, _job_alert(job, employee_telegram_id), NOTIFICATION)
+            return
+
+        window.lines.append(_summary_line(job, employee_telegram_id))
+        if len(window.lines) >= self.max_events:
+            await self._flush(owner_id, window)
+
+    def _open(self, owner_id: int, window: _Window) -> None:
+        loop = asyncio.get_running_loop()
+        window.timer = loop.call_later(self.window_seconds, self._close, owner_id)
+
+    def _close(self, owner_id: int) -> None:
+        window = self._windows.get(owner_id)
+        if window is None:
+            return
+        if not window.lines:
+            del self._windows[owner_id]
+            return
+        task = asyncio.create_task(self._flush(owner_id, window))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, owner_id: int, window: _Window) -> None:
+        if window.timer is not None:
+            window.timer.cancel()
+        self._open(owner_id, window)
+        await self._flush_now(owner_id, window)
+
+    async def _flush_now(self, owner_id: int, window: _Window) -> None:
+        lines, window.lines = window.lines, []
+        try:
+            await outbound_sender.send(window.bot, owner_id, _summary(lines), NOTIFICATION)
+        except Exception as e:
+            print("[owner notify] error:", repr(e))
+
+    async def stop(self) -> None:
+        """Send what is collected now instead of waiting for the windows to close."""
+        windows, self._windows = self._windows, {}
+        for owner_id, window in windows.items():
+            if window.timer is not None:
+                window.timer.cancel()
+            if window.lines:
+                await self._flush_now(owner_id, window)
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+
+owner_notifier = OwnerNotifier(
+    window_seconds=settings.OWNER_NOTIFY_WINDOW_SECONDS,
+    max_events=settings.OWNER_NOTIFY_MAX_EVENTS,
+)
+
+metrics.gauge_func(
+    "artlix_owner_alerts_pending",
+    "New-job alerts collected for the next owner summary.",
+    owner_notifier.pending,
+)
@@ -0,0 +1,324 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from app.core.config import get_settings
+from app.infrastructure.metrics import metrics, telegram_sends_total
+
+settings = get_settings()
+
+# Lower sends first: someone is waiting on a reply, nobody on a notification
+REPLY = 0
+NOTIFICATION = 1
+_PRIORITY_NAMES = ("reply", "notification")
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity` (the burst)."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available; 0 if one is now."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Outgoing:
+    __slots__ = ("bot", "text", "priority", "seq", "attempts")
+
+    def __init__(self, bot: Any, text: str, priority: int, seq: int):
+        self.bot = bot
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.attempts = 0
+
+
+class _Chat:
+    __slots__ = ("chat_id", "bucket", "queues", "busy", "paused_until")
+
+    def __init__(self, chat_id: int, bucket: TokenBucket):
+        self.chat_id = chat_id
+        self.bucket = bucket
+        # one FIFO per priority
+        self.queues: Tuple[Deque[_Outgoing], ...] = (deque(), deque())
+        # a send to this chat is in flight; the next one waits for it (order)
+        self.busy = False
+        # set from a 429's retry_after
+        self.paused_until = 0.0
+
+    def head(self) -> Optional[_Outgoing]:
+        for queue in self.queues:
+            if queue:
+                return queue[0]
+        return None
+
+
+class OutboundSender:
+    """
+    Sends Telegram messages for the whole app within Telegram's flood limits.
+
+    - send() queues the message and returns; one loop sends it later.
+    - Every send takes a token from the global bucket and from its chat's
+      bucket (groups get a slower one), so bursts from a busy company
+      queue here instead of coming back as 429s.
+    - Among chats ready to send, replies go before notifications, then
+      the oldest message first. A chat has at most one send in flight,
+      so its messages arrive in the order they were queued (per priority).
+    - A 429 pauses that chat for the `retry_after` Telegram asks for and
+      retries the message, up to `max_retries` times. Other errors are
+      logged and the message is dropped, as when handlers sent directly.
+    - The queue holds at most `max_pending` messages. Past that a new
+      notification is dropped; a new reply makes room by dropping the
+      oldest queued notification, or failing that the oldest queued reply
+      (a reply that old is late anyway). Drops are counted in
+      artlix_telegram_sends_total{outcome="dropped"}.
+
+    When the sender isn't running (not started, or the aiogram polling
+    path in scripts), send() calls the Bot API directly.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 25.0,
+        burst: int = 25,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        group_rate: float = 20 / 60,
+        concurrency: int = 8,
+        max_pending: int = 5000,
+        max_retries: int = 3,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+
+        self._global = TokenBucket(rate, burst, time.monotonic())
+        self._chats: Dict[int, _Chat] = {}
+        # chats with queued messages; scanned on every send, so it stays
+        # as small as the number of chats actually waiting
+        self._waiting: Set[int] = set()
+        self._pending = 0
+        self._seq = itertools.count()
+        self._last_prune = 0.0
+        # (re)made in start(), on the loop the sender runs on
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._in_flight: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    def depth(self) -> int:
+        """Messages queued and not yet handed to the Bot API."""
+        return self._pending
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._run(), name="telegram-sender")
+
+    async def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop accepting messages and send what is queued, for up to `timeout` seconds."""
+        task = self._task
+        if task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            print("[sender] dropped", self._pending, "unsent messages on shutdown")
+        if self._in_flight:
+            await asyncio.wait(self._in_flight, timeout=timeout)
+        self._task = None
+        self._chats.clear()
+        self._waiting.clear()
+        self._pending = 0
+
+    async def send(self, bot: Any, chat_id: int, text: str, priority: int = REPLY) -> None:
+        if not self.running:
+            await bot.send_message(chat_id=chat_id, text=text)
+            return
+
+        if self._pending >= self.max_pending:
+            if priority != REPLY:
+                telegram_sends_total.inc(outcome="dropped", priority=_PRIORITY_NAMES[priority])
+                return
+            self._drop_oldest(NOTIFICATION) or self._drop_oldest(REPLY)
+
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            # negative ids are groups and channels, which Telegram limits harder
+            rate = self.group_rate if chat_id < 0 else self.chat_rate
+            chat = self._chats[chat_id] = _Chat(
+                chat_id, TokenBucket(rate, self.chat_burst, time.monotonic())
+            )
+        chat.queues[priority].append(_Outgoing(bot, text, priority, next(self._seq)))
+        self._waiting.add(chat_id)
+        self._pending += 1
+        self._wakeup.set()
+
+    def _drop_oldest(self, priority: int) -> bool:
+        """Drop the oldest queued message of `priority`; False if there is none."""
+        oldest: Optional[_Chat] = None
+        for chat_id in self._waiting:
+            queue = self._chats[chat_id].queues[priority]
+            if queue and (oldest is None or queue[0].seq < oldest.queues[priority][0].seq):
+                oldest = self._chats[chat_id]
+        if oldest is None:
+            return False
+        oldest.queues[priority].popleft()
+        self._pending -= 1
+        if not oldest.busy and oldest.head() is None:
+            self._waiting.discard(oldest.chat_id)
+        telegram_sends_total.inc(outcome="dropped", priority=_PRIORITY_NAMES[priority])
+        return True
+
+    # -------------------- send loop --------------------
+
+    def _next(self, now: float) -> Tuple[Optional[_Chat], Optional[_Outgoing], Optional[float]]:
+        """
+        The chat to send to now and its next message; else (None, None,
+        seconds until a chat is ready, or None if none is waiting on time).
+        """
+        best: Optional[_Chat] = None
+        best_item: Optional[_Outgoing] = None
+        wait: Optional[float] = None
+        for chat_id in self._waiting:
+            chat = self._chats[chat_id]
+            head = chat.head()
+            if chat.busy or head is None:
+                # a finishing send sets _wakeup
+                continue
+            delay = max(chat.paused_until - now, chat.bucket.delay(now))
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            if best_item is None or (head.priority, head.seq) < (best_item.priority, best_item.seq):
+                best, best_item = chat, head
+        return best, best_item, wait
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            chat, item, wait = self._next(now)
+
+            if chat is None or item is None:
+                if self._stopping and not self._pending:
+                    return
+                if now - self._last_prune > 60:
+                    self._prune(now)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            global_wait = self._global.delay(now)
+            if global_wait > 0:
+                # pick again afterwards: a reply may have been queued meanwhile
+                await asyncio.sleep(global_wait)
+                continue
+
+            await self._slots.acquire()
+            now = time.monotonic()
+            self._global.take(now)
+            chat.bucket.take(now)
+            chat.queues[item.priority].popleft()
+            chat.busy = True
+            self._pending -= 1
+
+            task = asyncio.create_task(self._send(chat, item))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, chat: _Chat, item: _Outgoing) -> None:
+        outcome = "error"
+        try:
+            await item.bot.send_message(chat_id=chat.chat_id, text=item.text)
+            outcome = "sent"
+        except TelegramRetryAfter as e:
+            item.attempts += 1
+            if item.attempts <= self.max_retries:
+                outcome = "retry_after"
+                chat.paused_until = time.monotonic() + e.retry_after
+                chat.queues[item.priority].appendleft(item)
+                self._pending += 1
+            else:
+                print("[sender] giving up on chat", chat.chat_id, "after", item.attempts, "429s")
+        except Exception as e:
+            print("[sender] send to chat", chat.chat_id, "failed:", repr(e))
+        finally:
+            telegram_sends_total.inc(outcome=outcome, priority=_PRIORITY_NAMES[item.priority])
+            chat.busy = False
+            self._slots.release()
+            if chat.head() is None:
+                self._waiting.discard(chat.chat_id)
+            self._wakeup.set()
+
+    def _prune(self, now: float) -> None:
+        # An idle chat's bucket only matters until it has refilled; past
+        # that a fresh one behaves the same, so the entry can go
+        self._last_prune = now
+        for chat_id in [
+            c.chat_id
+            for c in self._chats.values()
+            if not c.busy and c.head() is None and c.bucket.full(now) and c.paused_until <= now
+        ]:
+            del self._chats[chat_id]
+
+
+outbound_sender = OutboundSender(
+    rate=settings.TELEGRAM_SEND_RATE,
+    burst=settings.TELEGRAM_SEND_BURST,
+    chat_rate=settings.TELEGRAM_CHAT_SEND_RATE,
+    chat_burst=settings.TELEGRAM_CHAT_SEND_BURST,
+    group_rate=settings.TELEGRAM_GROUP_SEND_RATE,
+    concurrency=settings.TELEGRAM_SEND_CONCURRENCY,
+    max_pending=settings.TELEGRAM_SEND_QUEUE_MAXSIZE,
+    max_retries=settings.TELEGRAM_SEND_MAX_RETRIES,
+)
+
+metrics.gauge_func(
+    "artlix_telegram_send_queue_depth",
+    "Outbound Telegram messages waiting for a send slot.",
+    outbound_sender.depth,
+)
@@ -0,0 +1,153 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+UpdateHandler = Callable[[Any], Awaitable[None]]
+
+# Marker put on an empty shard to wake its idle worker on stop()
+_STOP = object()
+
+
+class UpdateQueue:
+    """
+    Bounded in-process queue for Telegram updates.
+
+    Updates are sharded by chat id: every chat always lands on the same
+    worker, so updates from one chat are handled in the order they arrived,
+    while different chats are handled in parallel by different workers.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        *,
+        workers: int = 8,
+        maxsize: int = 1000,
+    ):
+        self._handler = handler
+        self._workers = max(1, workers)
+        self._shard_maxsize = max(1, maxsize // self._workers)
+        self._shards: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+        # workers exit once their shard is empty
+        self._draining = False
+        # submit() calls waiting for room on a full shard
+        self._putting = 0
+        self._put_done = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._accepting
+
+    def depth(self) -> int:
+        """Number of updates waiting across all shards."""
+        return sum(q.qsize() for q in self._shards)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._shards = [
+            asyncio.Queue(maxsize=self._shard_maxsize) for _ in range(self._workers)
+        ]
+        self._tasks = [
+            asyncio.create_task(self._worker(i, q), name=f"update-worker-{i}")
+            for i, q in enumerate(self._shards)
+        ]
+        self._draining = False
+        self._accepting = True
+
+    async def submit(self, chat_id: int, update: Any) -> None:
+        """
+        Put an update on its chat's shard.
+
+        Waits when the shard is full, which pushes back on Telegram instead
+        of growing memory. If the queue isn't running (not started yet or
+        already draining) the update is handled inline.
+        """
+        if not self._accepting:
+            await self._handle(update)
+            return
+
+        shard = self._shards[hash(chat_id) % self._workers]
+        self._putting += 1
+        try:
+            await shard.put(update)
+        finally:
+            self._putting -= 1
+            self._put_done.set()
+
+    async def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop accepting new updates and let workers finish what is queued,
+        including updates whose submit() was waiting for room. Workers
+        still busy after `timeout` seconds are cancelled.
+        """
+        if not self._tasks:
+            return
+
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            pending = [task for task in self._tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            dropped = await self._release_putters()
+            print(
+                "[update_queue] cancelled",
+                len(pending),
+                "workers that did not drain in time; dropped",
+                dropped,
+                "updates",
+            )
+
+        self._tasks = []
+        self._shards = []
+
+    async def _drain(self) -> None:
+        # Updates still waiting in submit() go on their shards before any
+        # worker is told to exit, so none lands on a shard nobody reads
+        while self._putting:
+            self._put_done.clear()
+            await self._put_done.wait()
+        self._draining = True
+        for q in self._shards:
+            # a busy worker sees _draining once its shard is empty; an
+            # idle one is blocked in get() and needs waking. An empty
+            # shard always has room, so this never waits
+            if q.empty():
+                q.put_nowait(_STOP)
+        await asyncio.wait(self._tasks)
+
+    async def _release_putters(self) -> int:
+        # Workers are gone: empty the shards so submit() calls blocked on
+        # put() return instead of waiting forever
+        dropped = 0
+        while True:
+            for q in self._shards:
+                while not q.empty():
+                    if q.get_nowait() is not _STOP:
+                        dropped += 1
+            if not self._putting:
+                return dropped
+            await asyncio.sleep(0)
+
+    async def _worker(self, index: int, queue: asyncio.Queue) -> None:
+        while True:
+            update = await queue.get()
+            try:
+                if update is _STOP:
+                    return
+                await self._handle(update)
+            finally:
+                queue.task_done()
+            if self._draining and queue.empty():
+                return
+
+    async def _handle(self, update: Any) -> None:
+        try:
+            await self._handler(update)
+        except Exception as e:
+            # One bad update must not kill the worker
+            print("[update_queue] error while handling update:", repr(e))
@@ -0,0 +1,301 @@
+"""
+Throughput and allocations of the code that runs on every message.
+
+Each benchmark calls one function once per input (see corpus.py)
+and reports calls/sec (best of several rounds) and the peak bytes
+allocated during a call (tracemalloc, averaged over the corpus).
+Results are compared against benchmarks/baseline.json.
+
+    python -m benchmarks.bench_hot_paths                    # report
+    python -m benchmarks.bench_hot_paths --check            # exit 1 on regression
+    python -m benchmarks.bench_hot_paths --update-baseline  # record new baseline
+    python -m benchmarks.bench_hot_paths -k classify        # only matching names
+
+Throughput depends on the machine: refresh the baseline when running
+--check on different hardware or Python versions.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import bson
+import numpy as np
+
+from app.domain.decision_engine import classify_message
+from app.domain.events import build_job_created_payload
+from app.domain.models import COMPANY_BRIEF_FIELDS, Company, CompanyBrief, Employee, Job
+from app.domain.nlp.analysis import analyze_message, analyze_messages, build_intent_matcher
+from app.domain.nlp.job_classifier import HashedNgramClassifier
+from app.domain.nlp.training import featurize, train, weak_examples
+from app.domain.nlp.parser import parse_job_intake
+from app.domain.nlp.schedule import find_schedule, parse_schedule
+from app.infrastructure import n8n_client
+from app.telegram.decision_engine import classify_message_and_build_job
+from benchmarks.corpus import (
+    COMPANY_DOCS,
+    EMPLOYEE_DOCS,
+    JOB_DOCS,
+    MESSAGES,
+    TELEGRAM_USER,
+    TRADE_VOCABULARY,
+)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Allocation noise floor: a few hundred bytes move with interpreter state
+ALLOC_SLACK_BYTES = 256
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    fn: Callable[[Any], Any]
+    inputs: Sequence[Any]
+
+
+@dataclass
+class Result:
+    ops_per_sec: float
+    alloc_bytes_per_call: float
+
+
+_JOBS = [Job.model_validate(doc) for doc in JOB_DOCS]
+_LOWERED = [m.lower() for m in MESSAGES]
+_DEFAULT_MATCHER = build_intent_matcher()
+_TRADE_MATCHER = build_intent_matcher(TRADE_VOCABULARY)
+_TOKENS = [analyze_message(m).tokens for m in MESSAGES]
+
+
+def _corpus_classifier() -> HashedNgramClassifier:
+    # Weights only need the right shape and realistic sparsity to time scoring
+    examples = weak_examples(MESSAGES)
+    n_buckets = 1 << 18
+    weights = train(
+        featurize([t for t, _ in examples], n_buckets),
+        np.array([label for _, label in examples], dtype=np.float64),
+        n_buckets=n_buckets,
+        epochs=2,
+    )
+    return HashedNgramClassifier(weights)
+
+
+_CLASSIFIER = _corpus_classifier()
+
+
+# The driver's reply to a whole-document read vs. a COMPANY_BRIEF_FIELDS projection
+_COMPANY_BSON = [bson.encode(doc) for doc in COMPANY_DOCS]
+_COMPANY_BRIEF_BSON = [
+    bson.encode({"_id": doc["_id"], **{f: doc[f] for f in COMPANY_BRIEF_FIELDS if f in doc}})
+    for doc in COMPANY_DOCS
+]
+
+
+def _company_lookup_full(raw: bytes) -> Company:
+    return Company.model_validate(bson.decode(raw))
+
+
+def _company_lookup_brief(raw: bytes) -> CompanyBrief:
+    return CompanyBrief.from_doc(bson.decode(raw))
+
+
+def _serialize_webhook_payload(job: Job) -> bytes:
+    # What deliver_webhook() sends: the payload dict, JSON-encoded
+    return json.dumps(build_job_created_payload(job, TELEGRAM_USER)).encode()
+
+
+def _serialize_n8n_payload(job: Job) -> bytes:
+    return json.dumps(n8n_client.build_job_created_payload(job)).encode()
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("analyze_message", analyze_message, MESSAGES),
+    # One call = the whole corpus (200 messages)
+    Benchmark("analyze_messages_batch", analyze_messages, [MESSAGES]),
+    Benchmark("intent_matcher_builtin", _DEFAULT_MATCHER.first, _LOWERED),
+    Benchmark("intent_matcher_trade_vocabulary", _TRADE_MATCHER.first, _LOWERED),
+    Benchmark("parse_job_intake", parse_job_intake, MESSAGES),
+    Benchmark("find_schedule", find_schedule, _LOWERED),
+    # Resolution is memoized per (phrase, day, timezone): steady state is all hits
+    Benchmark("parse_schedule", parse_schedule, _LOWERED),
+    Benchmark("classify_message", classify_message, MESSAGES),
+    Benchmark("classify_message_and_build_job", classify_message_and_build_job, MESSAGES),
+    Benchmark("job_classifier_score", _CLASSIFIER.score, _TOKENS),
+    # One call = the whole corpus scored as one micro-batch
+    Benchmark("job_classifier_score_batch", _CLASSIFIER.score_batch, [_TOKENS]),
+    Benchmark("company_model_validate", Company.model_validate, COMPANY_DOCS),
+    Benchmark("employee_model_validate", Employee.model_validate, EMPLOYEE_DOCS),
+    Benchmark("job_model_validate", Job.model_validate, JOB_DOCS),
+    # Client-side CPU of one company read: decode the reply, build the result
+    Benchmark("company_lookup_full", _company_lookup_full, _COMPANY_BSON),
+    Benchmark("company_lookup_brief", _company_lookup_brief, _COMPANY_BRIEF_BSON),
+    Benchmark("job_created_payload_json", _serialize_webhook_payload, _JOBS),
+    Benchmark("n8n_payload_json", _serialize_n8n_payload, _JOBS),
+]
+
+
+def _run_pass(fn: Callable[[Any], Any], inputs: Sequence[Any]) -> None:
+    for item in inputs:
+        fn(item)
+
+
+def measure_throughput(bench: Benchmark, rounds: int, round_seconds: float) -> float:
+    """Best calls/sec over `rounds` rounds of at least `round_seconds` each."""
+    _run_pass(bench.fn, bench.inputs)  # warm up caches and lazy imports
+    best = float("inf")
+    for _ in range(rounds):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            _run_pass(bench.fn, bench.inputs)
+            calls += len(bench.inputs)
+            elapsed = time.perf_counter() - started
+            if elapsed >= round_seconds:
+                break
+        best = min(best, elapsed / calls)
+    return 1.0 / best
+
+
+def measure_allocations(bench: Benchmark) -> float:
+    """Average peak bytes allocated while one call runs."""
+    tracemalloc.start()
+    try:
+        total = 0
+        for item in bench.inputs:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            bench.fn(item)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / len(bench.inputs)
+
+
+def run(benchmarks: Sequence[Benchmark], rounds: int, round_seconds: float) -> Dict[str, Result]:
+    results = {}
+    for bench in benchmarks:
+        results[bench.name] = Result(
+            ops_per_sec=measure_throughput(bench, rounds, round_seconds),
+            alloc_bytes_per_call=measure_allocations(bench),
+        )
+    return results
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: Dict[str, Result], previous: Dict[str, Any]) -> None:
+    benchmarks = dict(previous.get("benchmarks", {}))
+    benchmarks.update(
+        {
+            name: {
+                "ops_per_sec": round(r.ops_per_sec),
+                "alloc_bytes_per_call": round(r.alloc_bytes_per_call, 1),
+            }
+            for name, r in results.items()
+        }
+    )
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": {name: benchmarks[name] for name in sorted(benchmarks)},
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def regressions(
+    results: Dict[str, Result],
+    baseline: Dict[str, Any],
+    threshold: float,
+) -> List[str]:
+    """Describe every result that is slower or allocates more than the baseline allows."""
+    problems = []
+    for name, result in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        min_ops = base["ops_per_sec"] * (1 - threshold)
+        if result.ops_per_sec < min_ops:
+            problems.append(
+                f"{name}: {result.ops_per_sec:,.0f} ops/s < {min_ops:,.0f} "
+                f"(baseline {base['ops_per_sec']:,.0f})"
+            )
+        max_alloc = base["alloc_bytes_per_call"] * (1 + threshold) + ALLOC_SLACK_BYTES
+        if result.alloc_bytes_per_call > max_alloc:
+            problems.append(
+                f"{name}: {result.alloc_bytes_per_call:,.0f} B/call > {max_alloc:,.0f} "
+                f"(baseline {base['alloc_bytes_per_call']:,.0f})"
+            )
+    return problems
+
+
+def _change(current: float, base: Optional[float]) -> str:
+    if not base:
+        return "     new"
+    return f"{(current / base - 1) * 100:+7.1f}%"
+
+
+def print_report(results: Dict[str, Result], baseline: Dict[str, Any]) -> None:
+    base_results = baseline.get("benchmarks", {})
+    print(f"{'benchmark':34} {'ops/sec':>12} {'vs base':>8} {'B/call':>9} {'vs base':>8}")
+    for name, r in results.items():
+        base = base_results.get(name, {})
+        print(
+            f"{name:34} {r.ops_per_sec:12,.0f} {_change(r.ops_per_sec, base.get('ops_per_sec'))}"
+            f" {r.alloc_bytes_per_call:9,.0f}"
+            f" {_change(r.alloc_bytes_per_call, base.get('alloc_bytes_per_call'))}"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="match", help="only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds per benchmark")
+    parser.add_argument("--round-seconds", type=float, default=0.2, help="minimum length of a round")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a benchmark regressed")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown / extra allocation as a fraction of the baseline",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="write results to the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    selected = [b for b in BENCHMARKS if not args.match or args.match in b.name]
+    if not selected:
+        print("no benchmark matches", repr(args.match))
+        return 2
+
+    baseline = load_baseline(args.baseline)
+    results = run(selected, args.rounds, args.round_seconds)
+    print_report(results, baseline)
+
+    if baseline and baseline.get("python") != platform.python_version():
+        print(f"note: baseline was recorded on Python {baseline.get('python')}")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print("baseline updated:", args.baseline)
+        return 0
+
+    if args.check:
+        problems = regressions(results, baseline, args.threshold)
+        for problem in problems:
+            print("REGRESSION", problem)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Per-update CPU time of webhook decoding.
+
+"before" is what the route used to do: JSON-parse the body into a dict,
+run full aiogram Update validation and print the whole payload.
+"after" is decode_update() on the raw bytes.
+
+    python -m benchmarks.bench_update_decode [-n 20000]
+"""
+import argparse
+import io
+import json
+import time
+from contextlib import redirect_stdout
+
+from aiogram.types import Update
+
+from app.telegram.fast_update import decode_update
+
+_CHAT = {
+    "id": 481516234,
+    "first_name": "Mike",
+    "last_name": "Rivera",
+    "username": "mike_builds",
+    "type": "private",
+}
+_FROM = {
+    "id": 481516234,
+    "is_bot": False,
+    "first_name": "Mike",
+    "last_name": "Rivera",
+    "username": "mike_builds",
+    "language_code": "en",
+}
+
+SAMPLE_UPDATES = [
+    {
+        "update_id": 900000001,
+        "message": {
+            "message_id": 1201,
+            "from": _FROM,
+            "chat": _CHAT,
+            "date": 1760000000,
+            "text": "/join_company K7P2QX Mike Rivera",
+            "entities": [{"offset": 0, "length": 13, "type": "bot_command"}],
+        },
+    },
+    {
+        "update_id": 900000002,
+        "message": {
+            "message_id": 1202,
+            "from": _FROM,
+            "chat": _CHAT,
+            "date": 1760000060,
+            "text": (
+                "New job: client: Sarah Chen, kitchen reno at 42 Elm St, "
+                "budget 18k, start next week"
+            ),
+        },
+    },
+    {
+        "update_id": 900000003,
+        "edited_message": {
+            "message_id": 1202,
+            "from": _FROM,
+            "chat": _CHAT,
+            "date": 1760000060,
+            "edit_date": 1760000090,
+            "text": (
+                "New job: client: Sarah Chen, kitchen reno at 44 Elm St, "
+                "budget 18k, start next week"
+            ),
+        },
+    },
+]
+
+BODIES = [json.dumps(u).encode() for u in SAMPLE_UPDATES]
+
+
+def decode_before(body: bytes) -> None:
+    update = json.loads(body)
+    print("[telegram_webhook] incoming update:", update)
+    Update.model_validate(update)
+
+
+def decode_after(body: bytes) -> None:
+    decode_update(body)
+
+
+def cpu_us_per_update(fn, n: int) -> float:
+    sink = io.StringIO()
+    with redirect_stdout(sink):
+        for body in BODIES:  # warm up
+            fn(body)
+        start = time.process_time()
+        for i in range(n):
+            fn(BODIES[i % len(BODIES)])
+        elapsed = time.process_time() - start
+    return elapsed / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=20_000, help="updates per variant")
+    args = parser.parse_args()
+
+    before = cpu_us_per_update(decode_before, args.n)
+    after = cpu_us_per_update(decode_after, args.n)
+    print(f"before (dict + aiogram Update + print): {before:8.2f} µs/update")
+    print(f"after  (decode_update on raw bytes):    {after:8.2f} µs/update")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Realistic inputs for the hot-path benchmarks.
+
+MESSAGES mixes what crews actually send the bot: job intakes in several
+shapes, scheduling and follow-up chatter, one-word acks and long
+multi-line notes. It's generated from a fixed seed, so every run (and
+the stored baseline) sees the same corpus.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+
+SEED = 20241018
+
+_CLIENTS = [
+    "Sarah Chen", "Mike Rivera", "Dana O'Neil", "Priya Patel", "Tom Kowalski",
+    "Aisha Mohammed", "Luis Ortega", "Grace Kim", "Bob & Linda Hart", "Chen Wei",
+]
+_JOBS = [
+    "kitchen reno", "bathroom remodel", "deck repair", "roof leak", "basement finishing",
+    "drywall patch", "window replacement", "fence install", "tile backsplash",
+    "hardwood refinishing", "garage door", "exterior paint", "furnace swap",
+]
+_STREETS = [
+    "42 Elm St", "1187 Queen St W", "9 Harbour Rd", "310 Maple Ave, Unit 4",
+    "77 Birch Cres", "15 King St E", "2201 Lakeshore Blvd", "6 Orchard Lane",
+]
+_WHEN = ["tomorrow", "next week", "Monday", "this Friday", "asap", "end of month", ""]
+_BUDGETS = ["18k", "2.5k", "$900", "12 thousand", "4500$", "", "around 7k"]
+
+_TEMPLATES = [
+    "New job: client: {client}, {job} at {street}, budget {budget}, start {when}",
+    "job: {job}\nclient: {client}\naddress: {street}\nbudget {budget}\n{when}",
+    "Lead from website - name: {client}, wants a quote for {job} at {street}",
+    "estimate needed for {job}, client - {client}, address: {street}. {when}",
+    "Quote request: {job} for {client} at {street} budget {budget}",
+    "renovation lead {client} {street} {job} {budget} {when}",
+    "Can we schedule a site visit with {client} at {street} {when}?",
+    "book appointment for {client} {when} re {job}",
+    "follow up with {client} about the {job} estimate",
+    "status update: {job} at {street} drywall done, paint {when}",
+    "check in with {client} — they haven't paid the {job} deposit",
+    "daily report: 3 crews out, {job} at {street} on track",
+    "summary of today: finished {job}, materials for {street} ordered",
+    "ok",
+    "👍",
+    "on my way",
+    "running 10 min late",
+    "Where are the extra tiles for {street}?",
+]
+
+_LONG_NOTE = (
+    "New job: client: {client}, {job} at {street}.\n"
+    "Walkthrough notes: existing cabinets stay, replace counters with quartz, "
+    "move the sink 2 ft left, new GFCI outlets x4, under-cabinet lighting, "
+    "patch + paint ceiling after plumbing. Client wants everything done before "
+    "the holidays, budget {budget}, start {when}. Parking on street only, "
+    "dog in the house, use side door. Call before arriving.\n"
+    "Materials: 40 sq ft backsplash tile, 2 boxes of thinset, grout (warm grey)."
+)
+
+
+def _messages(n: int, rng: random.Random) -> List[str]:
+    messages = []
+    for i in range(n):
+        template = _LONG_NOTE if i % 17 == 0 else rng.choice(_TEMPLATES)
+        messages.append(
+            template.format(
+                client=rng.choice(_CLIENTS),
+                job=rng.choice(_JOBS),
+                street=rng.choice(_STREETS),
+                when=rng.choice(_WHEN),
+                budget=rng.choice(_BUDGETS),
+            ).strip()
+        )
+    return messages
+
+
+def _documents(n: int, rng: random.Random):
+    """Mongo-shaped company / employee / job dicts, as Motor returns them."""
+    now = datetime(2024, 10, 18, 9, 30)
+    companies, employees, jobs = [], [], []
+    for i in range(n):
+        company_id, employee_id = ObjectId(), ObjectId()
+        companies.append(
+            {
+                "_id": company_id,
+                "owner_telegram_id": 100_000_000 + i,
+                "title": f"{rng.choice(_CLIENTS).split()[0]} Renovations",
+                "office_code": f"K{i:05d}",
+                "created_at": now - timedelta(days=i),
+            }
+        )
+        employees.append(
+            {
+                "_id": employee_id,
+                "company_id": company_id,
+                "telegram_id": 200_000_000 + i,
+                "name": rng.choice(_CLIENTS),
+                "role": "employee" if i % 5 else "owner",
+                "created_at": now - timedelta(hours=i),
+            }
+        )
+        jobs.append(
+            {
+                "_id": ObjectId(),
+                "company_id": company_id,
+                "created_by_employee_id": employee_id,
+                "client_name": rng.choice(_CLIENTS),
+                "job_type": rng.choice(_JOBS),
+                "location": rng.choice(_STREETS),
+                "scheduled_for": now + timedelta(days=i % 9) if i % 3 else None,
+                "budget": float(rng.randrange(500, 40_000, 250)) if i % 4 else None,
+                "notes": "New job: see raw text",
+                "raw_text": _messages(1, rng)[0],
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": None,
+                "status": "new",
+                "telegram_chat_id": 300_000_000 + i,
+                "telegram_message_id": 1000 + i,
+            }
+        )
+    return companies, employees, jobs
+
+
+_rng = random.Random(SEED)
+MESSAGES: List[str] = _messages(200, _rng)
+COMPANY_DOCS, EMPLOYEE_DOCS, JOB_DOCS = _documents(50, _rng)
+TELEGRAM_USER = {
+    "user_id": 481516234,
+    "username": "mike_builds",
+    "first_name": "Mike",
+    "last_name": "Rivera",
+}
+
+
+def _trade_vocabulary(rng: random.Random):
+    """A big contractor vocabulary: real trade words plus synthetic part numbers."""
+    trade = [
+        "drywall", "pour", "rough-in", "framing", "stucco", "rebar", "footing", "joist",
+        "shingle", "soffit", "fascia", "caulk", "primer", "sheathing", "insulation",
+        "ductwork", "conduit", "subfloor", "flashing", "grout",
+    ]
+    parts = [f"sku-{rng.randrange(10**6):06d}" for _ in range(1000)]
+    return {"job_intake": trade + parts[:500], "scheduling": parts[500:]}
+
+
+TRADE_VOCABULARY = _trade_vocabulary(random.Random(SEED + 1))
@@ -0,0 +1,117 @@
+"""
+Local stand-ins for everything the bot talks to, for the load harness.
+
+- Fake Bot API: answers /bot<token>/<method> like api.telegram.org and
+  records every sendMessage, so the harness can read replies (office
+  codes) back. Point the app at it with TELEGRAM_API_BASE_URL.
+- Fake webhook receivers: /hook/<name>?latency_ms=..&failure_rate=..
+  Each company's integration URL carries its own latency and failure
+  rate; failures answer 500 so the outbox retries them.
+
+Runs as its own process so it doesn't compete with the load generator:
+
+    python -m benchmarks.fakes --port 8081 [--bot-api-latency-ms 5]
+
+GET /_messages/<chat_id> and GET /_stats expose what was received.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+
+class FakeUpstream:
+    """State shared by the fake Bot API and the fake webhook receivers."""
+
+    def __init__(self, bot_api_latency_ms: float = 0.0, seed: int = 0):
+        self.bot_api_latency_ms = bot_api_latency_ms
+        self.bot_api_calls: Counter = Counter()
+        self.messages: Dict[int, List[str]] = defaultdict(list)
+        self.webhooks_received: Counter = Counter()
+        self.webhooks_failed: Counter = Counter()
+        self._message_ids = 0
+        self._rng = random.Random(seed)
+
+    def record_message(self, chat_id: int, text: str) -> dict:
+        self._message_ids += 1
+        self.messages[chat_id].append(text)
+        return {
+            "message_id": self._message_ids,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text,
+        }
+
+    def should_fail(self, failure_rate: float) -> bool:
+        return failure_rate > 0 and self._rng.random() < failure_rate
+
+    def stats(self) -> dict:
+        return {
+            "bot_api_calls": dict(self.bot_api_calls),
+            "webhooks_received": sum(self.webhooks_received.values()),
+            "webhooks_failed": sum(self.webhooks_failed.values()),
+        }
+
+
+def _bot_api_params(body: bytes, content_type: str) -> Dict[str, str]:
+    # aiogram posts form fields (urlencoded when there are no files)
+    if content_type.startswith("application/json"):
+        return {k: str(v) for k, v in json.loads(body or b"{}").items()}
+    return {k: v[0] for k, v in parse_qs(body.decode()).items()}
+
+
+def build_app(upstream: FakeUpstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/bot{token}/{method}")
+    async def bot_api(token: str, method: str, request: Request):
+        upstream.bot_api_calls[method] += 1
+        if upstream.bot_api_latency_ms:
+            await asyncio.sleep(upstream.bot_api_latency_ms / 1000)
+        if method.lower() != "sendmessage":
+            return {"ok": True, "result": True}
+        params = _bot_api_params(await request.body(), request.headers.get("content-type", ""))
+        chat_id = int(params["chat_id"])
+        return {"ok": True, "result": upstream.record_message(chat_id, params.get("text", ""))}
+
+    @app.post("/hook/{name}")
+    async def webhook_receiver(name: str, latency_ms: float = 0.0, failure_rate: float = 0.0):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if upstream.should_fail(failure_rate):
+            upstream.webhooks_failed[name] += 1
+            return Response(status_code=500)
+        upstream.webhooks_received[name] += 1
+        return {"ok": True}
+
+    @app.get("/_messages/{chat_id}")
+    async def messages(chat_id: int) -> List[str]:
+        return upstream.messages.get(chat_id, [])
+
+    @app.get("/_stats")
+    async def stats() -> dict:
+        return upstream.stats()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Bot API and webhook receivers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--bot-api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    upstream = FakeUpstream(bot_api_latency_ms=args.bot_api_latency_ms, seed=args.seed)
+    uvicorn.run(build_app(upstream), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
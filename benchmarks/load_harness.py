@@ -0,0 +1,346 @@
+"""
+End-to-end load test of POST /telegram/webhook.
+
+Starts a fake Bot API and fake webhook receivers (benchmarks/fakes.py)
+and the app under uvicorn, each in its own process, with the app pointed
+at the fakes. Then it seeds
+companies through the bot itself (/new_company, /connect_webhook,
+/join_company), then replays synthetic updates and reports throughput,
+latency percentiles and errors.
+
+    python -m benchmarks.load_harness --updates 20000 --concurrency 200
+    python -m benchmarks.load_harness --rate 2000 --webhook-latency-ms 80 \\
+        --webhook-failure-rate 0.05 --env WEBHOOK_ASYNC_MODE=true --env UPDATE_WORKERS=16
+
+The app uses the in-memory storage backend unless overridden, e.g.
+--env STORAGE_BACKEND=mongo --env MONGODB_URI=mongodb://localhost:27017.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from benchmarks.corpus import MESSAGES, SEED
+
+BOT_TOKEN = "123456789:load-harness-token"
+OFFICE_CODE_RE = re.compile(r"/join_company (\w+)")
+DEFAULT_MIX = "job=8,join=1,owner=1"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values: Sequence[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("job", "join", "owner"):
+            raise argparse.ArgumentTypeError(f"unknown update kind {kind!r}")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+@dataclass
+class Company:
+    owner_id: int
+    office_code: str
+    employees: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Stats:
+    latencies: List[float] = field(default_factory=list)
+    by_kind: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+
+
+class UpdateFactory:
+    """Builds Telegram update bodies with unique update_ids and per-chat message_ids."""
+
+    def __init__(self):
+        self._update_ids = itertools.count(700_000_000)
+        self._message_ids: Counter = Counter()
+
+    def message(self, user_id: int, text: str, first_name: str = "Load") -> bytes:
+        self._message_ids[user_id] += 1
+        sender = {"id": user_id, "is_bot": False, "first_name": first_name, "last_name": str(user_id)}
+        return json.dumps(
+            {
+                "update_id": next(self._update_ids),
+                "message": {
+                    "message_id": self._message_ids[user_id],
+                    "from": sender,
+                    "chat": {"id": user_id, "type": "private"},
+                    "date": int(time.time()),
+                    "text": text,
+                },
+            }
+        ).encode()
+
+
+class Harness:
+    def __init__(self, args: argparse.Namespace, upstream_url: str, app_url: str):
+        self.args = args
+        self.upstream_url = upstream_url
+        self.webhook_url = f"{app_url}/telegram/webhook"
+        self.updates = UpdateFactory()
+        self.rng = random.Random(SEED)
+        self.companies: List[Company] = []
+        self._user_ids = itertools.count(500_000_000)
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    async def post(self, body: bytes) -> Tuple[int, dict]:
+        assert self._http is not None
+        async with self._http.post(
+            self.webhook_url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+        ) as resp:
+            payload = await resp.json(content_type=None) if resp.status == 200 else {}
+            return resp.status, payload
+
+    async def upstream_get(self, path: str):
+        assert self._http is not None
+        async with self._http.get(f"{self.upstream_url}{path}") as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    async def command(self, user_id: int, text: str, timeout: float = 10.0) -> str:
+        """Send a command and return the bot's reply (inline or via the Bot API)."""
+        sent_before = len(await self.upstream_get(f"/_messages/{user_id}"))
+        status, payload = await self.post(self.updates.message(user_id, text))
+        if status != 200:
+            raise RuntimeError(f"{text!r} failed with HTTP {status}")
+        if payload.get("method") == "sendMessage":
+            return payload["text"]
+        # Replies go through the fake Bot API (in async mode, a bit later)
+        deadline = time.monotonic() + timeout
+        while True:
+            sent = await self.upstream_get(f"/_messages/{user_id}")
+            if len(sent) > sent_before:
+                return sent[-1]
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"no reply to {text!r} after {timeout}s")
+            await asyncio.sleep(0.02)
+
+    # -------------------- seeding --------------------
+
+    async def seed(self) -> None:
+        args = self.args
+        hook_query = f"latency_ms={args.webhook_latency_ms}&failure_rate={args.webhook_failure_rate}"
+        for i in range(args.companies):
+            owner_id = next(self._user_ids)
+            reply = await self.command(owner_id, f"/new_company Load Test Co {i}")
+            match = OFFICE_CODE_RE.search(reply)
+            if not match:
+                raise RuntimeError(f"no office code in reply: {reply!r}")
+            company = Company(owner_id=owner_id, office_code=match.group(1))
+            await self.command(
+                owner_id,
+                f"/connect_webhook {company.office_code} {self.upstream_url}/hook/company{i}?{hook_query}",
+            )
+            for _ in range(args.employees_per_company):
+                await self.join(company)
+            self.companies.append(company)
+
+    async def join(self, company: Company) -> None:
+        user_id = next(self._user_ids)
+        await self.command(user_id, f"/join_company {company.office_code} Crew {user_id}")
+        company.employees.append(user_id)
+
+    # -------------------- load --------------------
+
+    def next_update(self, kind: str) -> bytes:
+        company = self.rng.choice(self.companies)
+        if kind == "join":
+            user_id = next(self._user_ids)
+            # Counted as an employee for later jobs once the join went out
+            company.employees.append(user_id)
+            return self.updates.message(user_id, f"/join_company {company.office_code} Crew {user_id}")
+        if kind == "owner":
+            return self.updates.message(company.owner_id, "/my_companies")
+        return self.updates.message(self.rng.choice(company.employees), self.rng.choice(MESSAGES))
+
+    async def run_load(self) -> Tuple[Stats, float]:
+        args = self.args
+        kinds, weights = zip(*args.mix.items())
+        plan = self.rng.choices(kinds, weights=weights, k=args.updates)
+        queue = iter(enumerate(plan))
+        stats = Stats()
+        started = time.perf_counter()
+
+        async def worker() -> None:
+            for seq, kind in queue:
+                if args.rate:
+                    delay = started + seq / args.rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                body = self.next_update(kind)
+                sent = time.perf_counter()
+                try:
+                    status, _ = await self.post(body)
+                except Exception as e:
+                    stats.errors[type(e).__name__] += 1
+                    continue
+                stats.latencies.append(time.perf_counter() - sent)
+                stats.by_kind[kind] += 1
+                if status != 200:
+                    stats.errors[f"HTTP {status}"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return stats, time.perf_counter() - started
+
+    async def run(self) -> Tuple[Stats, float, dict]:
+        # +1 connection so upstream polling never waits behind the load
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency + 1)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            self._http = http
+            await self.seed()
+            stats, elapsed = await self.run_load()
+            await asyncio.sleep(self.args.drain_seconds)
+            return stats, elapsed, await self.upstream_get("/_stats")
+
+
+def report(args: argparse.Namespace, upstream: dict, stats: Stats, elapsed: float) -> None:
+    latencies_ms = sorted(v * 1000 for v in stats.latencies)
+    sent = len(stats.latencies) + sum(v for k, v in stats.errors.items() if not k.startswith("HTTP"))
+    print()
+    print(f"updates      {sent} in {elapsed:.2f}s -> {len(latencies_ms) / elapsed:,.0f} updates/s")
+    print("mix          " + ", ".join(f"{k}={v}" for k, v in sorted(stats.by_kind.items())))
+    print(
+        "latency ms   "
+        f"p50 {_percentile(latencies_ms, 50):.1f}  p95 {_percentile(latencies_ms, 95):.1f}  "
+        f"p99 {_percentile(latencies_ms, 99):.1f}  max {latencies_ms[-1] if latencies_ms else 0:.1f}"
+    )
+    print("errors       " + (", ".join(f"{k}={v}" for k, v in stats.errors.items()) or "none"))
+    calls = upstream["bot_api_calls"]
+    print("bot api      " + (", ".join(f"{k}={v}" for k, v in calls.items()) or "no calls"))
+    print(
+        f"webhooks     delivered {upstream['webhooks_received']}, "
+        f"failed (simulated) {upstream['webhooks_failed']} "
+        f"after {args.drain_seconds:.0f}s drain"
+    )
+
+
+def _app_env(args: argparse.Namespace, upstream_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "TELEGRAM_BOT_TOKEN": BOT_TOKEN,
+            "TELEGRAM_API_BASE_URL": upstream_url,
+            "WEBHOOK_BASE_URL": "http://127.0.0.1",
+            "MONGODB_URI": env.get("MONGODB_URI", "mongodb://127.0.0.1:27017"),
+            "STORAGE_BACKEND": "memory",
+            # Outbox retries should show up within the drain window
+            "OUTBOX_POLL_INTERVAL_SECONDS": "0.2",
+            "OUTBOX_BACKOFF_BASE_SECONDS": "0.5",
+        }
+    )
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def _spawn(argv: List[str], env: Dict[str, str], log) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", *argv],
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT if log is not subprocess.DEVNULL else None,
+    )
+
+
+async def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{process.args} exited with code {process.returncode}")
+            try:
+                async with http.get(url) as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"{url} did not come up in {timeout}s")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    upstream_port, app_port = _free_port(), _free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    log = open(args.app_log, "w") if args.app_log else subprocess.DEVNULL
+
+    processes = [
+        _spawn(
+            [
+                "benchmarks.fakes", "--port", str(upstream_port),
+                "--bot-api-latency-ms", str(args.bot_api_latency_ms), "--seed", str(SEED),
+            ],
+            dict(os.environ),
+            subprocess.DEVNULL,
+        ),
+        _spawn(
+            [
+                "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+                "--log-level", "warning",
+            ],
+            _app_env(args, upstream_url),
+            log,
+        ),
+    ]
+    try:
+        await _wait_until_up(f"{upstream_url}/_stats", processes[0])
+        await _wait_until_up(f"{app_url}/health", processes[1])
+        stats, elapsed, upstream = await Harness(args, upstream_url, app_url).run()
+        report(args, upstream, stats, elapsed)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000, help="updates to send after seeding")
+    parser.add_argument("--concurrency", type=int, default=100, help="requests in flight")
+    parser.add_argument("--rate", type=float, default=0, help="target updates/s (0 = as fast as possible)")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX), help=f"default {DEFAULT_MIX}")
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--employees-per-company", type=int, default=5)
+    parser.add_argument("--webhook-latency-ms", type=float, default=20.0)
+    parser.add_argument("--webhook-failure-rate", type=float, default=0.0)
+    parser.add_argument("--bot-api-latency-ms", type=float, default=5.0)
+    parser.add_argument("--drain-seconds", type=float, default=3.0, help="wait for outbox deliveries")
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for the app process")
+    parser.add_argument("--app-log", help="write the app's output to this file")
+    asyncio.run(main_async(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
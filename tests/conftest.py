@@ -0,0 +1,84 @@
+import itertools
+import os
+
+# Settings are read once, at first import of app modules
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:test")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("WEBHOOK_BASE_URL", "http://localhost")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("WEBHOOK_ASYNC_MODE", "false")
+os.environ.setdefault("WEBHOOK_INLINE_REPLY", "false")
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.domain.repositories import company_brief_cache, employee_cache
+from app.infrastructure.storage import use_storage
+from app.infrastructure.storage.memory import InMemoryStorage
+
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+
+
+@pytest.fixture
+def storage():
+    backend = InMemoryStorage()
+    use_storage(backend)
+    employee_cache.clear()
+    company_brief_cache.clear()
+    yield backend
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Every Bot API sendMessage, as (chat_id, text)."""
+    from app.telegram.bot import bot
+
+    messages = []
+
+    async def send_message(chat_id, text, **kwargs):
+        messages.append((chat_id, text))
+
+    monkeypatch.setattr(bot, "send_message", send_message)
+    return messages
+
+
+def telegram_update(
+    user_id: int, text: str, *, chat_id=None, edited: bool = False, message_id=None
+) -> dict:
+    message = {
+        "message_id": message_id or next(_message_ids),
+        "date": 0,
+        "chat": {"id": chat_id or user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+        "text": text,
+    }
+    return {
+        "update_id": next(_update_ids),
+        "edited_message" if edited else "message": message,
+    }
+
+
+class WebhookClient:
+    """Posts updates to /telegram/webhook, the way Telegram does."""
+
+    def __init__(self):
+        from app.api.routes.telegram_webhook import router
+
+        app = FastAPI()
+        app.include_router(router)
+        self._transport = httpx.ASGITransport(app=app)
+
+    async def send(self, user_id: int, text: str, **kwargs) -> httpx.Response:
+        async with httpx.AsyncClient(transport=self._transport, base_url="http://test") as client:
+            response = await client.post(
+                "/telegram/webhook", json=telegram_update(user_id, text, **kwargs)
+            )
+        assert response.status_code == 200
+        return response
+
+
+@pytest.fixture
+def webhook(storage, sent):
+    return WebhookClient()
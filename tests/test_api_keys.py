@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes.jobs import router
+from app.core.config import get_settings
+from app.domain.repositories import setup_first_company
+
+ADMIN_KEY = "admin-secret"
+
+
+@pytest.fixture
+def api(storage, monkeypatch):
+    monkeypatch.setattr(get_settings(), "API_KEY", ADMIN_KEY)
+    app = FastAPI()
+    app.include_router(router)
+    return httpx.ASGITransport(app=app)
+
+
+async def _get(api, path: str, key=None) -> httpx.Response:
+    headers = {"X-API-Key": key} if key else {}
+    async with httpx.AsyncClient(transport=api, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def test_company_key_opens_only_its_own_company(api):
+    async def scenario():
+        acme, _ = await setup_first_company(owner_telegram_id=1, title="Acme", owner_name="A")
+        other, _ = await setup_first_company(owner_telegram_id=2, title="Other", owner_name="B")
+        issued = await _get(api, f"/api/companies/{acme.id}/api_key", ADMIN_KEY)
+        key = issued.json()["api_key"]
+        return (
+            await _get(api, f"/api/companies/{acme.id}/jobs", key),
+            await _get(api, f"/api/companies/{other.id}/jobs", key),
+            await _get(api, f"/api/companies/{other.id}/api_key", key),
+            await _get(api, f"/api/companies/{other.id}/jobs", ADMIN_KEY),
+        )
+
+    own, cross, issue, admin = asyncio.run(scenario())
+
+    assert own.status_code == 200
+    assert cross.status_code == 403
+    assert issue.status_code == 403
+    assert admin.status_code == 200
+
+
+def test_api_is_closed_without_an_admin_key(api, monkeypatch):
+    monkeypatch.setattr(get_settings(), "API_KEY", None)
+
+    async def scenario():
+        acme, _ = await setup_first_company(owner_telegram_id=1, title="Acme", owner_name="A")
+        return await _get(api, f"/api/companies/{acme.id}/jobs", "anything")
+
+    assert asyncio.run(scenario()).status_code == 403
+
+
+@pytest.mark.parametrize("path", ["/metrics", "/health/cache", "/health/extraction"])
+def test_operational_routes_need_the_admin_key(storage, monkeypatch, path):
+    from app.api.routes.health import router as health_router
+    from app.api.routes.metrics import router as metrics_router
+
+    monkeypatch.setattr(get_settings(), "API_KEY", ADMIN_KEY)
+    app = FastAPI()
+    app.include_router(health_router)
+    app.include_router(metrics_router)
+    transport = httpx.ASGITransport(app=app)
+
+    async def scenario():
+        return (
+            await _get(transport, path),
+            await _get(transport, path, "wrong"),
+            await _get(transport, path, ADMIN_KEY),
+            await _get(transport, "/health"),
+        )
+
+    missing, wrong, admin, liveness = asyncio.run(scenario())
+
+    assert missing.status_code == 403
+    assert wrong.status_code == 403
+    assert admin.status_code == 200
+    assert liveness.status_code == 200
+
+
+def test_webhook_metrics_have_no_host_label(monkeypatch):
+    from app.infrastructure import webhook_delivery
+    from app.infrastructure.metrics import metrics
+
+    class Host:
+        async def post(self, url, json):
+            return httpx.Response(503)
+
+    monkeypatch.setattr(webhook_delivery, "get_http_client", lambda: Host())
+    asyncio.run(webhook_delivery.deliver_webhook("http://customer-host.example/hook", {}))
+
+    rendered = metrics.render()
+    assert 'artlix_outbound_webhook_total{status="5xx"}' in rendered
+    assert "customer-host.example" not in rendered
@@ -0,0 +1,53 @@
+import asyncio
+import re
+
+from app.domain.nlp.parser import ParsedJob
+from app.domain.repositories import list_company_jobs
+from app.infrastructure.extraction_pool import extraction_pool
+from app.telegram.notifications import owner_notifier
+
+OWNER = 3003
+EMPLOYEE = 4004
+
+
+def test_fields_come_from_the_extraction_pool(webhook, sent, monkeypatch):
+    calls = []
+
+    async def extract(text, tz=None):
+        calls.append((text, tz))
+        return ParsedJob(client_name="John", job_type="deck repair", location="12 Oak Street", budget=2500.0)
+
+    monkeypatch.setattr(extraction_pool, "extract", extract)
+
+    async def scenario():
+        await webhook.send(OWNER, "/owner_setup Acme Builders")
+        code = re.search(r"<code>([A-Z0-9]{6})</code>", sent[-1][1]).group(1)
+        await webhook.send(OWNER, f"/timezone {code} America/Toronto")
+        await webhook.send(EMPLOYEE, f"/join_company {code} Bob")
+        await webhook.send(EMPLOYEE, "Deck repair for John at 12 Oak Street, budget 2500")
+        await owner_notifier.stop()
+        return code
+
+    asyncio.run(scenario())
+
+    assert calls == [("Deck repair for John at 12 Oak Street, budget 2500", "America/Toronto")]
+    reply = [text for chat, text in sent if chat == EMPLOYEE][-1]
+    assert "deck repair" in reply and "John" in reply and "12 Oak Street" in reply
+
+
+def test_extracted_fields_are_stored(webhook, sent, storage):
+    async def scenario():
+        await webhook.send(OWNER, "/owner_setup Acme Builders")
+        code = re.search(r"<code>([A-Z0-9]{6})</code>", sent[-1][1]).group(1)
+        await webhook.send(EMPLOYEE, f"/join_company {code} Bob")
+        await webhook.send(EMPLOYEE, "Client: Ann, deck repair at 5 Elm Street, budget 2.5k")
+        await owner_notifier.stop()
+        company = (await storage.find_companies_by_owner(OWNER))[0]
+        return await list_company_jobs(company_id=company["_id"])
+
+    page = asyncio.run(scenario())
+
+    assert len(page.jobs) == 1
+    assert page.jobs[0].client_name == "Ann"
+    assert page.jobs[0].location == "5 Elm Street"
+    assert page.jobs[0].budget == 2500
@@ -0,0 +1,24 @@
+import pytest
+
+from app.telegram.commands import parse_command
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("/help", ("help", "")),
+        ("/join CODE", ("join", "CODE")),
+        ("/Join@artlix_bot  CODE ", ("join", "CODE")),
+        ("/owner_setup\nAcme", ("owner_setup", "Acme")),
+        ("/owner_setup\nAcme Roofing\n", ("owner_setup", "Acme Roofing")),
+        ("/join\tCODE", ("join", "CODE")),
+        ("/timezone\n", ("timezone", "")),
+    ],
+)
+def test_parse_command(text, expected):
+    assert parse_command(text) == expected
+
+
+@pytest.mark.parametrize("text", ["hello", "/", "/@artlix_bot", " /help"])
+def test_not_a_command(text):
+    assert parse_command(text) is None
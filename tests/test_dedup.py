@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.routes import telegram_webhook
+from app.infrastructure.dedup import RecentIds
+
+from conftest import telegram_update
+
+
+def test_recent_ids_window():
+    recent = RecentIds(3)
+    assert [recent.add(n) for n in (1, 2, 1, 3, 4)] == [True, True, False, True, True]
+    # 1 slid out of the window
+    assert 1 not in recent and recent.add(1)
+
+    recent.discard(3)
+    assert 3 not in recent and recent.add(3)
+    assert [n in recent for n in (1, 3, 4)] == [True, True, True]
+
+
+def test_update_that_failed_is_handled_on_redelivery_then_deduplicated(webhook, monkeypatch):
+    handled = []
+    process_update = telegram_webhook.process_update
+
+    async def flaky(update, inline_reply=False):
+        handled.append(update.update_id)
+        if len(handled) == 1:
+            raise RuntimeError("worker died mid-update")
+        return await process_update(update, inline_reply)
+
+    monkeypatch.setattr(telegram_webhook, "process_update", flaky)
+    update = telegram_update(7, "/start")
+
+    async def deliver():
+        # not webhook.send(): that expects a 200 and a fresh update each time
+        async with httpx.AsyncClient(transport=webhook._transport, base_url="http://test") as client:
+            return await client.post("/telegram/webhook", json=update)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(deliver())
+    redelivered = asyncio.run(deliver())
+    duplicate = asyncio.run(deliver())
+
+    assert redelivered.status_code == duplicate.status_code == 200
+    # the first copy failed, the redelivery ran, the third was skipped
+    assert handled == [update["update_id"]] * 2
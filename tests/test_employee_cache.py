@@ -0,0 +1,48 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.domain.repositories import (
+    employee_cache,
+    get_employee_by_telegram,
+    get_or_create_employee_by_telegram,
+)
+
+
+def test_fill_racing_an_invalidation_is_not_cached(storage, monkeypatch):
+    """A lookup that read the old row must not cache it over a newer write."""
+    read_done = asyncio.Event()
+    write_done = asyncio.Event()
+    find = storage.find_employee_by_telegram
+
+    async def slow_find(telegram_id):
+        doc = await find(telegram_id)
+        read_done.set()
+        await write_done.wait()
+        return doc
+
+    async def scenario():
+        monkeypatch.setattr(storage, "find_employee_by_telegram", slow_find)
+        lookup = asyncio.create_task(get_employee_by_telegram(telegram_id=7))
+        await read_done.wait()
+        # joins a company while the lookup still holds "no such employee"
+        await get_or_create_employee_by_telegram(company_id=ObjectId(), telegram_id=7, name="Sam")
+        write_done.set()
+        assert await lookup is None
+
+        monkeypatch.setattr(storage, "find_employee_by_telegram", find)
+        return await get_employee_by_telegram(telegram_id=7)
+
+    employee = asyncio.run(scenario())
+
+    assert employee is not None and employee.name == "Sam"
+
+
+def test_clear_discards_fills_in_flight(storage):
+    generation = employee_cache.generation(1)
+    employee_cache.clear()
+    employee_cache.set(1, None, generation)
+    assert len(employee_cache) == 0
+
+    employee_cache.set(1, None, employee_cache.generation(1))
+    assert len(employee_cache) == 1
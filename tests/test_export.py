@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes.jobs import _accepts_gzip, router
+from app.core.config import get_settings
+from app.domain.repositories import setup_first_company
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ("", False),
+        ("gzip", True),
+        ("GZIP", True),
+        ("deflate, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0, deflate", False),
+        ("br;q=1.0, gzip;q=0", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("gzip;q=0, *", False),
+        ("identity", False),
+        ("gzip;q=bogus", False),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
+
+
+def test_export_honours_gzip_q0(storage, monkeypatch):
+    monkeypatch.setattr(get_settings(), "API_KEY", "admin-secret")
+    app = FastAPI()
+    app.include_router(router)
+
+    async def export(accept_encoding: str) -> httpx.Response:
+        company, _ = await setup_first_company(owner_telegram_id=1, title="Acme", owner_name="A")
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.get(
+                f"/api/companies/{company.id}/jobs/export",
+                headers={"X-API-Key": "admin-secret", "Accept-Encoding": accept_encoding},
+            )
+
+    refused = asyncio.run(export("gzip;q=0"))
+    accepted = asyncio.run(export("gzip"))
+
+    assert refused.status_code == 200
+    assert "content-encoding" not in refused.headers
+    assert accepted.headers["content-encoding"] == "gzip"
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.domain.nlp import training
+from app.domain.nlp.job_classifier import HashedNgramClassifier, MicroBatcher
+
+JOBS = [
+    "new job: kitchen reno for client Grace Kim at 2201 Lakeshore Blvd, budget 18k",
+    "estimate needed, client Dana, bathroom tiles at 14 Queen St, this friday",
+    "quote for deck repair, client: Sam Lee, address 9 Harbour Rd, budget $4,000",
+]
+CHATTER = ["on my way", "ok thanks", "running late", "done for today"]
+
+
+def _write_labeled(path, copies=10):
+    rows = [{"text": f"{t} #{n}", "is_job": True} for t in JOBS for n in range(copies)]
+    rows += [{"text": f"{t} {n}", "is_job": False} for t in CHATTER for n in range(copies)]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def test_out_without_npy_writes_weights_and_metadata_side_by_side(tmp_path, capsys):
+    # np.save() makes this model.v2.npy; the metadata must follow it, not become model.json
+    labeled = tmp_path / "labeled.jsonl"
+    _write_labeled(labeled)
+
+    code = training.main(
+        ["--out", str(tmp_path / "model.v2"), "--labeled", str(labeled), "--buckets", "1024", "--epochs", "2"]
+    )
+
+    assert code == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["labeled.jsonl", "model.v2.json", "model.v2.npy"]
+    assert HashedNgramClassifier.load(tmp_path / "model.v2.npy").n_buckets == 1024
+    assert "weak-labeled" not in capsys.readouterr().out
+
+
+def test_weak_labels_are_reported_as_agreement_only(tmp_path, capsys, monkeypatch):
+    async def stored_texts(limit):
+        return [f"{t} #{n}" for t in JOBS + CHATTER for n in range(10)]
+
+    monkeypatch.setattr(training, "read_stored_texts", stored_texts)
+
+    training.main(["--out", str(tmp_path / "model.npy"), "--from-db", "--buckets", "1024", "--epochs", "2"])
+
+    assert "only measure agreement" in capsys.readouterr().out
+
+
+def test_score_batch_matches_one_at_a_time():
+    weights = np.random.default_rng(0).normal(size=1024 + 1).astype(np.float32)
+    classifier = HashedNgramClassifier(weights)
+    token_lists = [("fix", "the", "sink"), (), ("budget", "18k", "client", "grace")]
+
+    batch = classifier.score_batch(token_lists)
+
+    assert batch == pytest.approx([classifier.score(tokens) for tokens in token_lists])
+    assert len(classifier.score_batch([])) == 0
+
+
+def test_weights_must_be_a_power_of_two_plus_bias():
+    with pytest.raises(ValueError):
+        HashedNgramClassifier(np.zeros(1000))
+
+
+def test_micro_batcher_fills_batches_then_flushes_the_rest_on_time():
+    calls = []
+
+    def score(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(score, max_batch=4, max_wait_seconds=0.01)
+        return await asyncio.gather(*(batcher.submit(n) for n in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert results == [n * 10.0 for n in range(10)]
+    assert calls == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_micro_batcher_fails_every_item_of_a_failed_batch():
+    def score(items):
+        raise RuntimeError("model broke")
+
+    async def scenario():
+        batcher = MicroBatcher(score, max_batch=8, max_wait_seconds=0.01)
+        return await asyncio.gather(*(batcher.submit(n) for n in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [type(r) for r in results] == [RuntimeError] * 3
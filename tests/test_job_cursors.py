@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.domain.repositories import (
+    InvalidCursor,
+    decode_job_cursor,
+    encode_job_cursor,
+    list_company_jobs,
+)
+
+BASE = datetime(2024, 6, 14, 12, 0)
+
+
+def _job(company_id, employee_id, n):
+    return {
+        "_id": ObjectId(),
+        "company_id": company_id,
+        "created_by_employee_id": employee_id,
+        "job_type": f"job {n}",
+        "raw_text": "x",
+        # three jobs per timestamp, so pages split ties on _id
+        "created_at": BASE + timedelta(minutes=n // 3),
+        "status": "done" if n % 4 == 0 else "new",
+    }
+
+
+async def _insert_jobs(storage, count):
+    company_id, employees = ObjectId(), (ObjectId(), ObjectId())
+    docs = [_job(company_id, employees[n % 2], n) for n in range(count)]
+    for doc in docs:
+        await storage.insert_job(doc)
+    newest_first = sorted(docs, key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+    return company_id, employees, newest_first
+
+
+async def _collect(company_id, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = await list_company_jobs(company_id=company_id, cursor=cursor, limit=4, **filters)
+        ids += [job.id for job in page.jobs]
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_round_trip():
+    job_id = ObjectId()
+    cursor = encode_job_cursor(BASE, job_id)
+    assert "=" not in cursor
+    assert decode_job_cursor(cursor) == (BASE, job_id)
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", "bm90LWEtY3Vyc29y", encode_job_cursor(BASE, ObjectId())[:-4]])
+def test_foreign_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_job_cursor(cursor)
+
+
+def test_pages_visit_every_job_once_newest_first(storage):
+    async def scenario():
+        company_id, _, expected = await _insert_jobs(storage, 21)
+        return await _collect(company_id), expected
+
+    (ids, pages), expected = asyncio.run(scenario())
+
+    assert ids == [doc["_id"] for doc in expected]
+    # 21 jobs, 4 a page: the last page is short and has no next cursor
+    assert pages == 6
+
+
+def test_pages_keep_their_filters(storage):
+    async def scenario():
+        company_id, employees, expected = await _insert_jobs(storage, 21)
+        by_status, _ = await _collect(company_id, status="done")
+        by_employee, _ = await _collect(company_id, employee_id=employees[1], status="new")
+        return employees, expected, by_status, by_employee
+
+    employees, expected, by_status, by_employee = asyncio.run(scenario())
+
+    assert by_status == [d["_id"] for d in expected if d["status"] == "done"]
+    assert by_employee == [
+        d["_id"] for d in expected if d["created_by_employee_id"] == employees[1] and d["status"] == "new"
+    ]
+
+
+def test_list_rejects_a_bad_cursor(storage):
+    with pytest.raises(InvalidCursor):
+        asyncio.run(list_company_jobs(company_id=ObjectId(), cursor="garbage!"))
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from app.domain.nlp.keywords import AUTOMATON_MIN_KEYWORDS, KeywordMatcher, _Automaton
+
+
+def _both(groups):
+    automaton = KeywordMatcher(groups, automaton_min_keywords=0)
+    linear = KeywordMatcher(groups, automaton_min_keywords=10**9)
+    assert automaton.uses_automaton and not linear.uses_automaton
+    return automaton, linear
+
+
+def test_automaton_agrees_with_the_linear_scan_on_random_vocabularies():
+    rng = random.Random(1234)
+    # a tiny alphabet makes overlaps, shared prefixes and suffixes common
+    alphabet = "ab c"
+
+    def word(lo, hi):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(lo, hi)))
+
+    for _ in range(300):
+        groups = [(g, [word(1, 5) for _ in range(rng.randint(0, 20))]) for g in range(rng.randint(1, 6))]
+        automaton, linear = _both(groups)
+        for _ in range(20):
+            text = word(0, 40)
+            assert automaton.first(text) == linear.first(text), (groups, text)
+            assert automaton.all(text) == linear.all(text), (groups, text)
+
+
+def test_large_vocabulary_takes_the_automaton_path_by_default():
+    rng = random.Random(99)
+    words = ["".join(rng.choice("abcdefgh ") for _ in range(rng.randint(2, 8))) for _ in range(400)]
+    groups = [(n, words[n::4]) for n in range(4)]
+    default = KeywordMatcher(groups)
+    linear = KeywordMatcher(groups, automaton_min_keywords=10**9)
+
+    assert default.keyword_count >= AUTOMATON_MIN_KEYWORDS
+    assert default.uses_automaton
+    for _ in range(500):
+        text = "".join(rng.choice("abcdefgh ") for _ in range(rng.randint(0, 80)))
+        assert default.all(text) == linear.all(text)
+
+
+def test_overlapping_keywords():
+    automaton = _Automaton([("he", 0), ("she", 1), ("hers", 2), ("his", 3)])
+    assert automaton.groups("ushers") == {0, 1, 2}
+    assert automaton.groups("this") == {3}
+    assert automaton.groups("hhe") == {0}
+
+
+@pytest.mark.parametrize("min_keywords", [0, 10**9])
+def test_keywords_match_inside_words_in_priority_order(min_keywords):
+    matcher = KeywordMatcher(
+        [("urgent", ["asap", "urgent"]), ("job", ["job", "fix"])],
+        automaton_min_keywords=min_keywords,
+    )
+    # substring semantics: no word boundaries
+    assert matcher.first("jobsite prefix") == "job"
+    assert matcher.all("urgently fix it") == ["urgent", "job"]
+    assert matcher.first("fix this asap") == "urgent"
+    assert matcher.first("nothing here") is None
+
+
+@pytest.mark.parametrize("min_keywords", [0, 10**9])
+def test_keywords_are_lowercased_and_blanks_ignored(min_keywords):
+    matcher = KeywordMatcher([("job", ["New Job", " ", ""])], automaton_min_keywords=min_keywords)
+    assert matcher.keyword_count == 1
+    assert matcher.first("a new job please") == "job"
+    assert matcher.first("") is None
@@ -0,0 +1,84 @@
+import asyncio
+from collections import Counter
+
+from bson import ObjectId
+
+from app.core.config import get_settings
+from app.domain.repositories import (
+    claim_outbox_batch,
+    create_company,
+    create_job,
+    delete_company_and_related,
+    reschedule_outbox,
+    set_company_webhook,
+)
+from app.infrastructure import webhook_delivery
+from app.infrastructure.outbox_dispatcher import OutboxDispatcher
+
+
+class SlowHost:
+    """An integration that takes `delay` seconds per request."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.posts = Counter()
+
+    async def post(self, url, json):
+        await asyncio.sleep(self.delay)
+        self.posts[json["job"]["id"]] += 1
+        return type("Response", (), {"status_code": 200})()
+
+
+def test_records_waiting_on_a_slow_host_outlive_their_lease(storage, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "OUTBOX_LEASE_SECONDS", 0.3)
+    monkeypatch.setattr(settings, "OUTBOX_POLL_INTERVAL_SECONDS", 0.02)
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_PER_HOST", 1)
+    host = SlowHost(delay=0.2)
+    monkeypatch.setattr(webhook_delivery, "get_http_client", lambda: host)
+
+    async def scenario():
+        company = await create_company(owner_telegram_id=1, title="Acme")
+        await set_company_webhook(company_id=company.id, url="http://slow-lease.example/hook")
+        for _ in range(5):
+            await create_job(
+                company_id=company.id, employee_id=ObjectId(), title="t", description="", raw_text="x"
+            )
+
+        dispatcher = OutboxDispatcher(max_in_flight=50)
+        dispatcher.start()
+        # one at a time, 5 × 0.2s: the last waits more than three leases
+        await asyncio.sleep(1.6)
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert len(host.posts) == 5
+    assert set(host.posts.values()) == {1}
+
+
+def test_deleting_a_company_drops_its_undelivered_records(storage, monkeypatch):
+    host = SlowHost(delay=0)
+    monkeypatch.setattr(webhook_delivery, "get_http_client", lambda: host)
+
+    async def scenario():
+        company = await create_company(owner_telegram_id=1, title="Acme")
+        await set_company_webhook(company_id=company.id, url="http://deleted.example/hook")
+        await create_job(
+            company_id=company.id, employee_id=ObjectId(), title="t", description="", raw_text="x"
+        )
+        # failed once: the record now carries its destinations itself
+        (record,) = await claim_outbox_batch(limit=10, lease_seconds=60)
+        await reschedule_outbox(
+            record["_id"],
+            attempts=1,
+            next_attempt_at=record["created_at"],
+            destinations=["http://deleted.example/hook"],
+            error="HTTP 500",
+        )
+
+        await delete_company_and_related(company.id)
+        return await OutboxDispatcher().run_once()
+
+    assert asyncio.run(scenario()) == 0
+    assert not host.posts
@@ -0,0 +1,64 @@
+import asyncio
+import re
+
+from app.telegram.notifications import owner_notifier
+
+OWNER = 1001
+EMPLOYEE = 2002
+
+
+async def _company_with_employee(webhook, sent) -> None:
+    await webhook.send(OWNER, "/owner_setup Acme Builders")
+    code = re.search(r"<code>([A-Z0-9]{6})</code>", sent[-1][1]).group(1)
+    await webhook.send(EMPLOYEE, f"/join_company {code} Bob")
+    sent.clear()
+
+
+def _to(sent, chat_id):
+    return [text for chat, text in sent if chat == chat_id]
+
+
+def test_employee_job_alerts_owner(webhook, sent):
+    async def scenario():
+        await _company_with_employee(webhook, sent)
+        await webhook.send(EMPLOYEE, "Deck repair for John at 12 Oak Street on Friday morning")
+        # nothing is collected in the window yet: the first alert went out right away
+        assert owner_notifier.pending() == 0
+        await owner_notifier.stop()
+
+    asyncio.run(scenario())
+
+    assert any("Job captured" in text for text in _to(sent, EMPLOYEE))
+    alerts = _to(sent, OWNER)
+    assert len(alerts) == 1
+    assert "New job added" in alerts[0]
+    assert str(EMPLOYEE) in alerts[0]
+
+
+def test_alerts_within_window_are_coalesced(webhook, sent):
+    async def scenario():
+        await _company_with_employee(webhook, sent)
+        await webhook.send(EMPLOYEE, "Deck repair for John at 12 Oak Street on Friday morning")
+        await webhook.send(EMPLOYEE, "Roof inspection for Mary at 4 Elm Road next Tuesday")
+        await webhook.send(EMPLOYEE, "Drywall patch for Sam at 9 Pine Avenue tomorrow")
+        assert owner_notifier.pending() == 2
+        # flushes the open window instead of waiting for it to close
+        await owner_notifier.stop()
+
+    asyncio.run(scenario())
+
+    alerts = _to(sent, OWNER)
+    assert len(alerts) == 2
+    assert "New job added" in alerts[0]
+    assert "2 new jobs added" in alerts[1]
+
+
+def test_owner_is_not_alerted_about_own_jobs(webhook, sent):
+    async def scenario():
+        await _company_with_employee(webhook, sent)
+        await webhook.send(OWNER, "Deck repair for John at 12 Oak Street on Friday morning")
+        await owner_notifier.stop()
+
+    asyncio.run(scenario())
+
+    assert not any("New job added" in text for text in _to(sent, OWNER))
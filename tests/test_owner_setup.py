@@ -0,0 +1,36 @@
+import asyncio
+
+from app.domain.repositories import _new_company_doc, setup_first_company
+from app.infrastructure.storage.base import DuplicateKeyError
+
+OWNER = 7007
+
+
+def test_concurrent_owner_setup_returns_the_winners_company(storage, monkeypatch):
+    async def lose_the_race(doc):
+        # another /owner_setup got its upsert in between: the unique
+        # owner index rejects this one
+        await storage.insert_company(_new_company_doc(OWNER, "Winner", first=True))
+        raise DuplicateKeyError("owner")
+
+    monkeypatch.setattr(storage, "insert_company_unless_owner_has_one", lose_the_race)
+
+    company, owner = asyncio.run(
+        setup_first_company(owner_telegram_id=OWNER, title="Loser", owner_name="Olga")
+    )
+
+    assert company.title == "Winner"
+    assert owner is None
+
+
+def test_owner_setup_marks_the_first_company(storage):
+    company, owner = asyncio.run(
+        setup_first_company(owner_telegram_id=OWNER, title="Acme", owner_name="Olga")
+    )
+    again, none = asyncio.run(
+        setup_first_company(owner_telegram_id=OWNER, title="Other", owner_name="Olga")
+    )
+
+    assert owner is not None and none is None
+    assert again.id == company.id
+    assert asyncio.run(storage.find_company_by_id(company.id))["first_company"] is True
@@ -0,0 +1,48 @@
+import asyncio
+import re
+from datetime import datetime
+
+from app.domain.digest import digest_due, local_day
+from app.domain.models import DailyRollup
+from app.domain.repositories import get_daily_rollup
+from app.telegram.notifications import owner_notifier
+
+OWNER = 5005
+EMPLOYEE = 6006
+
+
+def test_edit_moves_job_type_and_budget_in_the_rollup(webhook, sent, storage):
+    async def scenario():
+        await webhook.send(OWNER, "/owner_setup Acme Builders")
+        code = re.search(r"<code>([A-Z0-9]{6})</code>", sent[-1][1]).group(1)
+        await webhook.send(EMPLOYEE, f"/join_company {code} Bob")
+        await webhook.send(EMPLOYEE, "Deck repair for Ann at 5 Elm Street, budget 2k", message_id=900)
+        await webhook.send(
+            EMPLOYEE, "Roof leak for Ann at 5 Elm Street, budget 3k", message_id=900, edited=True
+        )
+        await owner_notifier.stop()
+        company = (await storage.find_companies_by_owner(OWNER))[0]
+        return await get_daily_rollup(company["_id"], local_day(company.get("timezone")))
+
+    rollup = asyncio.run(scenario())
+
+    assert rollup.jobs == 1
+    assert rollup.budget == 3000
+    assert sum(rollup.by_job_type.values()) == 1
+    assert rollup.by_job_type.get("deck repair", 0) == 0
+
+
+def _rollup(created_at: datetime) -> DailyRollup:
+    return DailyRollup(company_id=1, day="2026-03-10", timezone="UTC", created_at=created_at)
+
+
+def test_digest_goes_out_at_the_hour():
+    rollup = _rollup(datetime(2026, 3, 10, 9))
+    assert not digest_due(rollup, 18, datetime(2026, 3, 10, 17, 59))
+    assert digest_due(rollup, 18, datetime(2026, 3, 10, 18, 1))
+
+
+def test_rollup_started_after_the_hour_is_held_back():
+    rollup = _rollup(datetime(2026, 3, 10, 20))
+    assert not digest_due(rollup, 18, datetime(2026, 3, 10, 20, 1))
+    assert not digest_due(rollup, 18, datetime(2026, 3, 11, 1))
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app.domain.nlp.schedule import ScheduleSpec, find_schedule, parse_schedule
+
+# All times naive UTC against UTC, so local == stored. 2024-06-14 is a Friday.
+FRIDAY_AFTERNOON = datetime(2024, 6, 14, 15, 0)
+
+
+def test_equivalent_phrases_share_one_spec():
+    specs = {find_schedule(text) for text in ("on fri 3pm", "on friday at 3 pm", "friday 15:00")}
+    assert specs == {ScheduleSpec(("weekday", 4), 15 * 60)}
+
+
+def test_phrases_without_a_schedule():
+    assert find_schedule("fix the leak under the sink") is None
+    # a bare "5th" is usually a street
+    assert find_schedule("meet at 5th avenue") is None
+    # abbreviations only after this/next/on: "sat" and "sun" are words too
+    assert find_schedule("sat down with the client") is None
+
+
+def test_time_only_rolls_to_tomorrow_once_passed():
+    assert parse_schedule("at 4pm", "UTC", FRIDAY_AFTERNOON) == datetime(2024, 6, 14, 16, 0)
+    assert parse_schedule("at 2pm", "UTC", FRIDAY_AFTERNOON) == datetime(2024, 6, 15, 14, 0)
+
+
+def test_weekday_said_that_afternoon_is_next_week():
+    assert parse_schedule("friday morning", "UTC", FRIDAY_AFTERNOON) == datetime(2024, 6, 21, 8, 0)
+    assert parse_schedule("friday evening", "UTC", FRIDAY_AFTERNOON) == datetime(2024, 6, 14, 17, 0)
+
+
+def test_day_of_month_said_after_that_time_is_next_month():
+    at_four = datetime(2024, 6, 14, 16, 0)
+    assert parse_schedule("the 14th at 3pm", "UTC", at_four) == datetime(2024, 7, 14, 15, 0)
+    assert parse_schedule("the 14th at 5pm", "UTC", at_four) == datetime(2024, 6, 14, 17, 0)
+    assert parse_schedule("june 14 at 3pm", "UTC", at_four) == datetime(2025, 6, 14, 15, 0)
+
+
+def test_offsets_are_taken_as_said():
+    assert parse_schedule("today 9am", "UTC", FRIDAY_AFTERNOON) == datetime(2024, 6, 14, 9, 0)
+    assert parse_schedule("next friday", "UTC", FRIDAY_AFTERNOON) == datetime(2024, 6, 21, 9, 0)
+
+
+def test_company_timezone():
+    # 12:00 UTC is already 22:00 in Sydney (UTC+10 in June), so "tomorrow"
+    # is the 14th there, and 9am on it is 23:00 UTC on the 13th
+    now = datetime(2024, 6, 13, 12, 0)
+    assert parse_schedule("tomorrow 9am", "Australia/Sydney", now) == datetime(2024, 6, 13, 23, 0)
@@ -0,0 +1,54 @@
+import asyncio
+
+from app.infrastructure.metrics import telegram_sends_total
+from app.telegram.sender import NOTIFICATION, REPLY, OutboundSender
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def _dropped(priority: str) -> float:
+    return telegram_sends_total.value(outcome="dropped", priority=priority)
+
+
+def test_full_queue_drops_a_notification_to_make_room_for_a_reply():
+    async def scenario():
+        bot = RecordingBot()
+        sender = OutboundSender(max_pending=2, chat_rate=100, chat_burst=10)
+        sender.start()
+        await sender.send(bot, 1, "alert", NOTIFICATION)
+        await sender.send(bot, 2, "first reply", REPLY)
+        await sender.send(bot, 3, "second reply", REPLY)
+        assert sender.depth() == 2
+        await sender.stop()
+        return bot.sent
+
+    before = _dropped("notification")
+    sent = asyncio.run(scenario())
+
+    assert sorted(text for _, text in sent) == ["first reply", "second reply"]
+    assert _dropped("notification") == before + 1
+
+
+def test_replies_are_bounded_too():
+    async def scenario():
+        bot = RecordingBot()
+        sender = OutboundSender(max_pending=2, chat_rate=100, chat_burst=10)
+        sender.start()
+        for n in range(5):
+            await sender.send(bot, 1, f"reply {n}", REPLY)
+            assert sender.depth() <= 2
+        await sender.stop()
+        return bot.sent
+
+    before = _dropped("reply")
+    sent = asyncio.run(scenario())
+
+    # the oldest go; the newest are sent, in order
+    assert [text for _, text in sent] == ["reply 3", "reply 4"]
+    assert _dropped("reply") == before + 3
@@ -0,0 +1,68 @@
+import asyncio
+
+from app.telegram.update_queue import UpdateQueue
+
+
+def test_stop_drains_a_full_queue_and_blocked_submits():
+    async def scenario():
+        handled = []
+        release = asyncio.Event()
+
+        async def handler(update):
+            await release.wait()
+            handled.append(update)
+
+        queue = UpdateQueue(handler, workers=1, maxsize=1)
+        queue.start()
+        await queue.submit(1, "a")
+        await asyncio.sleep(0)  # the worker takes "a" and blocks on it
+        await queue.submit(1, "b")  # fills the shard
+        blocked = [asyncio.create_task(queue.submit(1, u)) for u in ("c", "d")]
+        await asyncio.sleep(0)
+
+        stopping = asyncio.create_task(queue.stop(timeout=5))
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.wait_for(stopping, 2)
+        await asyncio.gather(*blocked)
+        return handled
+
+    assert asyncio.run(scenario()) == ["a", "b", "c", "d"]
+
+
+def test_stop_gives_up_on_a_stuck_full_queue():
+    async def scenario():
+        async def handler(update):
+            await asyncio.Event().wait()
+
+        queue = UpdateQueue(handler, workers=1, maxsize=1)
+        queue.start()
+        await queue.submit(1, "a")
+        await asyncio.sleep(0)
+        await queue.submit(1, "b")
+        blocked = asyncio.create_task(queue.submit(1, "c"))
+        await asyncio.sleep(0)
+
+        # must return after its timeout, not wait for room on the shard
+        await asyncio.wait_for(queue.stop(timeout=0.1), 2)
+        await asyncio.wait_for(blocked, 2)
+        return queue.running
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_submit_after_stop_is_handled_inline():
+    async def scenario():
+        handled = []
+
+        async def handler(update):
+            handled.append(update)
+
+        queue = UpdateQueue(handler, workers=2, maxsize=4)
+        queue.start()
+        await queue.submit(1, "a")
+        await queue.stop()
+        await queue.submit(1, "b")
+        return handled
+
+    assert asyncio.run(scenario()) == ["a", "b"]
@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+
+from app.core.config import get_settings
+from app.infrastructure import webhook_delivery
+
+
+class GatedHost:
+    """Answers every POST once `gate` is set, counting how many overlap per host."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.active = {}
+        self.peak = {}
+
+    async def post(self, url, json):
+        host = httpx.URL(url).host
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        await self.gate.wait()
+        self.active[host] -= 1
+        return httpx.Response(200)
+
+
+def test_host_limits_cap_each_host_and_go_once_idle(monkeypatch):
+    monkeypatch.setattr(get_settings(), "WEBHOOK_MAX_PER_HOST", 2)
+    host = GatedHost()
+    monkeypatch.setattr(webhook_delivery, "get_http_client", lambda: host)
+    urls = [f"http://host-{n % 3}.example/hook" for n in range(12)]
+
+    async def scenario():
+        deliveries = asyncio.gather(*(webhook_delivery.deliver_webhook(url, {}) for url in urls))
+        await asyncio.sleep(0.05)
+        users = {name: limit.users for name, limit in webhook_delivery._host_limits.items()}
+        host.gate.set()
+        results = await deliveries
+        return users, results
+
+    users, results = asyncio.run(scenario())
+
+    assert all(result.ok for result in results)
+    assert host.peak == {f"host-{n}.example": 2 for n in range(3)}
+    # two sending and two waiting on each host while the gate was shut
+    assert users == {f"host-{n}.example": 4 for n in range(3)}
+    assert webhook_delivery._host_limits == {}